@@ -34,5 +34,8 @@ setuptools.setup(
         'num2words>=0.5.10',
         'opencv-python>=4.1.2.30',
         'emoji>=2.2.0'
-    ]
+    ],
+    entry_points={
+        'console_scripts': ['swachhdata=swachhdata.cli:main']
+    }
 )
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""Reproducible benchmarks for every recast and representative Pipelines.
+
+Run as a module, results are emitted as JSON so runs can be compared across
+versions and machines::
+
+    python -m swachhdata.bench --size 2000 --repeat 3 --output bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from . import __version__
+
+
+_WORDS = [
+    'data', 'cleaning', 'made', 'easy', 'with', 'the', 'best', 'service', 'we', 'offer',
+    'you', 'can', 'have', 'a', 'look', 'at', 'our', 'catalogue', 'in', 'services', 'tab',
+    'running', 'wishes', 'lunch', 'quarter', 'sales', 'turnover', 'this', 'year', 'was',
+    'they\'re', 'don\'t', 'it\'s', 'going', 'to', 'be', 'there', 'too', 'sanctuary'
+]
+# terms of the DictionaryRecast case, words and phrases of _WORDS
+_DICTIONARY = ['data cleaning', 'best service', 'catalogue', 'services tab', 'lunch', 'sales', 'turnover', 'sanctuary']
+_EMOJIS = ['😊', '😂', '🔥', '👍', '🎉', '☕', '🍛', '🚀', '❤️', '🙏']
+_DOMAINS = ['samplewebsite.com', 'www.example.org', 'https://news.site.co.in/article.html',
+            'http://192.168.1.1/image.jpg', 'www.shop.com:8080/cart']
+_MULTILINGUAL = [
+    'Café', 'naïve', 'façade', 'Straße', 'über', 'niño', 'mañana', 'crème', 'brûlée',
+    'привет', 'мир', 'γειά', 'σου', 'κόσμε', '你好', '世界', 'こんにちは', 'नमस्ते', 'दुनिया',
+    'مرحبا', 'بالعالم', 'hello', 'world', 'the', 'and'
+]
+_TAGS = ['p', 'div', 'span', 'li', 'td', 'h2', 'em', 'strong']
+
+
+def _tweet(rng):
+
+    words = rng.choices(_WORDS, k=rng.randint(8, 20))
+    for _ in range(rng.randint(0, 2)):
+        words.insert(rng.randrange(len(words) + 1), '@' + rng.choice(_WORDS) + str(rng.randint(0, 99)))
+    for _ in range(rng.randint(0, 2)):
+        words.insert(rng.randrange(len(words) + 1), '#' + rng.choice(_WORDS))
+    if rng.random() < 0.6:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(_DOMAINS))
+    for _ in range(rng.randint(0, 3)):
+        words.insert(rng.randrange(len(words) + 1), rng.choice(_EMOJIS))
+    return ' '.join(words) + rng.choice(['!', '.', '?', '...', ''])
+
+
+def _html(rng):
+
+    blocks = []
+    for _ in range(rng.randint(40, 120)):
+        tag = rng.choice(_TAGS)
+        text = ' '.join(rng.choices(_WORDS, k=rng.randint(5, 25)))
+        if rng.random() < 0.3:
+            text += f' <a href="https://{rng.choice(_DOMAINS)}">link</a>'
+        if rng.random() < 0.2:
+            text += ' &amp; &quot;quoted&quot; &lt;b&gt;'
+        blocks.append(f'<{tag} class="c{rng.randint(0, 9)}">{text}</{tag}>\n\t')
+    return '<html><head><title>page</title></head><body>' + ''.join(blocks) + '</body></html>'
+
+
+def _numeric(rng):
+
+    parts = []
+    for _ in range(rng.randint(8, 20)):
+        if rng.random() < 0.5:
+            parts.append(rng.choice(_WORDS))
+        else:
+            number = rng.randint(0, 10 ** rng.randint(1, 7))
+            parts.append(f'{number:,}' if rng.random() < 0.3 else str(number))
+    return ' '.join(parts)
+
+
+def _multilingual(rng):
+
+    return ' '.join(rng.choices(_MULTILINGUAL, k=rng.randint(10, 30)))
+
+
+CORPORA = {
+    'tweets': (_tweet, 1),
+    'html': (_html, 20),
+    'numeric': (_numeric, 1),
+    'multilingual': (_multilingual, 1)
+}
+
+
+def make_corpus(name, size, seed=0):
+    """Deterministic synthetic corpus
+
+    Parameters
+    ----------
+    name: string ('tweets', 'html', 'numeric', 'multilingual')
+    size: int, number of documents (html pages are generated 20 times fewer)
+    seed: int, default=0
+
+    Returns
+    -------
+    corpus : list of strings
+    """
+    generator, scale = CORPORA[name]
+    rng = random.Random(f'{name}-{seed}')
+    return [generator(rng) for _ in range(max(1, size // scale))]
+
+
+def _cases():
+
+    from . import text as sdt
+
+    return [
+        ('urlRecast', lambda: sdt.urlRecast(), ['tweets', 'html']),
+        ('urlRecast[extract_remove]', lambda: sdt.urlRecast(process='extract_remove'), ['tweets']),
+        ('htmlRecast', lambda: sdt.htmlRecast(), ['html']),
+        ('EscapeSequencesRecast', lambda: sdt.EscapeSequencesRecast(), ['html']),
+        ('MentionsRecast', lambda: sdt.MentionsRecast(), ['tweets']),
+        ('ContractionsRecast', lambda: sdt.ContractionsRecast(), ['tweets']),
+        ('CaseRecast', lambda: sdt.CaseRecast(), ['tweets', 'multilingual']),
+        ('EmojiRecast', lambda: sdt.EmojiRecast(), ['tweets']),
+        ('EmojiRecast[replace]', lambda: sdt.EmojiRecast(process='replace'), ['tweets']),
+        ('HashtagsRecast', lambda: sdt.HashtagsRecast(), ['tweets']),
+        ('ShortWordsRecast', lambda: sdt.ShortWordsRecast(), ['tweets', 'multilingual']),
+        ('StopWordsRecast', lambda: sdt.StopWordsRecast(), ['tweets']),
+        ('DictionaryRecast', lambda: sdt.DictionaryRecast(_DICTIONARY), ['tweets']),
+        ('NumbersRecast', lambda: sdt.NumbersRecast(), ['numeric']),
+        ('NumbersRecast[replace]', lambda: sdt.NumbersRecast(process='replace', seperator=','), ['numeric']),
+        ('AlphabetRecast', lambda: sdt.AlphabetRecast(), ['multilingual']),
+        ('PunctuationsRecast', lambda: sdt.PunctuationsRecast(), ['tweets']),
+        ('TokenisationRecast', lambda: sdt.TokenisationRecast(method='word'), ['tweets']),
+        ('StemmingRecast', lambda: sdt.StemmingRecast(), ['tweets']),
+        ('LemmatizationRecast', lambda: sdt.LemmatizationRecast(), ['tweets']),
+        ('VectorisationRecast', lambda: sdt.VectorisationRecast(n_features=2**18, ngram_range=(1, 2)), ['tweets']),
+        ('Pipeline[social]', lambda: sdt.Pipeline([
+            sdt.urlRecast(), sdt.MentionsRecast(), sdt.HashtagsRecast(), sdt.EmojiRecast(),
+            sdt.CaseRecast(), sdt.PunctuationsRecast()
+        ], verbose=0), ['tweets']),
+        ('Pipeline[html]', lambda: sdt.Pipeline([
+            sdt.htmlRecast(), sdt.EscapeSequencesRecast(), sdt.urlRecast(), sdt.CaseRecast(),
+            sdt.PunctuationsRecast()
+        ], verbose=0), ['html']),
+        ('Pipeline[normalise]', lambda: sdt.Pipeline([
+            sdt.ContractionsRecast(), sdt.CaseRecast(), sdt.NumbersRecast(), sdt.AlphabetRecast(),
+            sdt.ShortWordsRecast()
+        ], verbose=0), ['numeric', 'multilingual'])
+    ]
+
+
+def _measure(factory, data, repeat):
+
+    nbytes = sum(len(text.encode('utf-8')) for text in data)
+    wall, cpu = [], []
+    for _ in range(repeat):
+        rec = factory()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        rec.setup_recast(list(data))
+        wall.append(time.perf_counter() - start_wall)
+        cpu.append(time.process_time() - start_cpu)
+
+    rec = factory()
+    tracemalloc.start()
+    try:
+        rec.setup_recast(list(data))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    seconds = statistics.median(wall)
+    return {
+        'docs': len(data),
+        'bytes': nbytes,
+        'wall_s': wall,
+        'cpu_s': cpu,
+        'median_s': seconds,
+        'docs_per_s': len(data) / seconds if seconds else None,
+        'mb_per_s': nbytes / 1e6 / seconds if seconds else None,
+        'peak_memory_bytes': peak
+    }
+
+
+def _environment():
+
+    from .text.cache import _library_versions
+
+    return {
+        'swachhdata': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'libraries': _library_versions()
+    }
+
+
+def run(size=1000, repeat=3, seed=0, only=None, log=None):
+    """Run the benchmark suite
+
+    Parameters
+    ----------
+    size: int, documents per corpus, default=1000
+    repeat: int, timed runs per case, default=3
+    seed: int, corpus seed, default=0
+    only: list of strings, case names to run, default=None (all)
+    log: file, progress stream, default=None
+
+    Returns
+    -------
+    report : dict
+        environment, parameters and one result per (case, corpus)
+    """
+    corpora = {name: make_corpus(name, size, seed) for name in CORPORA}
+    results = []
+
+    for name, factory, corpus_names in _cases():
+        if only and name not in only:
+            continue
+
+        for corpus in corpus_names:
+            result = {'case': name, 'corpus': corpus}
+            try:
+                result.update(_measure(factory, corpora[corpus], repeat))
+                result['status'] = 'ok'
+            except Exception as exc:
+                result['status'] = 'skipped'
+                result['error'] = f"{type(exc).__name__}: {' '.join(str(exc).split())[:200]}"
+            results.append(result)
+
+            if log is not None:
+                if result['status'] == 'ok':
+                    print(f"{name:<28} {corpus:<13} {result['docs_per_s']:>12.1f} docs/s "
+                          f"{result['mb_per_s']:>8.2f} MB/s {result['peak_memory_bytes'] / 2**20:>8.2f} MiB peak",
+                          file=log)
+                else:
+                    print(f"{name:<28} {corpus:<13} skipped ({result['error']})", file=log)
+
+    return {
+        'environment': _environment(),
+        'parameters': {'size': size, 'repeat': repeat, 'seed': seed},
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'results': results
+    }
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m swachhdata.bench', description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000, help='documents per corpus (default: 1000)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed (default: 0)')
+    parser.add_argument('--only', nargs='+', metavar='CASE', help='only run the given cases')
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--quiet', action='store_true', help='do not print progress to stderr')
+    args = parser.parse_args(argv)
+
+    report = run(size=args.size, repeat=args.repeat, seed=args.seed, only=args.only,
+                 log=None if args.quiet else sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
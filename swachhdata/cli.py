@@ -0,0 +1,337 @@
+"""Command line interface of swachhdata.
+
+Clean CSV, JSONL or plain text files (optionally gzip compressed) through a
+Pipeline, chunk by chunk in parallel workers, streaming the output in the
+original order::
+
+    swachhdata clean --pipeline url,mentions:process=extract_remove,case tweets.jsonl.gz -o clean.jsonl
+    zcat pages.txt.gz | swachhdata clean --pipeline '[{"recast": "htmlRecast"}, "CaseRecast"]' --jobs 4 > clean.txt
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from . import __version__
+
+FORMATS = ('txt', 'csv', 'jsonl')
+_GZIP_MAGIC = b'\x1f\x8b'
+
+_PIPELINE = None
+
+
+def _recasts():
+
+    from . import text as sdt
+
+    recasts = {}
+    for name in sdt.__all__:
+        if name.endswith('Recast'):
+            recasts[name.lower()] = recasts[name[:-len('Recast')].lower()] = getattr(sdt, name)
+    return recasts
+
+
+def _value(value):
+
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def parse_spec(spec):
+    """Parse a pipeline spec into a list of (recast name, parameters)
+
+    Parameters
+    ----------
+    spec: string
+        JSON list (or path of a JSON file) whose items are recast names or
+        objects {"recast": name, parameter: value, ...}, or the compact form
+        name[:parameter=value[:...]][,name...]
+
+    Returns
+    -------
+    stages : list of tuple(s)
+    """
+    if os.path.isfile(spec):
+        with open(spec, 'r', encoding='utf-8') as fh:
+            spec = fh.read()
+
+    if spec.lstrip().startswith('['):
+        stages = []
+        for item in json.loads(spec):
+            if isinstance(item, str):
+                stages.append((item, {}))
+            elif isinstance(item, dict) and 'recast' in item:
+                params = dict(item)
+                stages.append((params.pop('recast'), params))
+            else:
+                raise ValueError(
+                    f'Expected a recast name or an object with a recast key, got {item}'
+                )
+        return stages
+
+    stages = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, *params = item.split(':')
+        kwargs = {}
+        for param in params:
+            key, sep, value = param.partition('=')
+            if not sep:
+                raise ValueError(
+                    f'Expected parameter=value in {item}, got {param}'
+                )
+            kwargs[key.strip()] = _value(value.strip())
+        stages.append((name.strip(), kwargs))
+    return stages
+
+
+def build_pipeline(stages):
+    """Pipeline from the (recast name, parameters) of parse_spec"""
+
+    from .text import Pipeline
+
+    recasts = _recasts()
+    chain = []
+    for name, params in stages:
+        key = name.lower()
+        if key not in recasts:
+            raise ValueError(
+                f'Unknown recast {name}, expected one of {sorted(set(cls.__name__ for cls in recasts.values()))}'
+            )
+        try:
+            chain.append(recasts[key](**params))
+        except TypeError as exc:
+            raise ValueError(
+                f'Invalid parameters {params} for recast {recasts[key].__name__}: {exc}'
+            ) from exc
+
+    if not chain:
+        raise ValueError(
+            'Expected at least one recast in the pipeline spec'
+        )
+    return Pipeline(chain, verbose=0)
+
+
+def _init_worker(stages):
+
+    global _PIPELINE
+    _PIPELINE = build_pipeline(stages)
+
+
+def _clean(texts):
+
+    ntext = _PIPELINE.setup_recast(texts)
+    store = _PIPELINE.extractions
+    return ntext, {name: store[name] for name in store}
+
+
+def _open_input(path):
+
+    if path == '-':
+        raw = sys.stdin.buffer
+    else:
+        raw = open(path, 'rb')
+    if not isinstance(raw, io.BufferedReader):
+        raw = io.BufferedReader(raw)
+    if raw.peek(2)[:2] == _GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding='utf-8', newline='')
+
+
+def _open_output(path):
+
+    if path is None or path == '-':
+        return io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='', write_through=True)
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def _format(path, fmt):
+
+    if fmt is not None:
+        return fmt
+    name = path[:-len('.gz')] if path.endswith('.gz') else path
+    ext = os.path.splitext(name)[1].lstrip('.').lower()
+    return {'ndjson': 'jsonl'}.get(ext, ext if ext in FORMATS else 'txt')
+
+
+def _read_records(paths, fmt, column):
+    """
+    Yield (record, text) of every input document, record being None for txt
+    """
+    for path in paths:
+        fh = _open_input(path)
+        try:
+            if fmt == 'txt':
+                for line in fh:
+                    yield None, line.rstrip('\r\n')
+            elif fmt == 'csv':
+                for record in csv.DictReader(fh):
+                    yield record, record.get(column) or ''
+            else:
+                for line in fh:
+                    if line.strip():
+                        record = json.loads(line)
+                        value = record.get(column)
+                        yield record, value if isinstance(value, str) else ('' if value is None else str(value))
+        finally:
+            fh.close()
+
+
+def _chunks(records, size):
+
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _map_ordered(chunks, jobs, stages):
+    """
+    Clean chunks in up to jobs worker processes, yielding results in input order
+    """
+    if jobs == 1:
+        _init_worker(stages)
+        for chunk in chunks:
+            yield chunk, _clean([text for _, text in chunk])
+        return
+
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(stages,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(_clean, [text for _, text in chunk])))
+            # bound the chunks held in memory while keeping every worker busy
+            if len(pending) >= 2 * jobs:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+class _Writer:
+
+    def __init__(self, fh, fmt, column, output_column):
+
+        self._fh = fh
+        self._fmt = fmt
+        self._column = column
+        self._output_column = output_column or column
+        self._csv = None
+
+    def write(self, chunk, ntext, extracted):
+
+        if self._fmt == 'txt':
+            self._fh.writelines(f'{text}\n' for text in ntext)
+            return
+
+        rows = []
+        for i, ((record, _), text) in enumerate(zip(chunk, ntext)):
+            row = dict(record)
+            row[self._output_column] = text
+            for name, items in extracted.items():
+                row[name] = items[i]
+            rows.append(row)
+
+        if self._fmt == 'jsonl':
+            self._fh.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+            return
+
+        for row in rows:
+            for name in extracted:
+                row[name] = json.dumps(row[name], ensure_ascii=False)
+        if self._csv is None and rows:
+            self._csv = csv.DictWriter(self._fh, fieldnames=list(rows[0]), extrasaction='ignore')
+            self._csv.writeheader()
+        self._csv.writerows(rows)
+
+
+def clean(paths, pipeline, output=None, fmt=None, column='text', output_column=None, jobs=1, chunk_size=1000):
+    """Clean files through a Pipeline
+
+    Parameters
+    ----------
+    paths: list of strings, input files, '-' for stdin
+    pipeline: string, pipeline spec (see parse_spec)
+    output: string, output file, default=None (stdout), gzip compressed if ending in .gz
+    fmt: string ('txt', 'csv', 'jsonl'), default=None (from the first input's extension)
+    column: string, text column of csv / jsonl inputs, default='text'
+    output_column: string, column the cleaned text is written to, default=None (column)
+    jobs: int, worker processes, default=1
+    chunk_size: int, documents per chunk, default=1000
+
+    Returns
+    -------
+    documents : int
+        number of documents cleaned
+    """
+    if jobs < 1 or chunk_size < 1:
+        raise ValueError(
+            f'Expected jobs and chunk_size to be positive, got {jobs} and {chunk_size}'
+        )
+
+    stages = parse_spec(pipeline)
+    # fail on a bad spec before reading any input
+    build_pipeline(stages)
+
+    fmt = _format(paths[0], fmt)
+    records = _read_records(paths, fmt, column)
+    documents = 0
+    fh = _open_output(output)
+    try:
+        writer = _Writer(fh, fmt, column, output_column)
+        for chunk, (ntext, extracted) in _map_ordered(_chunks(records, chunk_size), jobs, stages):
+            writer.write(chunk, ntext, extracted)
+            documents += len(chunk)
+    finally:
+        if output is None or output == '-':
+            fh.flush()
+            fh.detach()
+        else:
+            fh.close()
+    return documents
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='swachhdata', description=__doc__.splitlines()[0])
+    parser.add_argument('--version', action='version', version=f'swachhdata {__version__}')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_clean = commands.add_parser('clean', help='clean files through a pipeline of recasts',
+                                       description=__doc__.split('\n\n')[1].replace('\n', ' '))
+    parser_clean.add_argument('inputs', nargs='*', default=['-'], metavar='INPUT',
+                              help="input files, optionally gzip compressed (default: '-', stdin)")
+    parser_clean.add_argument('-p', '--pipeline', required=True,
+                              help='JSON list of recasts, path of a JSON file or name[:param=value],...')
+    parser_clean.add_argument('-o', '--output', help='output file, gzip compressed if ending in .gz (default: stdout)')
+    parser_clean.add_argument('-f', '--format', choices=FORMATS, help='input and output format (default: from extension)')
+    parser_clean.add_argument('-c', '--column', default='text', help='text column of csv / jsonl inputs (default: text)')
+    parser_clean.add_argument('--output-column', help='column the cleaned text is written to (default: --column)')
+    parser_clean.add_argument('-j', '--jobs', type=int, default=1,
+                              help='worker processes, 0 for one per CPU (default: 1)')
+    parser_clean.add_argument('--chunk-size', type=int, default=1000, help='documents per chunk (default: 1000)')
+    args = parser.parse_args(argv)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    try:
+        clean(args.inputs, args.pipeline, output=args.output, fmt=args.format, column=args.column,
+              output_column=args.output_column, jobs=jobs, chunk_size=args.chunk_size)
+    except BrokenPipeError:
+        # downstream consumer (e.g. head) closed the pipe
+        sys.stderr.close()
+    except (ValueError, OSError) as exc:
+        parser.exit(1, f'swachhdata: error: {exc}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,18 @@ from .core import (
     TextDatum
 )
 
+from .corpus import (
+    CorpusWriter,
+    MappedCorpus,
+    recast_corpus,
+    write_corpus
+)
+
 __all__ = [
     'BaseTextDatum',
-    'TextDatum'
+    'TextDatum',
+    'CorpusWriter',
+    'MappedCorpus',
+    'recast_corpus',
+    'write_corpus'
 ]
\ No newline at end of file
@@ -11,6 +11,11 @@ from ..utils.probe import (
     probe_string_data
 )
 
+from .corpus import (
+    MappedCorpus,
+    write_corpus
+)
+
 class BaseTextDatum:
 
     """
@@ -49,6 +54,19 @@ class TextDatum(BaseTextDatum):
 
     def __init__(self, text):
         super().__init__(text)
+
+    @classmethod
+    def mmap(cls, path):
+        """
+        TextDatum over a corpus file written by write_corpus, documents are decoded lazily
+        """
+        return cls(MappedCorpus(path))
+
+    def to_corpus(self, path):
+        """
+        Write the data to path in the memory-mappable corpus format
+        """
+        return write_corpus(path, self.data)
     
     def __str__(self):
         return str(self.data)
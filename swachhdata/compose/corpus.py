@@ -0,0 +1,234 @@
+import mmap
+import os
+
+import numpy
+
+MAGIC = b'SWDCORP1'
+_FOOTER = len(MAGIC) + 8
+
+
+class CorpusWriter:
+    """Stream documents into the memory-mappable corpus format.
+
+    Layout: magic, the UTF-8 encoded documents back to back, the len + 1
+    document offsets into them (uint64 little endian), the number of
+    documents (uint64) and magic again. Offsets are written last so a
+    corpus of any size is written with a single pass. The corpus is
+    written next to path and only moved there by close, a writer left
+    on an exception is discarded.
+
+    Parameters
+    ----------
+    path: string
+
+    Examples
+    --------
+    >>> with CorpusWriter('clean.swc') as writer:
+    ...     for chunk in chunks:
+    ...         writer.extend(pipeline.setup_recast(chunk))
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+        self._partial = f'{path}.{os.getpid()}.partial'
+        self._fh = open(self._partial, 'wb')
+        self._fh.write(MAGIC)
+        self._offsets = [0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def write(self, text):
+
+        if not isinstance(text, str):
+            raise ValueError(
+                'All items in list should be of type str'
+            )
+        encoded = text.encode('utf-8')
+        self._fh.write(encoded)
+        self._offsets.append(self._offsets[-1] + len(encoded))
+
+    def extend(self, texts):
+
+        for text in texts:
+            self.write(text)
+
+    def close(self):
+
+        if self._fh is None:
+            return
+        self._fh.write(numpy.asarray(self._offsets, dtype='<u8').tobytes())
+        self._fh.write(numpy.uint64(len(self)).astype('<u8').tobytes())
+        self._fh.write(MAGIC)
+        self._fh.close()
+        self._fh = None
+        os.replace(self._partial, self.path)
+
+    def discard(self):
+        """
+        Drop the documents written so far, leaving path untouched
+        """
+        if self._fh is None:
+            return
+        self._fh.close()
+        self._fh = None
+        os.remove(self._partial)
+
+
+def write_corpus(path, texts):
+    """Write texts to path in the memory-mappable corpus format
+
+    Returns
+    -------
+    documents : int
+        number of documents written
+    """
+    with CorpusWriter(path) as writer:
+        writer.extend(texts)
+    return len(writer)
+
+
+class MappedCorpus:
+    """Read-only, memory-mapped corpus written by CorpusWriter / write_corpus.
+
+    Documents are decoded lazily on access, slices return lists of strings so
+    chunks can be recast directly. Pickling only carries the path, workers
+    re-map the same file and share its pages.
+
+    Parameters
+    ----------
+    path: string
+
+    Examples
+    --------
+    >>> from swachhdata.compose import MappedCorpus, write_corpus
+    >>> write_corpus('tweets.swc', ['Follow @jondoe', 'visit www.samplewebsite.com'])
+    2
+    >>> corpus = MappedCorpus('tweets.swc')
+    >>> len(corpus), corpus[1]
+    (2, 'visit www.samplewebsite.com')
+    >>> corpus[0:2]
+    ['Follow @jondoe', 'visit www.samplewebsite.com']
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+        self.id_mapped_corpus = None
+        self.__open()
+
+    def __open(self):
+
+        with open(self.path, 'rb') as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if size < len(MAGIC) + _FOOTER:
+                raise ValueError(
+                    f'{self.path} is not a swachhdata corpus'
+                )
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC or self._mmap[-len(MAGIC):] != MAGIC:
+            self._mmap.close()
+            raise ValueError(
+                f'{self.path} is not a swachhdata corpus'
+            )
+
+        count = int(numpy.frombuffer(self._mmap, dtype='<u8', count=1, offset=size - _FOOTER)[0])
+        start = size - _FOOTER - 8 * (count + 1)
+        self._offsets = numpy.frombuffer(self._mmap, dtype='<u8', count=count + 1, offset=start)
+        self._base = len(MAGIC)
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+
+        self.path = state['path']
+        self.id_mapped_corpus = None
+        self.__open()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return [self.__decode(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('MappedCorpus index out of range')
+        return self.__decode(index)
+
+    def __iter__(self):
+
+        for i in range(len(self)):
+            yield self.__decode(i)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __repr__(self):
+        return f'MappedCorpus({self.path!r}, documents={len(self)})'
+
+    def __decode(self, index):
+
+        start = self._base + int(self._offsets[index])
+        stop = self._base + int(self._offsets[index + 1])
+        return self._mmap[start:stop].decode('utf-8')
+
+    @property
+    def nbytes(self):
+        """
+        Size of the UTF-8 blob in bytes
+        """
+        return int(self._offsets[-1])
+
+    def chunks(self, size):
+        """
+        (start, stop) ranges of up to size documents, e.g. to dispatch to workers
+        """
+        return [(start, min(start + size, len(self))) for start in range(0, len(self), size)]
+
+    def close(self):
+
+        del self._offsets
+        self._mmap.close()
+
+
+def recast_corpus(recast, source, dest, chunk_size=10000):
+    """Recast a mapped corpus chunk by chunk, writing the output in the same format
+
+    Parameters
+    ----------
+    recast: Pipeline / recast
+    source: MappedCorpus / string (path)
+    dest: string (path)
+    chunk_size: int (>0), default=10000
+        documents decoded and recast at a time
+
+    Returns
+    -------
+    documents : int
+        number of documents written
+    """
+    corpus = source if hasattr(source, 'id_mapped_corpus') else MappedCorpus(source)
+    try:
+        with CorpusWriter(dest) as writer:
+            for start, stop in corpus.chunks(chunk_size):
+                writer.extend(recast.setup_recast(corpus[start:stop]))
+    finally:
+        if corpus is not source:
+            corpus.close()
+    return len(writer)
@@ -9,14 +9,28 @@ from .recast import (
     HashtagsRecast,
     ShortWordsRecast,
     StopWordsRecast,
+    DictionaryRecast,
     NumbersRecast,
     AlphabetRecast,
     PunctuationsRecast,
     StemmingRecast,
     LemmatizationRecast,
-    TokenisationRecast
+    TokenisationRecast,
+    VectorisationRecast
 )
 
+from .pipeline import Pipeline
+from .dag import PipelineDAG
+from .plan import CompiledPipeline
+from .optimizer import StageProperties
+from .resources import SpacyModel
+from .batching import BatchCoalescer
+from .cache import PrefixCache, ResultCache
+from .store import ExtractionStore
+from .tokens import TokenizedCorpus, Vocabulary
+from .automaton import Automaton
+from .stats import MetricsCallback, PipelineStats, SlowLog, StageStats, StatsCallback
+
 __all__ = [
     'urlRecast',
     'htmlRecast',
@@ -28,10 +42,29 @@ __all__ = [
     'EmojiRecast',
     'ShortWordsRecast',
     'StopWordsRecast',
+    'DictionaryRecast',
     'NumbersRecast',
     'AlphabetRecast',
     'PunctuationsRecast',
     'StemmingRecast',
     'LemmatizationRecast',
-    'TokenisationRecast'
+    'TokenisationRecast',
+    'VectorisationRecast',
+    'Pipeline',
+    'PipelineDAG',
+    'CompiledPipeline',
+    'StageProperties',
+    'SpacyModel',
+    'BatchCoalescer',
+    'ResultCache',
+    'PrefixCache',
+    'ExtractionStore',
+    'TokenizedCorpus',
+    'Vocabulary',
+    'Automaton',
+    'PipelineStats',
+    'StageStats',
+    'SlowLog',
+    'StatsCallback',
+    'MetricsCallback'
 ]
\ No newline at end of file
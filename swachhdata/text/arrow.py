@@ -0,0 +1,178 @@
+import os
+
+from .plan import _flatten
+
+FORMATS = ('parquet', 'arrow')
+
+
+def _pyarrow():
+
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError(
+            'Parquet / Arrow IPC streaming requires pyarrow, install it with: pip install pyarrow'
+        ) from exc
+    return pyarrow
+
+
+def _format(path, fmt):
+
+    if fmt is not None:
+        if fmt not in FORMATS:
+            raise ValueError(
+                f'Expected format to be one of {FORMATS}, got {fmt}'
+            )
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    return 'arrow' if ext in ('.arrow', '.feather', '.ipc', '.arrows') else 'parquet'
+
+
+def read_batches(path, batch_size=65536, columns=None, format=None):
+    """Stream record batches of a Parquet or Arrow IPC file
+
+    Parameters
+    ----------
+    path: string
+    batch_size: int (>0), default=65536
+        rows per batch, Arrow IPC files keep the batches they were written with
+    columns: list of strings, default=None (all)
+        only read these columns
+    format: string ('parquet', 'arrow'), default=None (from the extension)
+
+    Returns
+    -------
+    batches : iterator of pyarrow.RecordBatch
+    """
+    pa = _pyarrow()
+
+    if _format(path, format) == 'parquet':
+        yield from pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns)
+        return
+
+    with pa.memory_map(path, 'r') as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            batches = pa.ipc.open_stream(source)
+        for batch in batches:
+            yield batch.select(columns) if columns is not None else batch
+
+
+def _extraction_type(pa, pipeline, name):
+    """
+    Item type of extraction name, from the stage extracting it so every
+    batch has the same schema, even one without any item
+    """
+    for rec in _flatten(pipeline.chain):
+        # DictionaryRecast(spans=True) extracts (match, start, end) tuples
+        if getattr(rec, '_extract_attr', None) == name and getattr(rec, '_spans', False):
+            return pa.struct([('match', pa.string()), ('start', pa.int64()), ('end', pa.int64())])
+    return pa.string()
+
+
+def _extraction_arrays(pa, pipeline, store):
+
+    arrays = {}
+    for name in store:
+        offsets = pa.array(store.offsets(name), type=pa.int32())
+        values = pa.array(store.values(name).tolist(), type=_extraction_type(pa, pipeline, name))
+        arrays[name] = pa.ListArray.from_arrays(offsets, values)
+    return arrays
+
+
+def recast_batch(pipeline, batch, column='text', output_column=None):
+    """Recast column of a record batch through pipeline
+
+    Returns
+    -------
+    batch : pyarrow.RecordBatch
+        batch with the cleaned column (output_column, default=column) and
+        one list<string> column per extraction of the pipeline,
+        list<struct<match, start, end>> for DictionaryRecast(spans=True)
+    """
+    pa = _pyarrow()
+
+    text = pa.compute.fill_null(batch.column(column).cast(pa.string()), '')
+    ntext = pipeline.setup_recast(text.to_pylist())
+
+    names, arrays = list(batch.schema.names), list(batch.columns)
+    output_column = output_column or column
+    extracted = {output_column: pa.array(ntext, type=pa.string())}
+    store = getattr(pipeline, 'extractions', None)
+    if store is not None:
+        extracted.update(_extraction_arrays(pa, pipeline, store))
+    for name, array in extracted.items():
+        if name in names:
+            arrays[names.index(name)] = array
+        else:
+            names.append(name)
+            arrays.append(array)
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def recast_file(pipeline, source, dest, column='text', output_column=None, batch_size=65536, columns=None,
+                format=None, output_format=None, compression='snappy'):
+    """Stream a Parquet or Arrow IPC file through pipeline into dest,
+    holding a single batch in memory at a time
+
+    Parameters
+    ----------
+    pipeline: Pipeline / recast
+    source, dest: string (path)
+    column: string, default='text'
+        column to recast
+    output_column: string, default=None (column)
+        column the cleaned text is written to
+    batch_size: int (>0), default=65536
+        rows read, recast and written (as one row group) at a time
+    columns: list of strings, default=None (all)
+        columns read and passed through to dest next to column
+    format, output_format: string ('parquet', 'arrow'), default=None (from the extension)
+    compression: string, default='snappy'
+        Parquet compression codec of dest
+
+    Returns
+    -------
+    rows : int
+        number of rows written
+
+    Examples
+    --------
+    >>> from swachhdata.text import Pipeline, urlRecast, MentionsRecast, CaseRecast
+    >>> from swachhdata.text.arrow import recast_file
+    >>> pipeline = Pipeline([urlRecast(), MentionsRecast(process='extract_remove'), CaseRecast()], verbose=0)
+    >>> recast_file(pipeline, 'tweets.parquet', 'clean.parquet', column='text', batch_size=10000)
+    1000000
+    """
+    pa = _pyarrow()
+
+    if columns is not None and column not in columns:
+        columns = list(columns) + [column]
+    output_format = _format(dest, output_format)
+
+    rows, writer = 0, None
+    try:
+        for batch in read_batches(source, batch_size=batch_size, columns=columns, format=format):
+            batch = recast_batch(pipeline, batch, column=column, output_column=output_column)
+            if writer is None:
+                if output_format == 'parquet':
+                    writer = pa.parquet.ParquetWriter(dest, batch.schema, compression=compression)
+                else:
+                    writer = pa.ipc.new_file(dest, batch.schema)
+
+            if output_format == 'parquet':
+                writer.write_batch(batch, row_group_size=len(batch))
+            else:
+                writer.write_batch(batch)
+            rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return rows
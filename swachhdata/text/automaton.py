@@ -0,0 +1,201 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _word_char(char):
+    return char.isalnum() or char == '_'
+
+
+def normalise(text, ignore_case):
+    """
+    Lowercase text without changing its length, so spans map back to the original
+    """
+    if not ignore_case:
+        return text
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+class Automaton:
+    """Aho-Corasick automaton over a dictionary of terms, finding every
+    occurrence of every term in time linear in the length of the text.
+
+    Backed by pyahocorasick when installed, by pure python tables otherwise.
+
+    Parameters
+    ----------
+    terms: list of strings
+    ignore_case: bool (True, False), default=True
+    word_boundary: bool (True, False), default=True
+        only match terms not preceded or followed by a letter, digit or _
+
+    Examples
+    --------
+    >>> automaton = Automaton(['new york', 'york', 'john doe'])
+    >>> automaton.findall('John Doe moved to New York')
+    [(0, 8, 2), (18, 26, 0)]
+    >>> automaton.save('names.automaton')
+    >>> automaton = Automaton.load('names.automaton')
+    """
+
+    def __init__(self, terms, ignore_case=True, word_boundary=True):
+
+        self.ignore_case = ignore_case
+        self.word_boundary = word_boundary
+        self.terms = self.unique(terms, ignore_case)
+        self.digest = self.digest_of(self.terms, ignore_case, word_boundary)
+
+        keys = [normalise(term, ignore_case) for term in self.terms]
+        if ahocorasick is not None:
+            self._native = ahocorasick.Automaton()
+            for i, key in enumerate(keys):
+                self._native.add_word(key, (i, len(key)))
+            if keys:
+                self._native.make_automaton()
+        else:
+            self._native = None
+            self.__build(keys)
+
+    def __len__(self):
+        return len(self.terms)
+
+    @staticmethod
+    def unique(terms, ignore_case=True):
+        """
+        Non empty terms in order, without duplicates under ignore_case
+        """
+        unique = {}
+        for term in terms:
+            key = normalise(term, ignore_case)
+            if key and key not in unique:
+                unique[key] = term
+        return list(unique.values())
+
+    @staticmethod
+    def digest_of(terms, ignore_case=True, word_boundary=True):
+        """
+        Digest identifying the automaton built from terms and options
+        """
+        digest = hashlib.sha256(f'{ignore_case}:{word_boundary}'.encode('utf-8'))
+        for term in terms:
+            digest.update(term.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def __build(self, keys):
+
+        goto, fail, output, link = [{}], [0], [-1], [0]
+        self._lengths = [len(key) for key in keys]
+
+        for i, key in enumerate(keys):
+            state = 0
+            for char in key:
+                following = goto[state].get(char)
+                if following is None:
+                    following = goto[state][char] = len(goto)
+                    goto.append({})
+                    fail.append(0)
+                    output.append(-1)
+                    link.append(0)
+                state = following
+            output[state] = i
+
+        # breadth first, the failure of every state is known before its children
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in goto[state].items():
+                queue.append(following)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[following] = goto[fallback].get(char, 0)
+                target = fail[following]
+                link[following] = target if output[target] >= 0 else link[target]
+
+        self._goto, self._fail, self._output, self._link = goto, fail, output, link
+
+    def __iter_python(self, text):
+
+        goto, fail, output, link, lengths = self._goto, self._fail, self._output, self._link, self._lengths
+        state = 0
+        for end, char in enumerate(text, 1):
+            following = goto[state].get(char)
+            while following is None and state:
+                state = fail[state]
+                following = goto[state].get(char)
+            state = following or 0
+
+            node = state if output[state] >= 0 else link[state]
+            while node:
+                term = output[node]
+                yield end - lengths[term], end, term
+                node = link[node]
+
+    def __iter_native(self, text):
+
+        if not self.terms:
+            return
+        for last, (term, length) in self._native.iter(text):
+            yield last + 1 - length, last + 1, term
+
+    def iter(self, text):
+        """
+        Every occurrence of every term, as (start, end, term index), overlaps included
+        """
+        key = normalise(text, self.ignore_case)
+        matches = self.__iter_native(key) if self._native is not None else self.__iter_python(key)
+        if not self.word_boundary:
+            yield from matches
+            return
+
+        size = len(text)
+        for start, end, term in matches:
+            if start > 0 and _word_char(text[start - 1]) and _word_char(text[start]):
+                continue
+            if end < size and _word_char(text[end]) and _word_char(text[end - 1]):
+                continue
+            yield start, end, term
+
+    def findall(self, text):
+        """
+        Leftmost longest non overlapping occurrences, as (start, end, term index)
+        """
+        matches = sorted(self.iter(text), key=lambda match: (match[0], -match[1]))
+        selected, position = [], 0
+        for start, end, term in matches:
+            if start >= position:
+                selected.append((start, end, term))
+                position = end
+        return selected
+
+    def save(self, path):
+        """
+        Atomically pickle the compiled automaton to path
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(prefix='.swachhdata-', dir=directory)
+        with os.fdopen(fd, 'wb') as fh:
+            pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path):
+
+        with open(path, 'rb') as fh:
+            automaton = pickle.load(fh)
+        if not isinstance(automaton, Automaton):
+            raise ValueError(
+                f'{path} does not hold a swachhdata Automaton'
+            )
+        return automaton
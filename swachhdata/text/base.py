@@ -1,3 +1,7 @@
+import copy
+
+from tqdm.auto import tqdm
+
 from ..compose.core import BaseTextDatum
 from ..utils.exceptions import (
     IncorrectProcessDataType,
@@ -26,6 +30,9 @@ class ModuleTextRecast(BaseTextDatum):
             self._verbose_status = True
         self._verbose = not bool(verbose)
         self.id_base_recast = None
+        self._extract_attr = None
+        self._profiler = None
+        self._progress = None
     
     def setup(self, text):
         """
@@ -52,7 +59,16 @@ class ModuleTextRecast(BaseTextDatum):
         self.setup(text)
         return self.recast()
 
+    def set_progress(self, callback):
+        """
+        Report progress to callback(name, done, total) instead of / next to tqdm,
+        None to remove it
+        """
+        self._progress = callback
+        return self
+
 from .pipeline import Pipeline
+from .stats import SlowLog
 
 class BaseTextRecast(ModuleTextRecast):
 
@@ -75,6 +91,64 @@ class BaseTextRecast(ModuleTextRecast):
             self._verbose_status = True
         self._verbose = not bool(verbose)
         self.id_base_recast = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # expose the private per-document function of every recast to transform_one
+        base_recast = cls.__dict__.get(f'_{cls.__name__}__base_recast')
+        if base_recast is not None:
+            cls._base_recast = base_recast
+
+    def transform_one(self, text):
+        """
+        Recast a single string directly, without setup, type conversion,
+        progress reporting or changes to the recast
+
+        Returns
+        -------
+        ntext : string
+            Processed text, or what recast returns for one document with
+            process='extract' / process='extract_remove'
+        """
+        return self._base_recast(text)
+
+    def transform(self, text):
+        """
+        Recast text without storing anything on the recast: a shallow copy
+        sharing its configuration and compiled resources is setup, recast
+        and dropped, so one recast may serve several threads at once
+
+        Returns
+        -------
+        what setup_recast returns, nothing is kept in data or the
+        extraction attribute
+        """
+        stage = copy.copy(self)
+        stage._setup_check = False
+        stage._profiler = None
+        return stage.setup_recast(text)
+
+    def _applicable(self):
+        """
+        prescan bits of the documents this recast may change, None when any
+        document may be changed; the others are skipped under prefilter
+        """
+        return None
+
+    def _defer(self):
+        """
+        Whether this recast runs as deferred edits under Pipeline(deferred=True):
+        None when it does not, else whether it normalises whitespace after
+        applying the (start, end, replacement) spans of _edit_spans(text)
+        """
+        return None
+
+    def _properties(self):
+        """
+        StageProperties declared for the plan optimizer, None when unknown
+        so the recast is never moved or dropped
+        """
+        return None
     
     def __add__(self, other):
 
@@ -98,3 +172,65 @@ class BaseTextRecast(ModuleTextRecast):
                     f'{other} not found in Pipeline.chain'
                 )
         return Pipeline(self.chain)
+
+    @property
+    def slowlog(self):
+        return self._profiler
+
+    def profile(self, k=10, preview=80):
+        """
+        Log the k slowest documents of every recast, k=None to stop profiling
+
+        Returns
+        -------
+        slowlog : SlowLog
+        """
+        self._profiler = SlowLog(k, preview) if k is not None else None
+        return self._profiler
+
+    _PROGRESS_CHUNK = 1024
+
+    def _recast_map(self, data, func, postfix):
+        """
+        Apply func on every document of data
+
+        Returns
+        -------
+        results : list
+        """
+        if self._verbose and self._progress is None:
+            if self._profiler is not None:
+                return self._profiler.profile(self._name, func, data)
+            return [func(text) for text in data]
+
+        return self.__recast_chunks(data, func, postfix)
+
+    def __recast_chunks(self, data, func, postfix):
+        """
+        Apply func on every document of data, reporting progress once per chunk
+        """
+        total = len(data)
+        step = max(1, min(self._PROGRESS_CHUNK, total // 100))
+        data_tqdm = None
+        if not self._verbose:
+            data_tqdm = tqdm(total=total, leave=self._verbose_status)
+            data_tqdm.set_postfix(postfix)
+
+        results = []
+        try:
+            for start in range(0, total, step):
+                chunk = data[start:start + step]
+                if self._profiler is not None:
+                    results.extend(self._profiler.profile(self._name, func, chunk, start))
+                else:
+                    results.extend([func(text) for text in chunk])
+
+                if data_tqdm is not None:
+                    data_tqdm.update(len(chunk))
+                if self._progress is not None:
+                    self._progress(self._name, start + len(chunk), total)
+        finally:
+            if data_tqdm is not None:
+                data_tqdm.close()
+
+        return results
@@ -0,0 +1,163 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchCoalescer:
+    """Thread safe front-end grouping single documents submitted by many
+    callers into batches recast by one background thread.
+
+    A batch is recast once it holds max_batch_size documents or its oldest
+    document has waited max_wait_us microseconds, bounding the latency
+    added to every document.
+
+    Parameters
+    ----------
+    recast: Pipeline / recast
+        only ever called from the background thread
+    max_batch_size: int (>0), default=64
+    max_wait_us: int (>=0), default=1000
+    extractions: bool (True, False), default=False
+        resolve futures with (ntext, {extraction: items}) instead of ntext
+
+    Attributes
+    ----------
+    batches : int
+        number of batches recast
+    documents : int
+        number of documents recast
+
+    Examples
+    --------
+    >>> from swachhdata.text import BatchCoalescer, Pipeline, urlRecast, CaseRecast
+    >>> coalescer = BatchCoalescer(Pipeline([urlRecast(), CaseRecast()], verbose=0), max_batch_size=128, max_wait_us=500)
+    >>> # in every request handler thread
+    >>> coalescer.submit('Visit www.samplewebsite.com').result()
+    'visit'
+    >>> coalescer.close()
+    """
+
+    def __init__(self, recast, max_batch_size=64, max_wait_us=1000, extractions=False):
+
+        if not isinstance(max_batch_size, int) or max_batch_size < 1:
+            raise ValueError(
+                f'Expected max_batch_size to be a positive int, got {max_batch_size}'
+            )
+        if max_wait_us < 0:
+            raise ValueError(
+                f'Expected max_wait_us to be >= 0, got {max_wait_us}'
+            )
+
+        self._recast = recast
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_us / 1e6
+        self._extractions = extractions
+        self._pending = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self.batches = 0
+        self.documents = 0
+        self._thread = threading.Thread(target=self.__run, name='swachhdata-coalescer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def mean_batch_size(self):
+        return self.documents / self.batches if self.batches else 0.0
+
+    def submit(self, text):
+        """
+        Queue text for the next batch, a non str text is rejected
+        here rather than failing the batch it would have joined
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            resolved with the recast text
+        """
+        if not isinstance(text, str):
+            raise ValueError(
+                f'Expected text to be of type str, got {type(text).__name__}'
+            )
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('BatchCoalescer is closed')
+            self._pending.append((text, future, time.perf_counter()))
+            # wake the worker when idle or when a batch is complete
+            if len(self._pending) == 1 or len(self._pending) >= self._max_batch_size:
+                self._condition.notify()
+        return future
+
+    def submit_many(self, texts):
+
+        texts = list(texts)
+        for text in texts:
+            if not isinstance(text, str):
+                raise ValueError(
+                    f'Expected texts to be of type str, got {type(text).__name__}'
+                )
+        return [self.submit(text) for text in texts]
+
+    def __next_batch(self):
+
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            while self._pending and len(self._pending) < self._max_batch_size and not self._closed:
+                remaining = self._pending[0][2] + self._max_wait - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = self._pending[:self._max_batch_size]
+            del self._pending[:self._max_batch_size]
+            return batch
+
+    def __run(self):
+
+        while True:
+            batch = self.__next_batch()
+            if not batch:
+                return
+            self.__flush(batch)
+
+    def __flush(self, batch):
+
+        batch = [(text, future) for text, future, _ in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            ntext = self._recast.setup_recast([text for text, _ in batch])
+            if isinstance(ntext, tuple):
+                ntext = ntext[0]
+            store = getattr(self._recast, 'extractions', None) if self._extractions else None
+            extracted = {name: store[name] for name in store} if store is not None else {}
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.documents += len(batch)
+        for i, (_, future) in enumerate(batch):
+            if self._extractions:
+                future.set_result((ntext[i], {name: items[i] for name, items in extracted.items()}))
+            else:
+                future.set_result(ntext[i])
+
+    def close(self, wait=True):
+        """
+        Recast the documents still queued and stop the background thread
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if wait:
+            self._thread.join()
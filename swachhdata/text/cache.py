@@ -0,0 +1,525 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import platform
+import re
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import metadata
+
+from .. import __version__
+
+_RUNTIME_ATTRS = {'_data', '_setup_check', '_verbose', '_verbose_status', '_profiler', '_progress'}
+_LIBRARIES = ['regex', 'beautifulsoup4', 'lxml', 'contractions', 'nltk', 'spacy', 'num2words', 'emoji']
+
+
+class LRUCache:
+    """Bounded least-recently-used store for memoized recast results.
+
+    Parameters
+    ----------
+    maxsize: int (>0), default=None
+        maximum number of entries kept, None for unbounded
+
+    Attributes
+    ----------
+    hits : int
+        number of successful lookups
+    misses : int
+        number of failed lookups
+    """
+
+    def __init__(self, maxsize=None):
+
+        if maxsize is not None and (not isinstance(maxsize, int) or maxsize < 1):
+            raise ValueError(
+                f'Expected maxsize to be a positive int or None, got {maxsize}'
+            )
+
+        self._maxsize = maxsize
+        self._store = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._store)
+
+    def __contains__(self, key):
+        return key in self._store
+
+    def get(self, key, default=None):
+        """
+        Fetch key, marking it as most recently used
+        """
+        try:
+            value = self._store[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._store.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store key, evicting the least recently used entries beyond maxsize
+        """
+        self._store[key] = value
+        self._store.move_to_end(key)
+
+        if self._maxsize is not None:
+            while len(self._store) > self._maxsize:
+                self._store.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop all entries and reset the counters
+        """
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+@lru_cache(maxsize=None)
+def _library_versions():
+
+    versions = {}
+    for library in _LIBRARIES:
+        try:
+            versions[library] = metadata.version(library)
+        except metadata.PackageNotFoundError:
+            versions[library] = None
+    return versions
+
+
+@lru_cache(maxsize=None)
+def _source_digest(cls):
+
+    try:
+        source = inspect.getsource(cls)
+    except (OSError, TypeError):
+        return None
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def _canonical(value):
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    elif isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    elif isinstance(value, (set, frozenset)):
+        return sorted((_canonical(item) for item in value), key=repr)
+    elif isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    elif isinstance(value, re.Pattern):
+        return value.pattern
+    # loaded resources, e.g. spaCy models, are identified by their meta data
+    meta = getattr(value, 'meta', None)
+    if isinstance(meta, dict):
+        return {'type': type(value).__qualname__, 'name': meta.get('name'), 'version': meta.get('version')}
+    return {'type': f'{type(value).__module__}.{type(value).__qualname__}'}
+
+
+def stage_fingerprint(rec):
+    """Stable description of a recast stage.
+
+    Covers the class (and a digest of its source), process and every
+    private configuration attribute, e.g. regex or custom stopwords.
+    A nested Pipeline is described by the fingerprint of its chain.
+
+    Returns
+    -------
+    fingerprint : dict
+    """
+    cls = type(rec)
+    if hasattr(rec, 'id_pipeline'):
+        return {'class': f'{cls.__module__}.{cls.__qualname__}', 'chain': rec.fingerprint}
+    params = {key: _canonical(value) for key, value in sorted(vars(rec).items())
+              if key.startswith('_') and key not in _RUNTIME_ATTRS}
+    return {
+        'class': f'{cls.__module__}.{cls.__qualname__}',
+        'source': _source_digest(cls),
+        'params': params
+    }
+
+
+def _digest(description):
+
+    dump = json.dumps(description, sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(dump.encode('utf-8')).hexdigest()
+
+
+def _environment():
+
+    return {
+        'swachhdata': __version__,
+        'python': platform.python_version(),
+        'libraries': _library_versions()
+    }
+
+
+def pipeline_fingerprint(chain):
+    """Stable hash of a chain of recasts and the library versions it runs on.
+
+    Returns
+    -------
+    fingerprint : string
+        sha256 hex digest
+    """
+    description = dict(_environment(), chain=[stage_fingerprint(rec) for rec in chain])
+    return _digest(description)
+
+
+def corpus_fingerprint(data):
+    """Content hash of a list of documents.
+
+    Returns
+    -------
+    fingerprint : string
+        sha256 hex digest
+    """
+    digest = hashlib.sha256()
+    for text in data:
+        text = text.encode('utf-8', 'surrogatepass')
+        digest.update(len(text).to_bytes(8, 'little'))
+        digest.update(text)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Persistent sqlite store for per-document Pipeline results.
+
+    Entries are keyed by the content hash of the document together with
+    the fingerprint of the Pipeline, so changing any stage invalidates
+    its results.
+
+    Parameters
+    ----------
+    path: string
+        sqlite database file, created if it does not exist
+    max_entries: int (>0), default=None
+        evict least recently used entries beyond max_entries
+    max_bytes: int (>0), default=None
+        evict least recently used entries beyond max_bytes of stored results
+
+    Attributes
+    ----------
+    hits : int
+    misses : int
+    writes : int
+    evictions : int
+
+    Examples
+    --------
+    >>> from swachhdata.text import Pipeline, ResultCache, urlRecast, CaseRecast
+    >>> cache = ResultCache('results.sqlite', max_bytes=2**30)
+    >>> pipeline = Pipeline([urlRecast(), CaseRecast()], cache=cache)
+    >>> pipeline.setup_recast(text)
+    >>> cache.stats()
+    {'hits': 0, 'misses': 2, 'writes': 2, 'evictions': 0, 'entries': 2, 'bytes': 134}
+    """
+
+    _BATCH = 500
+
+    def __init__(self, path, max_entries=None, max_bytes=None):
+
+        for name, limit in [('max_entries', max_entries), ('max_bytes', max_bytes)]:
+            if limit is not None and (not isinstance(limit, int) or limit < 1):
+                raise ValueError(
+                    f'Expected {name} to be a positive int or None, got {limit}'
+                )
+
+        self._path = path
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self.__connect()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def __connect(self):
+
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed INTEGER NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+        self._conn.commit()
+
+    # connections cannot be pickled, e.g. into a ProcessPoolExecutor; reopen the file instead
+    def __getstate__(self):
+        state = dict(vars(self))
+        del state['_conn']
+        return state
+
+    def __setstate__(self, state):
+        vars(self).update(state)
+        self.__connect()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    @staticmethod
+    def key(fingerprint, text):
+        """
+        Content key of text recast by the Pipeline with given fingerprint
+        """
+        digest = hashlib.sha256(fingerprint.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def get_many(self, keys):
+        """
+        Fetch the stored results of keys
+
+        Returns
+        -------
+        results : dict
+            key to result, for the keys found
+        """
+        keys = list(keys)
+        results = {}
+        for i in range(0, len(keys), self._BATCH):
+            batch = keys[i:i + self._BATCH]
+            marks = ','.join('?' * len(batch))
+            rows = self._conn.execute(f'SELECT key, value FROM results WHERE key IN ({marks})', batch)
+            for key, value in rows:
+                results[key] = pickle.loads(value)
+
+        if results:
+            now = time.time_ns()
+            self._conn.executemany('UPDATE results SET accessed = ? WHERE key = ?', [(now, key) for key in results])
+            self._conn.commit()
+
+        self.hits += len(results)
+        self.misses += len(keys) - len(results)
+        return results
+
+    def put_many(self, items):
+        """
+        Store (key, result) pairs, then evict beyond the configured bounds
+        """
+        now = time.time_ns()
+        rows = []
+        for key, value in items:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((key, blob, len(blob), now))
+
+        self._conn.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)', rows)
+        self._conn.commit()
+        self.writes += len(rows)
+        self.evict()
+
+    def evict(self):
+        """
+        Drop least recently used entries beyond max_entries / max_bytes
+        """
+        evicted = 0
+        if self._max_entries is not None:
+            excess = len(self) - self._max_entries
+            if excess > 0:
+                evicted += self._conn.execute(
+                    'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed LIMIT ?)', (excess,)
+                ).rowcount
+
+        if self._max_bytes is not None:
+            excess = self.nbytes - self._max_bytes
+            if excess > 0:
+                victims = []
+                for key, size in self._conn.execute('SELECT key, size FROM results ORDER BY accessed'):
+                    victims.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self._conn.executemany('DELETE FROM results WHERE key = ?', victims)
+                evicted += len(victims)
+
+        self._conn.commit()
+        self.evictions += evicted
+        return evicted
+
+    @property
+    def nbytes(self):
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def stats(self):
+        """
+        Cache statistics
+
+        Returns
+        -------
+        stats : dict
+            hits, misses, writes, evictions, entries and bytes stored
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'entries': len(self),
+            'bytes': self.nbytes
+        }
+
+    def clear(self):
+        """
+        Drop all entries
+        """
+        self._conn.execute('DELETE FROM results')
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def _sizeof(value):
+
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class PrefixCache:
+    """Store of intermediate Pipeline outputs after every stage.
+
+    Entries are keyed by the fingerprint of the chain prefix and the content
+    of the input, so a Pipeline sharing a prefix with an earlier one, e.g.
+    after swapping its last stage, resumes from the longest cached prefix.
+    A PrefixCache can be shared between Pipelines.
+
+    Parameters
+    ----------
+    max_bytes: int (>0), default=None
+        approximate bound on the memory held, None for unbounded
+    spill_dir: string, default=None
+        directory least recently used entries are spilled to beyond max_bytes,
+        None to drop them
+
+    Attributes
+    ----------
+    hits : int
+    misses : int
+
+    Examples
+    --------
+    >>> from swachhdata.text import Pipeline, PrefixCache, htmlRecast, urlRecast, StemmingRecast, LemmatizationRecast
+    >>> prefix = PrefixCache(max_bytes=2**30, spill_dir='/tmp/swachhdata')
+    >>> Pipeline([htmlRecast(), urlRecast(), StemmingRecast()], prefix_cache=prefix).setup_recast(text)
+    >>> # htmlRecast and urlRecast are not recast again
+    >>> Pipeline([htmlRecast(), urlRecast(), LemmatizationRecast()], prefix_cache=prefix).setup_recast(text)
+    """
+
+    def __init__(self, max_bytes=None, spill_dir=None):
+
+        if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes < 1):
+            raise ValueError(
+                f'Expected max_bytes to be a positive int or None, got {max_bytes}'
+            )
+
+        self._max_bytes = max_bytes
+        self._spill_dir = spill_dir
+        self._store = OrderedDict()
+        self._spilled = {}
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._store) + len(self._spilled)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    @staticmethod
+    def keys(chain, data):
+        """
+        Key of every prefix of chain applied on data, shortest first
+        """
+        key = _digest(dict(_environment(), corpus=corpus_fingerprint(data)))
+        keys = []
+        for rec in chain:
+            key = _digest({'prefix': key, 'stage': stage_fingerprint(rec)})
+            keys.append(key)
+        return keys
+
+    def get(self, key):
+        """
+        Fetch key from memory or the spill directory
+
+        Returns
+        -------
+        entry : tuple / None
+            (ntext, extracted) after the prefix, None if not cached
+        """
+        if key in self._store:
+            self._store.move_to_end(key)
+            self.hits += 1
+            return self._store[key][0]
+
+        if key in self._spilled:
+            path = self._spilled.pop(key)
+            with open(path, 'rb') as fh:
+                entry = pickle.load(fh)
+            os.remove(path)
+            self.hits += 1
+            self.put(key, entry)
+            return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, key, entry):
+        """
+        Store (ntext, extracted) after a prefix, evicting beyond max_bytes
+        """
+        if key in self._store:
+            self._nbytes -= self._store.pop(key)[1]
+
+        size = _sizeof(entry[0]) + sum(_sizeof(extract) for extract in entry[1] if extract is not None)
+        self._store[key] = (entry, size)
+        self._nbytes += size
+
+        if self._max_bytes is not None:
+            while self._nbytes > self._max_bytes and len(self._store) > 1:
+                self.__evict()
+
+    def __evict(self):
+
+        key, (entry, size) = self._store.popitem(last=False)
+        self._nbytes -= size
+
+        if self._spill_dir is not None:
+            path = os.path.join(self._spill_dir, f'{key}.pkl')
+            with open(path, 'wb') as fh:
+                pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            self._spilled[key] = path
+
+    def clear(self):
+        """
+        Drop all entries, including spilled ones
+        """
+        for path in self._spilled.values():
+            if os.path.exists(path):
+                os.remove(path)
+        self._store.clear()
+        self._spilled.clear()
+        self._nbytes = 0
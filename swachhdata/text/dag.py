@@ -0,0 +1,284 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .base import ModuleTextRecast
+from .pipeline import Pipeline, _is_stacked, _recast_chunk, _stack
+from .plan import _flatten
+from .stats import PipelineStats
+
+
+class PipelineDAG(ModuleTextRecast):
+    """Pipelines branching off shared stages, every named node an output.
+
+    Every node is a Pipeline recasting the output of the node it comes
+    after, or the input for root nodes, so a prefix shared by several
+    variants runs once. Documents are recast chunk by chunk, each chunk
+    traversing the whole graph before the next one; the output of a node
+    is dropped as soon as all its branches have read it, unless it is an
+    output. Branches whose input is ready run concurrently in executor.
+
+    Parameters
+    ----------
+    verbose: int (0, 1, -1), default=1
+        verbose of the node Pipelines
+    chunk_size: int (>0), default=None (whole input at once)
+        documents traversing the graph at a time
+    max_workers: int (>0), default=None
+        threads recasting ready branches concurrently, None or 1 to run
+        them one after the other
+    executor: concurrent.futures.Executor, default=None
+        executor to run branches in instead, e.g. a ProcessPoolExecutor
+
+    Attributes
+    ----------
+    nodes : dict
+        Pipeline of every node, by name
+    stats : dict
+        PipelineStats of every node for the last recast, by name
+    extractions : dict
+        ExtractionStore of every node, by name
+
+    Examples
+    --------
+    >>> from swachhdata.text import *
+    >>> dag = PipelineDAG(verbose=0, max_workers=2)
+    >>> dag.add('base', [htmlRecast(), EscapeSequencesRecast(), urlRecast(process='extract_remove')], output=False)
+    >>> dag.add('display', [EmojiRecast()], after='base')
+    >>> dag.add('search', [CaseRecast(), PunctuationsRecast(), StopWordsRecast()], after='base')
+    >>> dag.add('analytics', [MentionsRecast(process='extract')], after='base', output=False)
+    >>> outputs = dag.setup_recast(text)
+    >>> outputs['display'], outputs['search']
+    >>> dag.extractions['base']['urls'], dag.extractions['analytics']['mentions']
+    """
+
+    def __init__(self, verbose=1, chunk_size=None, max_workers=None, executor=None):
+
+        if chunk_size is not None and (not isinstance(chunk_size, int) or chunk_size < 1):
+            raise ValueError(
+                f'Expected chunk_size to be a positive int, got {chunk_size}'
+            )
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError(
+                f'Expected max_workers to be a positive int, got {max_workers}'
+            )
+        super().__init__(verbose=verbose)
+        self._node_verbose = verbose
+        self._chunk_size = chunk_size
+        self._max_workers = max_workers
+        self._executor = executor
+        self.nodes = {}
+        self._after = {}
+        self._outputs = []
+        self.stats = {}
+
+    def __repr__(self):
+        nodes = ', '.join(f'{name}<-{after}' if after is not None else name for name, after in self._after.items())
+        return f'PipelineDAG([{nodes}])'
+
+    def add(self, name, chain, after=None, output=True, **kwargs):
+        """
+        Add a node recasting the output of node after, the input when None
+
+        Parameters
+        ----------
+        name: string
+        chain: list of recast(s) / Pipeline
+        after: string, default=None
+            name of an earlier node
+        output: bool (True, False), default=True
+            return the output of the node from recast
+        **kwargs: passed on to Pipeline when chain is a list, e.g. prefilter=True;
+            not allowed with a Pipeline
+
+        Returns
+        -------
+        dag : PipelineDAG
+        """
+        if name in self.nodes:
+            raise ValueError(
+                f'Node {name} already in PipelineDAG'
+            )
+        if after is not None and after not in self.nodes:
+            raise ValueError(
+                f'Expected after to be the name of an earlier node, got {after}'
+            )
+        if isinstance(chain, Pipeline):
+            if kwargs:
+                raise ValueError(
+                    f'Expected no Pipeline options with a Pipeline as chain, got {sorted(kwargs)}; set them on the Pipeline'
+                )
+        else:
+            chain = Pipeline(list(chain), verbose=self._node_verbose, **kwargs)
+
+        # branches may run in threads at the same time, they must not share a stage
+        stages = set(id(rec) for rec in _flatten(chain.chain))
+        for node, pipeline in self.nodes.items():
+            if pipeline is chain or stages & set(id(rec) for rec in _flatten(pipeline.chain)):
+                raise ValueError(
+                    f'Node {name} shares a recast with node {node}, use separate instances'
+                )
+
+        self.nodes[name] = chain
+        self._after[name] = after
+        if output:
+            self._outputs.append(name)
+        return self
+
+    @property
+    def outputs(self):
+        return list(self._outputs)
+
+    @property
+    def extractions(self):
+        return {name: pipeline.extractions for name, pipeline in self.nodes.items()}
+
+    def __branches(self):
+
+        branches = {name: [] for name in self.nodes}
+        for name, after in self._after.items():
+            if after is not None:
+                branches[after].append(name)
+        return branches
+
+    def _recast_graph(self, chunk, executor):
+        """
+        Recast a chunk through every node, a node as soon as its input is ready
+
+        Returns
+        -------
+        outputs : dict
+            Processed text of every output node
+        extracted : dict
+            {extraction: items} of every node
+        stats : dict
+            PipelineStats of every node
+        """
+        branches = self.__branches()
+        readers = {name: len(branches[name]) for name in self.nodes}
+        ready = [name for name, after in self._after.items() if after is None]
+        texts, extracted, stats, running = {}, {}, {}, {}
+
+        def finish(name, result):
+            ntext, extracted[name], stats[name] = result
+            if branches[name] or name in self._outputs:
+                texts[name] = ntext
+            after = self._after[name]
+            if after is not None:
+                readers[after] -= 1
+                if not readers[after] and after not in self._outputs:
+                    del texts[after]
+            ready.extend(branches[name])
+
+        while ready or running:
+            while ready:
+                name = ready.pop(0)
+                after = self._after[name]
+                data = chunk if after is None else texts[after]
+                if executor is None:
+                    finish(name, _recast_chunk(self.nodes[name], data))
+                else:
+                    running[executor.submit(_recast_chunk, self.nodes[name], data)] = name
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+
+        return {name: texts[name] for name in self._outputs}, extracted, stats
+
+    def __chunks(self, data):
+
+        if self._chunk_size is None:
+            yield data
+            return
+        for start in range(0, len(data), self._chunk_size):
+            yield data[start:start + self._chunk_size]
+
+    def __run(self, chunks):
+
+        executor, own = self._executor, False
+        if executor is None and self._max_workers is not None and self._max_workers > 1:
+            executor, own = ThreadPoolExecutor(self._max_workers, thread_name_prefix='swachhdata-dag'), True
+        try:
+            for chunk in chunks:
+                yield self._recast_graph(chunk, executor)
+        finally:
+            if own:
+                executor.shutdown()
+
+    def recast_iter(self, source, chunk_size=1000, extractions=False):
+        """
+        Recast the documents of an iterable chunk by chunk, yielding the
+        outputs of every chunk as {node: ntext}
+
+        Parameters
+        ----------
+        source: iterable of strings
+        chunk_size: int (>0), default=1000
+        extractions: bool (True, False), default=False
+            yield (outputs, {node: {extraction: items}}) instead of outputs
+
+        Examples
+        --------
+        >>> for outputs in dag.recast_iter(open('corpus.txt'), chunk_size=500):
+        ...     index(outputs['search'])
+        """
+        def chunks():
+            chunk = []
+            for text in source:
+                chunk.append(text)
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        for outputs, extracted, _ in self.__run(chunks()):
+            yield (outputs, extracted) if extractions else outputs
+
+    def setup(self, text):
+        super().setup(text)
+
+    def recast(self):
+        """
+        Recast the setup text through every node
+
+        Returns
+        -------
+        outputs : dict
+            Processed text of every output node, by name
+        """
+        super().recast()
+        if not self.nodes:
+            raise ValueError(
+                'Expected at least one node, see PipelineDAG.add'
+            )
+        # the outputs are returned, not kept next to the input
+        data, self._data = self.data, None
+        self._setup_check = False
+        for pipeline in self.nodes.values():
+            pipeline._reset_extractions()
+
+        outputs = {name: [] for name in self._outputs}
+        matrices = {name: [] for name in self._outputs}
+        extracted = {name: {} for name in self.nodes}
+        stats = {name: PipelineStats() for name in self.nodes}
+        for chunk_outputs, chunk_extracted, chunk_stats in self.__run(self.__chunks(data)):
+            for name, ntext in chunk_outputs.items():
+                if _is_stacked(ntext):
+                    matrices[name].append(ntext)
+                else:
+                    outputs[name].extend(ntext)
+            for name, extract in chunk_extracted.items():
+                for column, items in extract.items():
+                    extracted[name].setdefault(column, []).extend(items)
+                stats[name].merge(chunk_stats[name])
+
+        for name, extract in extracted.items():
+            for column, items in extract.items():
+                self.nodes[name]._put_extraction(column, items)
+        self.stats = stats
+        return {name: _stack(matrices[name], self.nodes[name].chain) if matrices[name] else outputs[name]
+                for name in self._outputs}
+
+    def setup_recast(self, text=None):
+        self.setup(text)
+        return self.recast()
@@ -0,0 +1,188 @@
+"""Deferred edits: a run of removal stages records the spans each one
+deletes or replaces in the original document and the output is built
+once, instead of every stage producing a new string.
+
+Spans are all found in the original text, which only gives the
+sequential result when the edits cannot interact. Every edit but those
+of the last stage has to be bounded by whitespace, the text edges or
+punctuation no removal pattern uses, so no later pattern can match
+across it; a span inside an earlier edit is dropped (that text was
+already removed), an edit covering whole earlier deletions absorbs them.
+Documents where edits touch, partially overlap or are not bounded fall
+back to recasting stage by stage.
+
+Finding the spans costs about as much as substituting them, the saving
+is in the strings no longer built and split for whitespace by every
+stage: it pays off on long documents with few matches, short documents
+dense with matches are faster recast stage by stage.
+"""
+
+# ascii punctuation used by none of the url, mention, hashtag or number patterns
+_NEUTRAL = frozenset('!"$&\'()*+,;<=>?[\\]^`{|}~')
+# stands for text deleted after the last whitespace normalisation of the run
+_SENTINEL = '\uffff'
+
+
+def bounded(text, start, end):
+    """
+    Whether the span is bounded by whitespace, the text edges or neutral punctuation
+    """
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    return (before.isspace() or before in _NEUTRAL) and (after.isspace() or after in _NEUTRAL)
+
+
+def _merge(edits, start, end, replacement, stage):
+    """
+    Add an edit to the edits of the earlier stages, False when it interacts with them
+    """
+    overlapping = [edit for edit in edits if edit[0] < end and start < edit[1]]
+    if not overlapping:
+        edits.append((start, end, replacement, stage))
+        return True
+
+    if any(edit[3] == stage for edit in overlapping):
+        return False
+    if len(overlapping) == 1 and overlapping[0][0] <= start and end <= overlapping[0][1]:
+        # already removed by an earlier stage
+        return True
+    if all(start <= edit[0] and edit[1] <= end and not edit[2] for edit in overlapping):
+        for edit in overlapping:
+            edits.remove(edit)
+        edits.append((start, end, replacement, stage))
+        return True
+    return False
+
+
+def _resolve(edits, found):
+    """
+    Edits of overlapping stages merged in stage order, items found inside
+    the edits of earlier stages dropped; None when edits interact
+    """
+    merged, extracted = [], []
+    for stage, items in enumerate(found):
+        extracted.append([item for start, end, item in items
+                          if not any(edit[0] <= start and end <= edit[1] for edit in merged)])
+        for start, end, replacement, _ in [edit for edit in edits if edit[3] == stage]:
+            if not _merge(merged, start, end, replacement, stage):
+                return None
+    return sorted(merged), extracted
+
+
+def _apply(text, stages, last):
+
+    edits, found, final = [], [], len(stages) - 1
+    for i, rec in enumerate(stages):
+        result = rec._edit_spans(text)
+        if result is None:
+            return None
+        spans, items = result
+        # no later pattern can match across the edits of the last stage
+        if i < final and spans and not all([bounded(text, start, end) for start, end, _ in spans]):
+            return None
+        edits.extend([(start, end, replacement, i) for start, end, replacement in spans])
+        found.append(items)
+
+    if not edits and last is None:
+        return text, [[item for _, _, item in items] for items in found]
+
+    edits.sort()
+    position = 0
+    for start, end, _, _ in edits:
+        if start < position:
+            break
+        position = end
+    else:
+        position = -1
+    if position < 0:
+        extracted = [[item for _, _, item in items] for items in found]
+    else:
+        result = _resolve(edits, found)
+        if result is None:
+            return None
+        edits, extracted = result
+
+    pieces, position, deferred = [], 0, False
+    for start, end, replacement, stage in edits:
+        pieces.append(text[position:start])
+        if last is not None and stage > last:
+            pieces.append(_SENTINEL)
+            deferred = True
+        else:
+            pieces.append(replacement)
+        position = end
+    pieces.append(text[position:])
+
+    ntext = ''.join(pieces)
+    if last is not None:
+        ntext = ' '.join(ntext.split())
+        if deferred:
+            ntext = ntext.replace(_SENTINEL, '')
+    return ntext, extracted
+
+
+def _last(stages):
+
+    last = None
+    for i, rec in enumerate(stages):
+        if rec._defer():
+            last = i
+    return last
+
+
+def apply_edits(text, stages):
+    """Recast text through a run of stages supporting deferred edits
+
+    Returns
+    -------
+    ntext : string
+        text itself when nothing was edited
+    extracted : list
+        items extracted by every stage, in order
+    None when the edits may interact, text has to be recast stage by stage
+    """
+    if _SENTINEL in text:
+        return None
+    return _apply(text, stages, _last(stages))
+
+
+def _recast_sequential(text, stages):
+
+    extracted = []
+    for rec in stages:
+        result = rec.transform_one(text)
+        if isinstance(result, tuple):
+            text, items = result
+        else:
+            text, items = result, []
+        extracted.append(items)
+    return text, extracted
+
+
+def recast_edits(stages, data):
+    """Recast data through a run of stages supporting deferred edits
+
+    Returns
+    -------
+    ntext : list of strings
+        Processed text
+    extracted : list
+        per stage, the items extracted from every document, None for
+        stages that do not extract
+    fallbacks : int
+        documents recast stage by stage
+    """
+    ntext, fallbacks = [], 0
+    extracted = [[] for _ in stages]
+    last = _last(stages)
+    for text in data:
+        result = _apply(text, stages, last) if _SENTINEL not in text else None
+        if result is None:
+            result = _recast_sequential(text, stages)
+            fallbacks += 1
+        ntext.append(result[0])
+        for items, found in zip(extracted, result[1]):
+            items.append(found)
+
+    extracting = [isinstance(rec._process, str) and 'extract' in rec._process for rec in stages]
+    return ntext, [items if extract else None for items, extract in zip(extracted, extracting)], fallbacks
@@ -0,0 +1,143 @@
+from collections import namedtuple
+
+from .cache import stage_fingerprint
+from .plan import _flatten
+
+StageProperties = namedtuple('StageProperties', ['scope', 'idempotent', 'shrinks', 'cost', 'commutes'],
+                             defaults=(None, False, False, 1, frozenset()))
+StageProperties.__doc__ = """Declared properties of a recast, read by the plan optimizer.
+
+    scope: string ('char', 'token'), default=None
+        works character by character or whitespace token by token
+    idempotent: bool, default=False
+        recasting its own output changes nothing
+    shrinks: bool, default=False
+        drops characters or tokens, the stages after it see less text
+    cost: int, default=1
+        relative cost per character
+    commutes: frozenset of recast names, default=frozenset()
+        recasts giving the same output whichever runs first, either side
+        declaring it is enough
+"""
+
+
+class PlanStep:
+    """One stage of an optimized plan, where it came from and why it moved"""
+
+    def __init__(self, rec, index):
+
+        self.rec = rec
+        self.index = index
+        self.properties = _properties(rec)
+
+    def __repr__(self):
+        return f'PlanStep({self.rec._name}, index={self.index})'
+
+
+def _properties(rec):
+
+    properties = getattr(rec, '_properties', None)
+    return properties() if properties is not None else None
+
+
+def _label(rec):
+
+    return f'{rec._name}({rec._process})' if isinstance(rec._process, str) else rec._name
+
+
+def commutes(a, b):
+    """
+    Whether recasts a and b are declared to give the same output in either order
+    """
+    pa, pb = _properties(a), _properties(b)
+    if pa is None or pb is None:
+        return False
+    return type(b).__name__ in pa.commutes or type(a).__name__ in pb.commutes
+
+
+def _same(a, b):
+
+    return type(a) is type(b) and stage_fingerprint(a) == stage_fingerprint(b)
+
+
+def _priority(step):
+
+    # text shrinking stages first, then the cheapest
+    return not step.properties.shrinks, step.properties.cost
+
+
+def optimize(chain):
+    """Rewrite a chain of recasts without changing its output.
+
+    Only rewrites backed by declared StageProperties are applied: an
+    idempotent stage repeating an earlier identical one, with only stages
+    it commutes with in between, is dropped; adjacent commuting stages are
+    swapped so text shrinking, then cheaper, stages run first. Stages
+    without properties (e.g. extracting ones) are never moved.
+
+    Returns
+    -------
+    steps : list of PlanStep
+        optimized chain, with the original index of every stage
+    rewrites : list of strings
+        every rewrite applied, and reorderings left out as unsafe
+    """
+    steps, rewrites = [], []
+    for index, rec in enumerate(_flatten(chain)):
+        step = PlanStep(rec, index)
+        if step.properties is not None and step.properties.idempotent:
+            duplicate = None
+            for prev in reversed(steps):
+                if _same(prev.rec, rec):
+                    duplicate = prev
+                    break
+                if not commutes(prev.rec, rec):
+                    break
+            if duplicate is not None:
+                rewrites.append(f'dropped {_label(rec)} at {index}: idempotent, repeats stage {duplicate.index}')
+                continue
+        steps.append(step)
+
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(steps) - 1):
+            a, b = steps[i], steps[i + 1]
+            if commutes(a.rec, b.rec) and _priority(b) < _priority(a):
+                steps[i], steps[i + 1] = b, a
+                reason = 'shrinks text' if b.properties.shrinks and not a.properties.shrinks else 'cheaper'
+                rewrites.append(f'moved {_label(b.rec)} ({b.index}) before {_label(a.rec)} ({a.index}): commute, {reason}')
+                changed = True
+
+    for a, b in zip(steps, steps[1:]):
+        if b.properties is None or not b.properties.shrinks or commutes(a.rec, b.rec):
+            continue
+        if a.properties is None or a.properties.cost > b.properties.cost:
+            rewrites.append(f'kept {_label(b.rec)} ({b.index}) after {_label(a.rec)} ({a.index}): '
+                            f'shrinks text but does not commute, moving it would change the output')
+    return steps, rewrites
+
+
+def explain(chain):
+    """Human readable plan of a chain of recasts, as run after optimize
+
+    Returns
+    -------
+    plan : string
+    """
+    steps, rewrites = optimize(chain)
+    total = sum(1 for _ in _flatten(chain))
+    lines = [f'Pipeline plan: {total} stages -> {len(steps)}']
+    for i, step in enumerate(steps):
+        properties = step.properties
+        if properties is None:
+            detail = 'no declared properties, kept in place'
+        else:
+            flags = [flag for flag in ('idempotent', 'shrinks') if getattr(properties, flag)]
+            detail = ', '.join([properties.scope or 'document', f'cost={properties.cost}'] + flags)
+        moved = f'  (was {step.index})' if step.index != i else ''
+        lines.append(f'  {i:>3}  {_label(step.rec):<30} {detail}{moved}')
+    if rewrites:
+        lines.append('rewrites:')
+        lines.extend(f'  - {rewrite}' for rewrite in rewrites)
+    return '\n'.join(lines)
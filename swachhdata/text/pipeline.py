@@ -1,17 +1,207 @@
+import asyncio
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 from tqdm.auto import tqdm
 
 from .base import ModuleTextRecast
+from .cache import LRUCache, ResultCache, pipeline_fingerprint
+from .edits import recast_edits
+from .optimizer import explain as explain_plan, optimize as optimize_plan
+from .plan import CompiledPipeline, _flatten
+from .prescan import scan
+from .stats import PipelineStats, SlowLog, StageStats, _is_matrix, _nchars
+from .store import ExtractionStore
+from .tokens import TokenizedCorpus
+
+
+def _vstack(rows):
+    """
+    Stack the per-chunk or per-document outputs of a terminal stage emitting matrices
+    """
+    import scipy.sparse
+    return scipy.sparse.vstack(rows, format='csr')
+
+
+def _is_stacked(data):
+    """
+    Whether data is a matrix or TokenizedCorpus whose chunks are stacked rather than extended
+    """
+    return _is_matrix(data) or isinstance(data, TokenizedCorpus)
+
+
+def _copy_output(data):
+    """
+    Copy of a stage output kept in a cache, stacked outputs staying stacked
+    """
+    if _is_matrix(data):
+        return data.copy()
+    if isinstance(data, TokenizedCorpus):
+        # never changed in place
+        return data
+    return list(data)
+
+
+def _compact_vocab(chain):
+    """
+    Vocabulary of the compact TokenisationRecast ending chain, None otherwise
+    """
+    stages = list(_flatten(chain))
+    return getattr(stages[-1], 'vocab', None) if stages else None
+
+
+def _stack(parts, chain):
+    """
+    Stack the per-chunk outputs of a terminal stage emitting matrices or a
+    TokenizedCorpus, the corpus in the vocabulary of the last stage of chain
+    """
+    if _is_matrix(parts[0]):
+        return _vstack(parts)
+    return TokenizedCorpus.concat(parts, _compact_vocab(chain))
+
+
+def _recast_chunk(pipeline, chunk):
+    """
+    Recast a chunk in an executor, a process executor working on a pickled copy of pipeline
+    """
+    ntext = pipeline.setup_recast(chunk)
+    store = pipeline.extractions
+    return ntext, {name: store[name] for name in store}, pipeline.stats
+
+
+async def _achunks(source, chunk_size):
+
+    chunk = []
+    if hasattr(source, '__aiter__'):
+        async for text in source:
+            chunk.append(text)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    else:
+        for text in source:
+            chunk.append(text)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+                # let the event loop run between chunks of a synchronous source
+                await asyncio.sleep(0)
+    if chunk:
+        yield chunk
+
 
 class Pipeline(ModuleTextRecast):
+    """Chain of recasts executed one after the other.
+
+    Parameters
+    ----------
+    chain: list of recast(s), default=[]
+    verbose: int (0, 1, -1), default=1
+    dedup: bool (True, False), default=False
+        recast every distinct document only once and scatter the results
+        back to all of its positions
+    cache_size: int (>0), default=None
+        keep the results of up to cache_size distinct documents in a LRU
+        store shared across calls, implies dedup=True
+    cache: ResultCache / string (path), default=None
+        persistent on-disk store of per-document results keyed by content
+        and pipeline fingerprint, only new or changed documents are
+        recast, implies dedup=True
+    prefix_cache: PrefixCache, default=None
+        keep the output after every stage and resume from the longest
+        cached prefix of the chain
+    callbacks: list of StatsCallback / callable(s), default=None
+        notified with the StageStats after every stage and the
+        PipelineStats after every recast
+    memory_budget: int (>0), default=None
+        bytes the working set may take, beyond it documents are recast in
+        chunks whose outputs are spilled to temporary files
+    trace_memory: bool (True, False), default=False
+        record the peak allocation of every stage with tracemalloc
+    spill_dir: string, default=None (system temporary directory)
+        directory chunks are spilled to under memory_budget
+    progress: callable, default=None
+        called as progress(stage name, done, total) once per chunk of
+        documents of every stage, usable without a terminal
+    store: ExtractionStore, default=None (new store)
+        side-channel the items extracted by every stage are published to,
+        may be shared by several Pipelines
+    prefilter: bool (True, False), default=False
+        pre-scan the character classes of every document and skip the
+        stages that cannot change it, e.g. MentionsRecast without @;
+        documents no stage applies to are returned as the same objects
+    deferred: bool (True, False), default=False
+        run consecutive removal stages (urlRecast, MentionsRecast,
+        HashtagsRecast, NumbersRecast, EmojiRecast) as one pass recording
+        the spans they delete, building every output string once; faster
+        on long documents with few matches
+
+    Attributes
+    ----------
+    stats : PipelineStats
+        per-stage wall / cpu time, throughput, character counts and
+        number of modified documents of the last recast
+    extractions : ExtractionStore
+        items extracted by the last recast, one column per extracting
+        stage named after its attribute (urls, mentions, ...)
+
+    Examples
+    --------
+    >>> from swachhdata.text import Pipeline, urlRecast, MentionsRecast, CaseRecast
+    >>> text = ['Follow @jondoe at www.samplewebsite.com', 'Follow @jondoe at www.samplewebsite.com']
+    >>> mentions = MentionsRecast(process='extract_remove')
+    >>> pipeline = Pipeline([urlRecast(), mentions, CaseRecast()], dedup=True)
+    >>> pipeline.setup_recast(text)
+    ['follow at', 'follow at']
+    >>> mentions.mentions
+    [['@jondoe'], ['@jondoe']]
+    >>> pipeline.extractions.to_frame()
+       doc    entity    value
+    0    0  mentions  @jondoe
+    1    1  mentions  @jondoe
+    """
+
+    def __init__(self, chain=[], verbose=1, dedup=False, cache_size=None, cache=None, prefix_cache=None,
+                 callbacks=None, memory_budget=None, trace_memory=False, spill_dir=None, progress=None,
+                 store=None, prefilter=False, deferred=False):
 
-    def __init__(self, chain=[], verbose=1):
-        
         super().__init__(verbose=verbose)
         self.id_pipeline = None
         self.chain = chain
-    
+        self._dedup = dedup or cache_size is not None or cache is not None
+        self._memo = LRUCache(cache_size) if cache_size is not None else None
+        self._cache = ResultCache(cache) if isinstance(cache, str) else cache
+        self._prefix_cache = prefix_cache
+        self._callbacks = list(callbacks) if callbacks is not None else []
+        self.stats = None
+        self._profiler = None
+        self._memory_budget = memory_budget
+        self._trace_memory = trace_memory
+        self._spill_dir = spill_dir
+        self._progress = progress
+        self.extractions = store if store is not None else ExtractionStore()
+        self._published = set()
+        self._prefilter = prefilter
+        self._deferred = deferred
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        # hashing every stage is costly, recompute only once the stages changed
+        stages = tuple(_flatten(self.chain))
+        cached = self._fingerprint
+        if cached is None or len(cached[0]) != len(stages) or any(a is not b for a, b in zip(cached[0], stages)):
+            cached = self._fingerprint = (stages, pipeline_fingerprint(self.chain))
+        return cached[1]
+
     def __add__(self, other):
-        
+
         if hasattr(self, 'id_pipeline') and hasattr(other, 'id_pipeline'):
             chain = self.chain + other.chain
         elif hasattr(self, 'id_pipeline') and not hasattr(other, 'id_pipeline'):
@@ -23,7 +213,7 @@ class Pipeline(ModuleTextRecast):
         return Pipeline(chain)
 
     def __sub__(self, other):
-        
+
         if hasattr(self, 'id_pipeline') and hasattr(other, 'id_base_recast'):
             if other in self.chain:
                 self.chain.remove(other)
@@ -35,18 +225,717 @@ class Pipeline(ModuleTextRecast):
 
     def setup(self, text):
         super().setup(text)
-    
+
+    def transform_one(self, text):
+        """
+        Recast a single string through every stage directly, without setup,
+        type conversion, progress reporting, stats or changes to the stages
+
+        Returns
+        -------
+        ntext : string
+            Processed text
+        """
+        mask = scan(text) if self._prefilter else None
+        for rec in self.chain:
+            if mask is not None:
+                applicable = getattr(rec, '_applicable', lambda: None)()
+                if applicable is not None and not mask & applicable:
+                    continue
+            result = rec.transform_one(text)
+            if isinstance(result, tuple):
+                result = result[0]
+            elif rec._process == 'extract':
+                continue
+            if mask is not None and result is not text:
+                mask = scan(result) if isinstance(result, str) else None
+            text = result
+        return text
+
+    def transform(self, text, extractions=False):
+        """
+        Recast text through every stage with the stateless transform of each
+        one, storing nothing on this Pipeline or its stages (data, stats,
+        extractions), so one Pipeline may serve several threads at once;
+        dedup, caches, prefilter and deferred edits are not used
+
+        Parameters
+        ----------
+        text: string / list of strings / pandas.core.series.Series
+        extractions: bool (True, False), default=False
+            return (ntext, {extraction: items}) instead of ntext
+
+        Returns
+        -------
+        ntext : list of strings
+            Processed text
+        """
+        data, extracted = text, {}
+        for i, rec in enumerate(_flatten(self.chain)):
+            result = rec.transform(data)
+            if isinstance(result, tuple):
+                data, extract = result
+            elif rec._process == 'extract':
+                extract = result
+            else:
+                data, extract = result, None
+
+            if extract is not None:
+                name = getattr(rec, '_extract_attr', None) or rec._name
+                if name in extracted:
+                    name = f'{name}_{i}'
+                extracted[name] = extract
+        return (data, extracted) if extractions else data
+
+    def optimize(self):
+        """
+        Rewrite the chain without changing its output: drop repeated idempotent
+        stages and run text shrinking, then cheaper, stages first where they
+        commute, see explain
+
+        Returns
+        -------
+        pipeline : Pipeline
+            self, its chain optimized
+        """
+        steps, _ = optimize_plan(self.chain)
+        self.chain = [step.rec for step in steps]
+        self._fingerprint = None
+        return self
+
+    def explain(self):
+        """
+        Plan of the chain after optimize, with the rewrites applied and why
+
+        Returns
+        -------
+        plan : string
+
+        Examples
+        --------
+        >>> pipeline = Pipeline([EscapeSequencesRecast(), CaseRecast(), StopWordsRecast(), EscapeSequencesRecast(), ShortWordsRecast(min_length=2)])
+        >>> print(pipeline.explain())
+        Pipeline plan: 5 stages -> 4
+            0  EscapeSequencesRecast          char, cost=1, idempotent
+            1  CaseRecast(lower)              char, cost=1, idempotent
+            2  ShortWordsRecast               token, cost=2, idempotent, shrinks  (was 4)
+            3  StopWordsRecast                token, cost=3, idempotent, shrinks  (was 2)
+        rewrites:
+          - dropped EscapeSequencesRecast at 3: idempotent, repeats stage 0
+          - moved ShortWordsRecast (4) before StopWordsRecast (2): commute, cheaper
+        """
+        return explain_plan(self.chain)
+
+    def compile(self, optimize=False):
+        """
+        Frozen, picklable execution plan of the chain, to recast in worker
+        processes without shipping this Pipeline, its data or loaded models
+
+        Parameters
+        ----------
+        optimize: bool (True, False), default=False
+            plan the chain as rewritten by optimize, leaving this Pipeline as is
+
+        Returns
+        -------
+        plan : CompiledPipeline
+
+        Examples
+        --------
+        >>> from swachhdata.text.plan import recast_worker
+        >>> plan = pipeline.compile()
+        >>> with plan.executor(4) as pool:
+        ...     results = list(pool.map(recast_worker, chunks))
+        """
+        if optimize:
+            return CompiledPipeline([step.rec for step in optimize_plan(self.chain)[0]])
+        return CompiledPipeline(self.chain)
+
+    @property
+    def slowlog(self):
+        return self._profiler
+
+    def profile(self, k=10, preview=80):
+        """
+        Log the k slowest documents of every stage, k=None to stop profiling
+
+        Returns
+        -------
+        slowlog : SlowLog
+            shared by all stages, indices refer to positions of the input
+        """
+        self._profiler = SlowLog(k, preview) if k is not None else None
+        return self._profiler
+
+    def add_callback(self, callback):
+        """
+        Register a StatsCallback, or a callable notified after every stage
+        """
+        self._callbacks.append(callback)
+
+    def _notify(self, event, stats):
+
+        for callback in self._callbacks:
+            if hasattr(callback, event):
+                getattr(callback, event)(stats)
+            elif event == 'on_stage_end' and callable(callback):
+                callback(stats)
+
+    def __stage_end(self, stats):
+
+        self.stats.add(stats)
+        self._notify('on_stage_end', stats)
+
+    def _recast_stage(self, rec, data):
+        """
+        Recast data through a single stage
+
+        Returns
+        -------
+        ntext : list of strings
+            Processed text, data itself for process='extract'
+        extracted : list / None
+            Extracted items, None if the stage does not extract
+        """
+        rec._verbose, rec._verbose_status = self._verbose, False
+        profiler, progress = rec._profiler, rec._progress
+        if self._profiler is not None:
+            rec._profiler = self._profiler
+        if self._progress is not None:
+            rec._progress = self._progress
+        try:
+            recast_text = rec.setup_recast(data)
+        finally:
+            rec._profiler, rec._progress = profiler, progress
+
+        if isinstance(recast_text, tuple):
+            return recast_text
+        elif rec._process == 'extract':
+            return data, recast_text
+        return recast_text, None
+
+    def _recast_chain(self, data):
+        """
+        Recast data through every stage of the chain
+
+        Returns
+        -------
+        ntext : list of strings
+            Processed text
+        extracted : list
+            Extracted items of every stage, None for stages that do not extract
+        """
+        extracted, start, keys = [], 0, None
+        if self._prefix_cache is not None:
+            keys = self._prefix_cache.keys(self.chain, data)
+            start, data, extracted = self.__resume(keys, data)
+            for i, rec in enumerate(self.chain[:start]):
+                stats = StageStats(i, rec._name)
+                stats.cached = True
+                self.__stage_end(stats)
+
+        masks = [None] * len(data) if self._prefilter and isinstance(data, list) else None
+        recast_tqdm = self.__steps(start, data)
+        if not self._verbose:
+            recast_tqdm = tqdm(recast_tqdm, leave=self._verbose_status)
+        for i, run in recast_tqdm:
+            name = '+'.join(rec._name for rec in run)
+            if not self._verbose:
+                recast_tqdm.set_postfix({f'Pipeline process': f'{name}'})
+            stats = StageStats(i, name)
+            if self._trace_memory:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            stats.start(data)
+            if len(run) > 1:
+                ntext, extract = self.__recast_run(run, data, masks, stats)
+            elif masks is not None:
+                ntext, extract = self.__recast_prefiltered(run[0], data, masks)
+                extract = [extract]
+            else:
+                ntext, extract = self._recast_stage(run[0], data)
+                extract = [extract]
+            if masks is not None:
+                masks = self.__invalidate(masks, data, ntext)
+            stats.stop(data, ntext)
+            if self._trace_memory:
+                stats.peak_bytes = tracemalloc.get_traced_memory()[1] - baseline
+            self.__stage_end(stats)
+            data = ntext
+            extracted.extend(extract)
+            if keys is not None:
+                self._prefix_cache.put(keys[i + len(run) - 1], (_copy_output(data), list(extracted)))
+
+        return data, extracted
+
+    def __steps(self, start, data):
+        """
+        (index, stages) of the chain from start, consecutive stages supporting
+        deferred edits grouped into one run under deferred=True for a list
+        of strings
+        """
+        deferred = self._deferred and isinstance(data, list) and all(isinstance(text, str) for text in data)
+        steps = []
+        for i, rec in enumerate(self.chain[start:], start):
+            deferrable = deferred and getattr(rec, '_defer', lambda: None)() is not None
+            if deferrable and steps and steps[-1][2]:
+                steps[-1][1].append(rec)
+            else:
+                steps.append((i, [rec], deferrable))
+        return [(i, run) for i, run, _ in steps]
+
+    def __recast_run(self, run, data, masks, stats):
+        """
+        Recast data through a run of stages as deferred edits, only the
+        documents one of them may change when prefiltering
+
+        Returns
+        -------
+        ntext : list of strings
+            Processed text
+        extracted : list
+            Extracted items of every stage of the run, None for stages that do not extract
+        """
+        applicable = [getattr(rec, '_applicable', lambda: None)() for rec in run]
+        if masks is None or None in applicable:
+            ntext, extracted, stats.fallbacks = recast_edits(run, data)
+        else:
+            union = 0
+            for mask in applicable:
+                union |= mask
+            for i, mask in enumerate(masks):
+                if mask is None:
+                    masks[i] = scan(data[i])
+            index = [i for i, mask in enumerate(masks) if mask & union]
+
+            ntext = list(data)
+            subset_text, subset_extracted, stats.fallbacks = recast_edits(run, [data[i] for i in index])
+            extracted = []
+            for items in subset_extracted:
+                if items is not None:
+                    full = [[] for _ in data]
+                    for j, i in enumerate(index):
+                        full[i] = items[j]
+                    items = full
+                extracted.append(items)
+            for j, i in enumerate(index):
+                ntext[i] = subset_text[j]
+
+        for rec, items in zip(run, extracted):
+            if items is not None and rec._extract_attr is not None:
+                setattr(rec, rec._extract_attr, items)
+        return ntext, extracted
+
+    def __recast_prefiltered(self, rec, data, masks):
+        """
+        Recast through a single stage only the documents it may change
+        according to their prescan masks, passing the others through
+
+        Returns
+        -------
+        ntext : list of strings
+            Processed text
+        extracted : list / None
+            Extracted items, [] for the documents passed through
+        """
+        applicable = getattr(rec, '_applicable', lambda: None)()
+        if applicable is None:
+            return self._recast_stage(rec, data)
+
+        for i, mask in enumerate(masks):
+            if mask is None:
+                masks[i] = scan(data[i])
+        index = [i for i, mask in enumerate(masks) if mask & applicable]
+        if len(index) == len(data):
+            return self._recast_stage(rec, data)
+
+        ntext = list(data)
+        extracting = isinstance(rec._process, str) and 'extract' in rec._process
+        extracted = [[] for _ in data] if extracting else None
+        if index:
+            positions = self._profiler.positions if self._profiler is not None else None
+            if self._profiler is not None:
+                self._profiler.positions = [positions[i] if positions is not None else i for i in index]
+            try:
+                subset_text, subset_extracted = self._recast_stage(rec, [data[i] for i in index])
+            finally:
+                if self._profiler is not None:
+                    self._profiler.positions = positions
+            for j, i in enumerate(index):
+                ntext[i] = subset_text[j]
+                if extracted is not None:
+                    extracted[i] = subset_extracted[j]
+
+        if extracted is not None and rec._extract_attr is not None:
+            setattr(rec, rec._extract_attr, extracted)
+        return ntext, extracted
+
+    @staticmethod
+    def __invalidate(masks, before, after):
+        """
+        Forget the masks of the documents a stage changed, None once the
+        output is no longer a list of strings
+        """
+        if not isinstance(after, list) or (after and not isinstance(after[0], str)):
+            return None
+        for i, (old, new) in enumerate(zip(before, after)):
+            if old is not new:
+                masks[i] = None
+        return masks
+
+    def __chunk_size(self, data):
+        """
+        Documents per chunk keeping the projected working set within memory_budget,
+        None if the whole data fits
+        """
+        if self._memory_budget is None or not data:
+            return None
+
+        nbytes = sys.getsizeof(data) + sum(sys.getsizeof(text) for text in data)
+        # every stage keeps its own copy of the data next to the input
+        copies = len(self.chain) + 1
+        if nbytes * copies <= self._memory_budget:
+            return None
+        return max(1, int(self._memory_budget * len(data) / (nbytes * copies)))
+
+    def _recast_budgeted(self, data):
+        """
+        Recast data through the chain, in chunks spilled to disk when the
+        projected working set exceeds memory_budget
+
+        Returns
+        -------
+        ntext : list of strings
+            Processed text
+        extracted : list
+            Extracted items of every stage, None for stages that do not extract
+        """
+        chunk_size = self.__chunk_size(data)
+        if chunk_size is None:
+            return self._recast_chain(data)
+
+        positions = self._profiler.positions if self._profiler is not None else None
+        paths = []
+        try:
+            for start in range(0, len(data), chunk_size):
+                chunk = data[start:start + chunk_size]
+                if self._profiler is not None:
+                    self._profiler.positions = [positions[i] if positions is not None else i
+                                                for i in range(start, start + len(chunk))]
+                result = self._recast_chain(chunk)
+
+                fd, path = tempfile.mkstemp(prefix='swachhdata-', suffix='.pkl', dir=self._spill_dir)
+                paths.append(path)
+                with os.fdopen(fd, 'wb') as fh:
+                    pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                del chunk, result
+                self.stats.chunks += 1
+
+            ntext, matrices, extracted = [], [], [None] * len(self.chain)
+            for path in paths:
+                with open(path, 'rb') as fh:
+                    chunk_text, chunk_extracted = pickle.load(fh)
+                if _is_stacked(chunk_text):
+                    matrices.append(chunk_text)
+                else:
+                    ntext.extend(chunk_text)
+                for i, extract in enumerate(chunk_extracted):
+                    if extract is not None:
+                        extracted[i] = (extracted[i] or []) + extract
+        finally:
+            if self._profiler is not None:
+                self._profiler.positions = positions
+            for path in paths:
+                os.remove(path)
+
+        if matrices:
+            ntext = _stack(matrices, self.chain)
+        for rec, extract in zip(self.chain, extracted):
+            if extract is not None and rec._extract_attr is not None:
+                setattr(rec, rec._extract_attr, extract)
+        return ntext, extracted
+
+    def __resume(self, keys, data):
+        """
+        Resume from the longest prefix of the chain found in the prefix cache
+        """
+        for start in range(len(keys), 0, -1):
+            entry = self._prefix_cache.get(keys[start - 1])
+            if entry is not None:
+                ntext, extracted = entry
+                for rec, extract in zip(self.chain, extracted):
+                    if extract is not None and rec._extract_attr is not None:
+                        setattr(rec, rec._extract_attr, extract)
+                return start, _copy_output(ntext), list(extracted)
+
+        return 0, data, []
+
+    def __dedup_recast(self, data):
+        """
+        Recast every distinct document once and scatter the results back
+        """
+        # memo entries hold the extractions by stage position, key them by chain as well
+        fingerprint = self.fingerprint
+        results, pending = {}, []
+        for text in dict.fromkeys(data):
+            result = self._memo.get((fingerprint, text)) if self._memo is not None else None
+            if result is None:
+                pending.append(text)
+            else:
+                results[text] = result
+
+        if pending and self._cache is not None:
+            keys = {text: self._cache.key(fingerprint, text) for text in pending}
+            stored = self._cache.get_many(keys.values())
+            for text in pending:
+                if keys[text] in stored:
+                    results[text] = stored[keys[text]]
+                    if self._memo is not None:
+                        self._memo.put((fingerprint, text), results[text])
+            pending = [text for text in pending if text not in results]
+
+        if pending:
+            if self._profiler is not None:
+                first = {}
+                for i, text in enumerate(data):
+                    first.setdefault(text, i)
+                self._profiler.positions = [first[text] for text in pending]
+            try:
+                recast_text, extracted = self._recast_budgeted(pending)
+            finally:
+                if self._profiler is not None:
+                    self._profiler.positions = None
+            for i, text in enumerate(pending):
+                result = (recast_text[i], tuple(None if extract is None else extract[i] for extract in extracted))
+                results[text] = result
+                if self._memo is not None:
+                    self._memo.put((fingerprint, text), result)
+
+            if self._cache is not None:
+                self._cache.put_many((keys[text], results[text]) for text in pending)
+
+        extracted = [None] * len(self.chain)
+        if data:
+            sample = results[data[0]][1]
+            for i, rec in enumerate(self.chain):
+                if sample[i] is not None:
+                    extracted[i] = [list(results[text][1][i]) for text in data]
+                    attr = getattr(rec, '_extract_attr', None)
+                    if attr is not None:
+                        setattr(rec, attr, extracted[i])
+
+        ntext = [results[text][0] for text in data]
+        if ntext and _is_matrix(ntext[0]):
+            ntext = _vstack(ntext)
+        else:
+            # documents of a compact corpus are stored as token lists, intern them back
+            vocab = _compact_vocab(self.chain)
+            if vocab is not None:
+                ntext = TokenizedCorpus.from_tokens(ntext, vocab)
+        return ntext, extracted
+
+    def __publish(self, extracted):
+        """
+        Publish the items extracted by every stage to the extraction store
+        """
+        names = set()
+        for i, (rec, extract) in enumerate(zip(self.chain, extracted)):
+            if extract is None:
+                continue
+            name = getattr(rec, '_extract_attr', None) or rec._name
+            if name in names:
+                name = f'{name}_{i}'
+            names.add(name)
+            self._put_extraction(name, extract)
+
+    def _put_extraction(self, name, extract):
+
+        self.extractions.put(name, extract)
+        self._published.add(name)
+
+    def _reset_extractions(self):
+        """
+        Remove the columns of the previous recast from the extraction store,
+        leaving those of other Pipelines sharing it
+        """
+        for name in self._published:
+            self.extractions.discard(name)
+        self._published = set()
+
+    def __cache_counts(self):
+
+        caches = {'memory': self._memo, 'disk': self._cache, 'prefix': self._prefix_cache}
+        return {name: (cache.hits, cache.misses) for name, cache in caches.items() if cache is not None}
+
+    def __check_concurrency(self, executor, concurrency):
+
+        if not isinstance(concurrency, int) or concurrency < 1:
+            raise ValueError(
+                f'Expected concurrency to be a positive int, got {concurrency}'
+            )
+        # threads would share, and race on, the state of this Pipeline
+        if concurrency > 1 and not isinstance(executor, ProcessPoolExecutor):
+            raise ValueError(
+                f'Expected a ProcessPoolExecutor for concurrency > 1, got {executor}'
+            )
+
+    async def _arecast_chunks(self, chunks, executor=None, concurrency=1):
+        """
+        Recast the chunks of an async iterator in executor, up to concurrency
+        at a time, yielding (chunk, ntext, extracted, stats) in order
+        """
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        try:
+            async for chunk in chunks:
+                pending.append((chunk, loop.run_in_executor(executor, _recast_chunk, self, chunk)))
+                if len(pending) >= concurrency:
+                    chunk, future = pending.popleft()
+                    yield (chunk, *await future)
+            while pending:
+                chunk, future = pending.popleft()
+                yield (chunk, *await future)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    async def arecast(self, text=None, chunk_size=1000, executor=None, concurrency=1):
+        """
+        Recast without blocking the event loop, chunk by chunk in executor
+
+        Parameters
+        ----------
+        text: string / list of strings / pandas.core.series.Series
+        chunk_size: int (>0), default=1000
+            documents recast per executor call, the event loop runs in between
+        executor: concurrent.futures.Executor, default=None (loop's default thread pool)
+        concurrency: int (>0), default=1
+            chunks in flight, above 1 executor has to be a ProcessPoolExecutor
+
+        Returns
+        -------
+        ntext : list of strings
+            Processed text, extractions and stats of all chunks are kept as
+            after setup_recast
+
+        Examples
+        --------
+        >>> pipeline = Pipeline([urlRecast(), MentionsRecast(process='extract_remove'), CaseRecast()], verbose=0)
+        >>> ntext = await pipeline.arecast(text, chunk_size=500)
+        """
+        self.__check_concurrency(executor, concurrency)
+        self.setup(text)
+        self._reset_extractions()
+        # chunks are recast by the executor, do not ship the whole data along with every one of them
+        data, self._data = self.data, None
+
+        stats, recast_text, extracted, matrices = PipelineStats(), [], {}, []
+        async for _, ntext, extract, chunk_stats in self._arecast_chunks(
+                _achunks(data, chunk_size), executor, concurrency):
+            if _is_stacked(ntext):
+                matrices.append(ntext)
+            else:
+                recast_text.extend(ntext)
+            for name, items in extract.items():
+                extracted.setdefault(name, []).extend(items)
+            stats.merge(chunk_stats)
+
+        self._data = _stack(matrices, self.chain) if matrices else recast_text
+        for name, items in extracted.items():
+            self._put_extraction(name, items)
+        self.stats = stats
+        return self._data
+
+    async def arecast_iter(self, source, chunk_size=1000, executor=None, concurrency=1, max_queue=2,
+                           extractions=False):
+        """
+        Recast the documents of a (async) iterable, yielding them as they are recast
+
+        Parameters
+        ----------
+        source: async iterable / iterable of strings
+        chunk_size: int (>0), default=1000
+        executor: concurrent.futures.Executor, default=None (loop's default thread pool)
+        concurrency: int (>0), default=1
+            chunks in flight, above 1 executor has to be a ProcessPoolExecutor
+        max_queue: int (>0), default=2
+            chunks read ahead of the recast, the source is not consumed
+            further while the queue is full
+        extractions: bool (True, False), default=False
+            yield (ntext, {extraction: items}) instead of ntext
+
+        Examples
+        --------
+        >>> async for ntext in pipeline.arecast_iter(kafka_messages(), chunk_size=256):
+        ...     await sink.send(ntext)
+        """
+        self.__check_concurrency(executor, concurrency)
+        self._data = None
+        queue = asyncio.Queue(maxsize=max_queue)
+        done = object()
+
+        async def produce():
+            try:
+                async for chunk in _achunks(source, chunk_size):
+                    await queue.put(chunk)
+            except Exception as exc:
+                await queue.put(exc)
+            else:
+                await queue.put(done)
+
+        async def consume():
+            while True:
+                chunk = await queue.get()
+                if chunk is done:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+
+        producer = asyncio.ensure_future(produce())
+        chunks = self._arecast_chunks(consume(), executor, concurrency)
+        try:
+            async for _, ntext, extract, _ in chunks:
+                for i, text in enumerate(ntext):
+                    if extractions:
+                        yield text, {name: items[i] for name, items in extract.items()}
+                    else:
+                        yield text
+        finally:
+            await chunks.aclose()
+            producer.cancel()
+
     def recast(self):
         super().recast()
 
-        recast_tqdm = tqdm(self.chain, leave=self._verbose_status, disable=self._verbose)
-        for rec in recast_tqdm:
-            recast_tqdm.set_postfix({f'Pipeline process': f'{rec._name}'})
-            rec._verbose, rec._verbose_status = False, False
-            self.data = rec.setup_recast(self.data)
-        
+        self._reset_extractions()
+        self.stats = PipelineStats(len(self.data))
+        self.stats.chars_in = _nchars(self.data) or 0
+        counts = self.__cache_counts()
+        tracing = self._trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+
+        try:
+            # the last stage may emit tokens, not strings, so skip the str check of the data setter
+            if self._dedup:
+                self._data, extracted = self.__dedup_recast(self.data)
+            else:
+                self._data, extracted = self._recast_budgeted(self.data)
+        finally:
+            if tracing:
+                tracemalloc.stop()
+
+        self.__publish(extracted)
+        self.stats.wall_s = time.perf_counter() - wall
+        self.stats.cpu_s = time.process_time() - cpu
+        self.stats.chars_out = _nchars(self.data) or 0
+        for name, (hits, misses) in self.__cache_counts().items():
+            self.stats.cache[name] = {'hits': hits - counts[name][0], 'misses': misses - counts[name][1]}
+        self._notify('on_recast_end', self.stats)
         return self.data
 
     def setup_recast(self, text=None):
         super().setup(text)
-        return self.recast()
\ No newline at end of file
+        return self.recast()
@@ -0,0 +1,178 @@
+import copy
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import pipeline_fingerprint
+from .resources import SpacyModel
+
+_PLAN = None
+
+
+def _flatten(chain):
+
+    for rec in chain:
+        if hasattr(rec, 'id_pipeline'):
+            yield from _flatten(rec.chain)
+        else:
+            yield rec
+
+
+def _freeze(rec):
+    """
+    Copy of rec without data, extractions, profiler or progress, its
+    patterns compiled, holding resources by reference
+    """
+    stage = copy.copy(rec)
+    state = vars(stage)
+    state.update(_data=None, _setup_check=False, _verbose=True, _verbose_status=False,
+                 _profiler=None, _progress=None)
+    if rec._extract_attr is not None and rec._extract_attr in state:
+        state[rec._extract_attr] = None
+    for key, value in state.items():
+        if key.endswith('__regex') and isinstance(value, str):
+            state[key] = re.compile(value)
+    return stage
+
+
+class CompiledPipeline:
+    """Frozen execution plan of a Pipeline, see Pipeline.compile.
+
+    Holds a copy of every stage stripped of data and results, with its
+    patterns compiled and its models (SpacyModel) held by reference, so the
+    plan pickles small. Every run works on shallow copies of the stages,
+    the plan itself is never changed and may be shared by threads.
+
+    Ship it to worker processes once, with init_worker as initializer,
+    then send chunks only to recast_worker; every worker loads the models
+    once, or inherits them from the parent with the fork start method
+    when load() was called before the pool started.
+
+    Attributes
+    ----------
+    stages : tuple
+        frozen copies of the recasts of the chain, nested Pipelines flattened
+    fingerprint : string
+        fingerprint of the compiled chain
+
+    Examples
+    --------
+    >>> from swachhdata.text import Pipeline, urlRecast, MentionsRecast, CaseRecast
+    >>> from swachhdata.text.plan import recast_worker
+    >>> plan = Pipeline([urlRecast(), MentionsRecast(process='extract_remove'), CaseRecast()]).compile()
+    >>> with plan.executor(4) as pool:
+    ...     for ntext, extracted in pool.map(recast_worker, chunks):
+    ...         ...
+    >>> plan.recast(['Follow @jondoe at www.samplewebsite.com'])
+    (['follow at'], {'mentions': [['@jondoe']]})
+    """
+
+    def __init__(self, chain):
+
+        recasts = list(_flatten(chain))
+        self._stages = tuple(_freeze(rec) for rec in recasts)
+        self._fingerprint = pipeline_fingerprint(recasts)
+
+    def __len__(self):
+        return len(self._stages)
+
+    def __repr__(self):
+        return f'CompiledPipeline([{", ".join(stage._name for stage in self._stages)}])'
+
+    @property
+    def stages(self):
+        return self._stages
+
+    @property
+    def fingerprint(self):
+        return self._fingerprint
+
+    def load(self):
+        """
+        Load the models of every stage in this process
+
+        Returns
+        -------
+        plan : CompiledPipeline
+        """
+        for stage in self._stages:
+            for value in vars(stage).values():
+                if isinstance(value, SpacyModel):
+                    value.load()
+        return self
+
+    def recast(self, text):
+        """
+        Recast text through every stage
+
+        Returns
+        -------
+        ntext : list of strings
+            Processed text
+        extracted : dict
+            items extracted by every extracting stage, one list per document,
+            named as in Pipeline.extractions
+        """
+        data, extracted = text, {}
+        for i, stage in enumerate(self._stages):
+            result = stage.transform(data)
+            if isinstance(result, tuple):
+                data, extract = result
+            elif stage._process == 'extract':
+                extract = result
+            else:
+                data, extract = result, None
+
+            if extract is not None:
+                name = stage._extract_attr or stage._name
+                if name in extracted:
+                    name = f'{name}_{i}'
+                extracted[name] = extract
+        return data, extracted
+
+    def transform_one(self, text):
+        """
+        Recast a single string through every stage, as Pipeline.transform_one
+        """
+        for stage in self._stages:
+            result = stage.transform_one(text)
+            if isinstance(result, tuple):
+                text = result[0]
+            elif stage._process != 'extract':
+                text = result
+        return text
+
+    def executor(self, max_workers=None, mp_context=None):
+        """
+        ProcessPoolExecutor whose workers are initialized with this plan
+
+        Returns
+        -------
+        executor : concurrent.futures.ProcessPoolExecutor
+            to map recast_worker over chunks of documents
+        """
+        return ProcessPoolExecutor(max_workers, mp_context=mp_context,
+                                   initializer=init_worker, initargs=(self,))
+
+
+def init_worker(plan):
+    """
+    Worker process initializer, keep plan and load its models once
+    """
+    global _PLAN
+    _PLAN = plan.load()
+
+
+def recast_worker(texts):
+    """
+    Recast texts with the plan of init_worker
+
+    Returns
+    -------
+    ntext : list of strings
+    extracted : dict
+    """
+    if _PLAN is None:
+        raise ValueError(
+            'Expected the worker to be initialized with init_worker(plan)'
+        )
+    return _PLAN.recast(texts)
@@ -0,0 +1,73 @@
+"""Character class bitmask of a document, computed once so a Pipeline can
+skip the stages that cannot change it.
+
+A recast declares, through _applicable(), the bits of the documents it
+may change; documents whose mask shares none of them are passed through
+untouched, as the very same string object.
+"""
+import string
+
+SPACE = 1 << 0          # whitespace other than single spaces between words
+ESCAPE = 1 << 1         # \r \n \t \f
+AT = 1 << 2             # @
+HASH = 1 << 3           # #
+DOT = 1 << 4            # .
+COLON = 1 << 5          # :
+DIGIT = 1 << 6          # any unicode digit
+PUNCT = 1 << 7          # ascii punctuation
+UPPER = 1 << 8          # ascii upper case letter
+LOWER = 1 << 9          # ascii lower case letter
+NONASCII = 1 << 10      # any non ascii character
+NONALPHA = 1 << 11      # any character other than ascii letters and space
+MARKUP = 1 << 12        # what html parsing changes: < & \r \0 and leading whitespace / BOM
+
+ALL = (1 << 13) - 1
+
+_CLASSES = [
+    (ESCAPE, frozenset('\r\n\t\f')),
+    (AT, frozenset('@')),
+    (HASH, frozenset('#')),
+    (DOT, frozenset('.')),
+    (COLON, frozenset(':')),
+    (DIGIT, frozenset(string.digits)),
+    (PUNCT, frozenset(string.punctuation)),
+    (UPPER, frozenset(string.ascii_uppercase)),
+    (LOWER, frozenset(string.ascii_lowercase)),
+    (MARKUP, frozenset('<&\r\0'))
+]
+_ALPHA = frozenset(string.ascii_letters + ' ')
+_WHITESPACE = frozenset(chr(c) for c in range(128) if chr(c).isspace() and chr(c) != ' ')
+
+
+def scan(text):
+    """
+    Bitmask of the character classes found in text
+    """
+    chars = set(text)
+    mask = 0
+    for bit, members in _CLASSES:
+        if not chars.isdisjoint(members):
+            mask |= bit
+    if not chars <= _ALPHA:
+        mask |= NONALPHA
+
+    if text[:1].isspace() or text[:1] == '\ufeff':
+        mask |= SPACE | MARKUP
+    if '  ' in text or text[-1:].isspace() or not chars.isdisjoint(_WHITESPACE):
+        mask |= SPACE
+
+    if not text.isascii():
+        mask |= NONASCII
+        for char in chars:
+            if char.isspace() and char != ' ':
+                mask |= SPACE
+            elif char.isdigit() or char.isdecimal():
+                mask |= DIGIT
+    return mask
+
+
+def scan_all(data):
+    """
+    Bitmask of every document of data, see scan
+    """
+    return [scan(text) for text in data]
@@ -1,11 +1,17 @@
+import os
 import re
+import zlib
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
 
 from bs4 import BeautifulSoup
 from html import unescape
 
 import contractions
 
-import spacy
 import nltk
 nltk.download('popular', quiet=True)
 
@@ -16,11 +22,23 @@ import string
 import emoji
 from emoji import EMOJI_DATA
 
+import numpy
+
 from tqdm.auto import tqdm
 
+from .automaton import Automaton
+from . import prescan
 from .base import BaseTextRecast
+from .edits import bounded
+from .optimizer import StageProperties
+from .resources import SpacyModel, load_spacy
+from .tokens import TokenizedCorpusBuilder, Vocabulary
 from ..utils import probe_string_data
 
+_PUNCTUATION_TABLE = str.maketrans(string.punctuation, ' ' * len(string.punctuation))
+# whitespace separated words holding a non ascii character, emojis included
+_NONASCII_WORD = re.compile(r'(?<!\S)[^\s\x80-\U0010ffff]*[^\s\x00-\x7f]\S*')
+
 class urlRecast(BaseTextRecast):
     """Recast text data by removing or extracting URLs.
 
@@ -95,12 +113,30 @@ class urlRecast(BaseTextRecast):
         self.urls = None
         self.__regex = r'\b((?:https?://)?(?:(?:www\.)?(?:[\da-z\.-]+)\.(?:[a-z]{2,6})|(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)|(?:(?:[0-9a-fA-F]{1,4}:){7,7}[0-9a-fA-F]{1,4}|(?:[0-9a-fA-F]{1,4}:){1,7}:|(?:[0-9a-fA-F]{1,4}:){1,6}:[0-9a-fA-F]{1,4}|(?:[0-9a-fA-F]{1,4}:){1,5}(?::[0-9a-fA-F]{1,4}){1,2}|(?:[0-9a-fA-F]{1,4}:){1,4}(?::[0-9a-fA-F]{1,4}){1,3}|(?:[0-9a-fA-F]{1,4}:){1,3}(?::[0-9a-fA-F]{1,4}){1,4}|(?:[0-9a-fA-F]{1,4}:){1,2}(?::[0-9a-fA-F]{1,4}){1,5}|[0-9a-fA-F]{1,4}:(?:(?::[0-9a-fA-F]{1,4}){1,6})|:(?:(?::[0-9a-fA-F]{1,4}){1,7}|:)|fe80:(?::[0-9a-fA-F]{0,4}){0,4}%[0-9a-zA-Z]{1,}|::(?:ffff(?::0{1,4}){0,1}:){0,1}(?:(?:25[0-5]|(?:2[0-4]|1{0,1}[0-9]){0,1}[0-9])\.){3,3}(?:25[0-5]|(?:2[0-4]|1{0,1}[0-9]){0,1}[0-9])|(?:[0-9a-fA-F]{1,4}:){1,4}:(?:(?:25[0-5]|(?:2[0-4]|1{0,1}[0-9]){0,1}[0-9])\.){3,3}(?:25[0-5]|(?:2[0-4]|1{0,1}[0-9]){0,1}[0-9])))(?::[0-9]{1,4}|[1-5][0-9]{4}|6[0-4][0-9]{3}|65[0-4][0-9]{2}|655[0-2][0-9]|6553[0-5])?(?:/[\w\.-]*)*/?)\b'
         self._name = 'urlRecast'
+        self._extract_attr = 'urls'
 
     @property
     def regex(self):
         return self.__regex
 
     
+    def _defer(self):
+        if self._process in ['remove', 'extract_remove', 'remove_extract']:
+            return False
+        return None
+
+    def _edit_spans(self, text):
+        dots = [(match.start(), match.end(), '') for match in re.finditer(r'\.{3}', text)]
+        # the url pattern runs after ... is removed
+        if not all(bounded(text, start, end) for start, end, _ in dots):
+            return None
+        spans = [match.span() for match in re.finditer(self.__regex, text)]
+        return dots + [(start, end, '') for start, end in spans], [(start, end, text[start:end]) for start, end in spans]
+
+    def _applicable(self):
+        # every alternative of the url regex holds a . or a :
+        return prescan.DOT | prescan.COLON
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -144,11 +180,10 @@ class urlRecast(BaseTextRecast):
         super().recast()
 
         if self._process in ['remove', 'extract', 'extract_remove', 'remove_extract']:
-            data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-            data_tqdm.set_postfix({'urlRecast process': self._process})
+            recast_results = self._recast_map(self.data, self.__base_recast, {'urlRecast process': self._process})
 
         if self._process in ['remove', 'extract']:
-            recast_text = [self.__base_recast(text) for text in data_tqdm]
+            recast_text = recast_results
             if self._process == 'extract':
                 self.urls = recast_text
             else:
@@ -157,8 +192,7 @@ class urlRecast(BaseTextRecast):
 
         elif self._process in ['extract_remove', 'remove_extract']:
             recast_text, urls = [], []
-            for text in data_tqdm:
-                text, url = self.__base_recast(text)
+            for text, url in recast_results:
                 recast_text.append(text)
                 urls.append(url)
             self.urls = urls
@@ -216,6 +250,12 @@ class htmlRecast(BaseTextRecast):
         super().__init__(verbose=verbose)
         self._name = 'htmlRecast'
     
+    def _applicable(self):
+        return prescan.MARKUP
+
+    def _properties(self):
+        return StageProperties(cost=20)
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -238,9 +278,7 @@ class htmlRecast(BaseTextRecast):
         """
         super().recast()
 
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({'htmlRecast process': 'remove'})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        recast_text = self._recast_map(self.data, self.__base_recast, {'htmlRecast process': 'remove'})
         self.data = recast_text
         return recast_text
 
@@ -290,6 +328,12 @@ class EscapeSequencesRecast(BaseTextRecast):
         super().__init__(verbose=verbose)
         self._name = 'EscapeSequencesRecast'
     
+    def _applicable(self):
+        return prescan.ESCAPE
+
+    def _properties(self):
+        return StageProperties('char', idempotent=True, commutes=frozenset({'CaseRecast', 'ShortWordsRecast', 'StopWordsRecast'}))
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -312,9 +356,7 @@ class EscapeSequencesRecast(BaseTextRecast):
         """
         super().recast()
         
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({'EscapeSequencesRecast process': 'remove'})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        recast_text = self._recast_map(self.data, self.__base_recast, {'EscapeSequencesRecast process': 'remove'})
         self.data = recast_text
         return recast_text
 
@@ -404,13 +446,29 @@ class MentionsRecast(BaseTextRecast):
     def __init__(self, process='remove', verbose=0):
 
         super().__init__(process, verbose)
+        self.mentions = None
         self.__regex = '([@][A-Za-z0-9._:-]+)'
         self._name = 'MentionsRecast'
+        self._extract_attr = 'mentions'
 
     @property
     def regex(self):
         return self.__regex
     
+    def _defer(self):
+        if self._process in ['remove', 'extract_remove', 'remove_extract']:
+            return True
+        return None
+
+    def _edit_spans(self, text):
+        spans = [match.span() for match in re.finditer(self.__regex, text)]
+        return [(start, end, ' ') for start, end in spans], [(start, end, text[start:end]) for start, end in spans]
+
+    def _applicable(self):
+        if self._process == 'extract':
+            return prescan.AT
+        return prescan.AT | prescan.SPACE
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -450,11 +508,10 @@ class MentionsRecast(BaseTextRecast):
         super().recast()
 
         if self._process in ['remove', 'extract', 'extract_remove', 'remove_extract']:
-            data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-            data_tqdm.set_postfix({'MentionRecast process': self._process})
+            recast_results = self._recast_map(self.data, self.__base_recast, {'MentionRecast process': self._process})
 
         if self._process in ['remove', 'extract']:
-            recast_text = [self.__base_recast(text) for text in data_tqdm]
+            recast_text = recast_results
             if self._process == 'extract':
                 self.mentions = recast_text
             else:
@@ -463,8 +520,7 @@ class MentionsRecast(BaseTextRecast):
 
         elif self._process in ['extract_remove', 'remove_extract']:
             recast_text, mentions = [], []
-            for text in data_tqdm:
-                text, mention = self.__base_recast(text)
+            for text, mention in recast_results:
                 recast_text.append(text)
                 mentions.append(mention)
             self.mentions = mentions
@@ -520,6 +576,9 @@ class ContractionsRecast(BaseTextRecast):
         super().__init__(verbose=verbose)
         self._name = 'ContractionsRecast'
     
+    def _properties(self):
+        return StageProperties(cost=10)
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -541,9 +600,7 @@ class ContractionsRecast(BaseTextRecast):
         """
         super().recast()
 
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({'ContractionsRecast process': 'remove'})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        recast_text = self._recast_map(self.data, self.__base_recast, {'ContractionsRecast process': 'remove'})
         self.data = recast_text
         return recast_text
 
@@ -621,6 +678,21 @@ class CaseRecast(BaseTextRecast):
         super().__init__(process, verbose)
         self._name = 'CaseRecast'
 
+    def _applicable(self):
+        if self._process == 'lower':
+            return prescan.UPPER | prescan.NONASCII
+        if self._process == 'upper':
+            return prescan.LOWER | prescan.NONASCII
+        return None
+
+    def _properties(self):
+        # the final sigma rule of lower depends on the neighbouring punctuation
+        if self._process == 'lower':
+            return StageProperties('char', idempotent=True, commutes=frozenset({'EscapeSequencesRecast'}))
+        if self._process == 'upper':
+            return StageProperties('char', idempotent=True, commutes=frozenset({'EscapeSequencesRecast', 'PunctuationsRecast'}))
+        return StageProperties()
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -652,9 +724,7 @@ class CaseRecast(BaseTextRecast):
         """
         super().recast()
 
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({'CaseRecast process': self._process})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        recast_text = self._recast_map(self.data, self.__base_recast, {'CaseRecast process': self._process})
         self.data = recast_text
         return recast_text
 
@@ -756,8 +826,32 @@ class EmojiRecast(BaseTextRecast):
         super().__init__(process, verbose)
         self._space_out = space_out
         self.emojis = None
-        self._emoji_list = list(EMOJI_DATA.keys())
+        self._emojis = frozenset(EMOJI_DATA)
         self._name = 'EmojiRecast'
+        self._extract_attr = 'emojis'
+
+    def _defer(self):
+        if not self._space_out and self._process in ['remove', 'extract_remove', 'remove_extract']:
+            return True
+        return None
+
+    def _edit_spans(self, text):
+        if text.isascii():
+            return [], []
+        spans, items = [], []
+        for match in _NONASCII_WORD.finditer(text):
+            found = [(i, i + 1, char) for i, char in enumerate(match.group(), match.start()) if char in self._emojis]
+            if found:
+                # whole words holding an emoji are removed
+                spans.append((match.start(), match.end(), ''))
+                items.extend(found)
+        return spans, items
+
+    def _applicable(self):
+        # every emoji holds a non ascii character
+        if self._process in ['extract', 'replace', 'extract_replace', 'replace_extract'] and not self._space_out:
+            return prescan.NONASCII
+        return prescan.NONASCII | prescan.SPACE
 
     def __base_recast(self, text):
         """Perform selected process on the setup text
@@ -778,7 +872,7 @@ class EmojiRecast(BaseTextRecast):
         if self._space_out:
             spaced = ''
             for char in text:
-                if char in self._emoji_list:
+                if char in self._emojis:
                     spaced += ' '
                 spaced += char
             text = spaced
@@ -786,7 +880,7 @@ class EmojiRecast(BaseTextRecast):
         
         if self._process == 'remove':
             allchars = [str for str in text]
-            emoji_list = [c for c in allchars if c in self._emoji_list]
+            emoji_list = [c for c in allchars if c in self._emojis]
             text = ' '.join([str for str in text.split() if not any(j in str for j in emoji_list)])
             return text
 
@@ -796,18 +890,18 @@ class EmojiRecast(BaseTextRecast):
 
         elif self._process == 'extract':
             allchars = [str for str in text]
-            emoji_list = [c for c in allchars if c in self._emoji_list]
+            emoji_list = [c for c in allchars if c in self._emojis]
             return emoji_list
         
         elif self._process in ['extract_remove', 'remove_extract']:
             allchars = [str for str in text]
-            emoji_list = [c for c in allchars if c in self._emoji_list]
+            emoji_list = [c for c in allchars if c in self._emojis]
             text = ' '.join([str for str in text.split() if not any(j in str for j in emoji_list)])
             return text, emoji_list
         
         elif self._process in ['extract_replace', 'replace_extract']:
             allchars = [str for str in text]
-            emoji_list = [c for c in allchars if c in self._emoji_list]
+            emoji_list = [c for c in allchars if c in self._emojis]
             text = emoji.demojize(text, delimiters=('', ''))
             return text, emoji_list
 
@@ -827,11 +921,10 @@ class EmojiRecast(BaseTextRecast):
         super().recast()
 
         if self._process in ['remove', 'extract', 'replace', 'extract_remove', 'remove_extract', 'extract_replace', 'replace_extract']:
-            data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-            data_tqdm.set_postfix({'EmojiRecast process': self._process})
+            recast_results = self._recast_map(self.data, self.__base_recast, {'EmojiRecast process': self._process})
 
         if self._process in ['remove', 'extract', 'replace']:
-            recast_text = [self.__base_recast(text) for text in data_tqdm]
+            recast_text = recast_results
             if self._process == 'extract':
                 self.emojis = recast_text
             else:
@@ -840,10 +933,9 @@ class EmojiRecast(BaseTextRecast):
 
         elif self._process in ['extract_remove', 'remove_extract', 'extract_replace', 'replace_extract']:
             recast_text, emojis = [], []
-            for text in data_tqdm:
-                text, emoji = self.__base_recast(text)
+            for text, found in recast_results:
                 recast_text.append(text)
-                emojis.append(emoji)
+                emojis.append(found)
             self.emojis = emojis
             self.data = recast_text
             return recast_text, emojis
@@ -937,11 +1029,26 @@ class HashtagsRecast(BaseTextRecast):
         self.hashtags = None
         self.__regex = '([#][A-Za-z0-9_]+)'
         self._name = 'HashtagsRecast'
+        self._extract_attr = 'hashtags'
     
     @property
     def regex(self):
         return self.__regex
     
+    def _defer(self):
+        if self._process in ['remove', 'extract_remove', 'remove_extract']:
+            return True
+        return None
+
+    def _edit_spans(self, text):
+        spans = [match.span() for match in re.finditer(self.__regex, text)]
+        return [(start, end, ' ') for start, end in spans], [(start, end, text[start:end]) for start, end in spans]
+
+    def _applicable(self):
+        if self._process == 'extract':
+            return prescan.HASH
+        return prescan.HASH | prescan.SPACE
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -984,11 +1091,10 @@ class HashtagsRecast(BaseTextRecast):
         super().recast()
 
         if self._process in ['remove', 'extract', 'extract_remove', 'remove_extract']:
-            data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-            data_tqdm.set_postfix({'HashtagsRecast process': self._process})
+            recast_results = self._recast_map(self.data, self.__base_recast, {'HashtagsRecast process': self._process})
 
         if self._process in ['remove', 'extract']:
-            recast_text = [self.__base_recast(text) for text in data_tqdm]
+            recast_text = recast_results
             if self._process == 'extract':
                 self.hashtags = recast_text
             else:
@@ -997,8 +1103,7 @@ class HashtagsRecast(BaseTextRecast):
 
         elif self._process in ['extract_remove', 'remove_extract']:
             recast_text, hashtags = [], []
-            for text in data_tqdm:
-                text, hashtag = self.__base_recast(text)
+            for text, hashtag in recast_results:
                 recast_text.append(text)
                 hashtags.append(hashtag)
             self.hashtags = hashtags
@@ -1058,6 +1163,9 @@ class ShortWordsRecast(BaseTextRecast):
         self._name = 'ShortWordsRecast'
 
     
+    def _properties(self):
+        return StageProperties('token', idempotent=True, shrinks=True, cost=2, commutes=frozenset({'ShortWordsRecast', 'StopWordsRecast'}))
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -1079,9 +1187,7 @@ class ShortWordsRecast(BaseTextRecast):
             Processed text
         """
         super().recast()
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({f'ShortWordsRecast [min_length = {self._min_length}] process': 'remove'})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        recast_text = self._recast_map(self.data, self.__base_recast, {f'ShortWordsRecast [min_length = {self._min_length}] process': 'remove'})
         self.data = recast_text
         return recast_text
 
@@ -1105,12 +1211,26 @@ class ShortWordsRecast(BaseTextRecast):
 
 
 
+@lru_cache(maxsize=None)
+def _package_stop_words(package):
+    """
+    Stop words of package, loaded on first use once per process
+    """
+    if package == 'nltk':
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words('english'))
+
+    elif package == 'spacy':
+        return frozenset(load_spacy('en_core_web_sm').Defaults.stop_words)
+
+
 class StopWordsRecast(BaseTextRecast):
     """Recast text data by removing stop words.
     
     Parameters
     ----------
-    package: str ('nltk', 'spacy', 'gensim', 'custom'), default='nltk'
+    package: str ('nltk', 'spacy', 'custom'), default='nltk'
+        stop words are loaded on first recast
     stopwords: list (package='custom'), list of stopwords 
     verbose: int (0, 1, -1), default=0
 
@@ -1130,23 +1250,20 @@ class StopWordsRecast(BaseTextRecast):
 
     def __init__(self, package='nltk', stopwords=None, verbose=0):
 
+        if package not in ('nltk', 'spacy', 'custom'):
+            raise ValueError(
+                f'Expected package to be one of nltk, spacy, custom, got {package}'
+            )
         if package == 'custom':
-            probe_string_data(stopwords)
+            stopwords = frozenset(probe_string_data(stopwords))
         
         super().__init__(verbose=verbose)
         self._package = package
         self._stopWords = stopwords
         self._name = 'StopWordsRecast'
     
-    def __setup_package(self):
-
-        if self._package == 'nltk':
-            from nltk.corpus import stopwords
-            self._stopWords = set(stopwords.words('english'))
-
-        elif self._package == 'spacy':
-            sp = spacy.load('en_core_web_sm')
-            self._stopWords = sp.Defaults.stop_words
+    def _properties(self):
+        return StageProperties('token', idempotent=True, shrinks=True, cost=3, commutes=frozenset({'ShortWordsRecast', 'StopWordsRecast'}))
 
     def __base_recast(self, text):
         """Perform selected process on the setup text
@@ -1156,7 +1273,8 @@ class StopWordsRecast(BaseTextRecast):
         ntext : string
             Processed text
         """
-        ntext = [word for word in text.split() if word not in self._stopWords]
+        stop_words = self._stopWords if self._package == 'custom' else _package_stop_words(self._package)
+        ntext = [word for word in text.split() if word not in stop_words]
         text = ' '.join(ntext)
         return text
 
@@ -1169,11 +1287,8 @@ class StopWordsRecast(BaseTextRecast):
             Processed text
         """
         super().recast()
-        self.__setup_package()
 
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({f'StopWordsRecast [package={self._package}] process': 'remove'})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        recast_text = self._recast_map(self.data, self.__base_recast, {f'StopWordsRecast [package={self._package}] process': 'remove'})
         self.data = recast_text
         return recast_text
 
@@ -1196,6 +1311,193 @@ class StopWordsRecast(BaseTextRecast):
 
 
 
+class DictionaryRecast(BaseTextRecast):
+    """Recast text data by removing, replacing or extracting the terms of a dictionary,
+    e.g. names, brands or profanity, matched with an Aho-Corasick automaton.
+    
+    Parameters
+    ----------
+    terms: list of strings, default=None
+        words and multi-word phrases, optional when automaton is a saved Automaton
+    process: string ('remove', 'replace', 'extract', 'extract_remove', 'extract_replace'), default='remove'
+    replacement: string / dict (term: string), default=''
+        text matches are replaced with (process='replace' / process='extract_replace')
+    ignore_case: bool (True, False), default=True
+    word_boundary: bool (True, False), default=True
+        only match whole words
+    spans: bool (True, False), default=False
+        extract (match, start, end) tuples instead of matches
+    automaton: Automaton / string (path), default=None
+        compiled automaton, a path is loaded if it holds the automaton of terms
+        and (re)built and saved to otherwise
+    verbose: int (0, 1, -1), default=0
+
+    Attributes
+    ----------
+    matches : list of strings / tuples
+        extracted matches
+
+    Examples
+    --------
+    >>> # process='remove'
+    >>> from swachhdata.text import DictionaryRecast
+    >>> text = 'John Doe moved to New York with johnny'
+    >>> rec = DictionaryRecast(['john doe', 'new york', 'john'], process='remove')
+    >>> rec.setup_recast(text)
+    'moved to with johnny'
+    >>> 
+    >>> # process='extract_replace'
+    >>> rec = DictionaryRecast(['john doe', 'new york'], process='extract_replace', replacement='[REDACTED]', spans=True)
+    >>> rec.setup_recast(text)
+    ('[REDACTED] moved to [REDACTED] with johnny', [('John Doe', 0, 8), ('New York', 18, 26)])
+    >>> 
+    >>> # automaton cached to disk
+    >>> rec = DictionaryRecast(brands, process='extract', automaton='brands.automaton')
+    """
+
+    def __init__(self, terms=None, process='remove', replacement='', ignore_case=True, word_boundary=True,
+                 spans=False, automaton=None, verbose=0):
+
+        super().__init__(process, verbose)
+        if process not in ['remove', 'replace', 'extract', 'extract_remove', 'remove_extract', 'extract_replace', 'replace_extract']:
+            raise ValueError(
+                f'Expected process to be one of remove, replace, extract, extract_remove or extract_replace, got {process}'
+            )
+        if terms is None and not isinstance(automaton, (Automaton, str)):
+            raise ValueError(
+                'Expected terms or an automaton, got neither'
+            )
+
+        self._automaton = self.__setup_automaton(terms, ignore_case, word_boundary, automaton)
+        self._digest = self._automaton.digest
+        self._replacement = replacement
+        self._spans = spans
+        self.matches = None
+        self._name = 'DictionaryRecast'
+        self._extract_attr = 'matches'
+
+    @staticmethod
+    def __setup_automaton(terms, ignore_case, word_boundary, automaton):
+
+        if isinstance(automaton, Automaton):
+            return automaton
+
+        if isinstance(automaton, str) and os.path.exists(automaton):
+            cached = Automaton.load(automaton)
+            if terms is None:
+                return cached
+            unique = Automaton.unique(terms, ignore_case)
+            if cached.digest == Automaton.digest_of(unique, ignore_case, word_boundary):
+                return cached
+            terms = unique
+
+        compiled = Automaton(terms, ignore_case=ignore_case, word_boundary=word_boundary)
+        if isinstance(automaton, str):
+            compiled.save(automaton)
+        return compiled
+
+    @property
+    def automaton(self):
+        return self._automaton
+
+    def __replacement(self, term):
+
+        if isinstance(self._replacement, dict):
+            return self._replacement.get(self._automaton.terms[term], '')
+        return self._replacement
+
+    def __base_recast(self, text):
+        """Perform selected process on the setup text
+
+        Returns
+        -------
+        ntext : string (process='remove' / process='replace')
+            Processed text
+        matches : list of strings / tuples (process='extract')
+            Extracted matches
+        ntext, matches : string, list of strings / tuples (process='extract_remove' / process='extract_replace')
+            Processed text, Extracted matches
+        """
+        found = self._automaton.findall(text)
+        if self._process == 'extract':
+            return self.__matches(text, found)
+
+        pieces, position = [], 0
+        replace = self._process in ['replace', 'extract_replace', 'replace_extract']
+        for start, end, term in found:
+            pieces.append(text[position:start])
+            if replace:
+                pieces.append(self.__replacement(term))
+            position = end
+        pieces.append(text[position:])
+        ntext = ''.join(pieces) if replace else ' '.join(''.join(pieces).split())
+
+        if self._process in ['remove', 'replace']:
+            return ntext
+        return ntext, self.__matches(text, found)
+
+    def __matches(self, text, found):
+
+        if self._spans:
+            return [(text[start:end], start, end) for start, end, _ in found]
+        return [text[start:end] for start, end, _ in found]
+
+    def recast(self):
+        """
+        Perform selected process on the setup text
+
+        Returns
+        -------
+        ntext : string / list of strings (process='remove' / process='replace')
+            Processed text
+        matches : list of strings / tuples (process='extract')
+            Extracted matches
+        ntext, matches : string / list of strings, list of strings / tuples (process='extract_remove' / process='extract_replace')
+            Processed text, Extracted matches
+        """
+        super().recast()
+
+        recast_results = self._recast_map(self.data, self.__base_recast, {f'DictionaryRecast [terms={len(self._automaton)}] process': self._process})
+
+        if self._process in ['remove', 'extract', 'replace']:
+            recast_text = recast_results
+            if self._process == 'extract':
+                self.matches = recast_text
+            else:
+                self.data = recast_text
+            return recast_text
+
+        recast_text, matches = [], []
+        for text, match in recast_results:
+            recast_text.append(text)
+            matches.append(match)
+        self.matches = matches
+        self.data = recast_text
+        return recast_text, matches
+
+    def setup_recast(self, text):
+        """Change the input text type to supported type
+        and
+        Perform selected process on the setup text
+
+        Parameters
+        ----------
+        text : string / list of strings / pandas.core.series.Series
+
+        Returns
+        -------
+        ntext : string / list of strings (process='remove' / process='replace')
+            Processed text
+        matches : list of strings / tuples (process='extract')
+            Extracted matches
+        ntext, matches : string / list of strings, list of strings / tuples (process='extract_remove' / process='extract_replace')
+            Processed text, Extracted matches
+        """
+        self.setup(text)
+        return self.recast()
+
+
+
 class NumbersRecast(BaseTextRecast):
     """Recast text data by removing, replacing or extracting numbers.
 
@@ -1283,7 +1585,22 @@ class NumbersRecast(BaseTextRecast):
         self._seperator = seperator
         self.numbers = None
         self._name = 'NumbersRecast'
+        self._extract_attr = 'numbers'
     
+    def _defer(self):
+        if self._seperator is None and self._process in ['remove', 'extract_remove', 'remove_extract']:
+            return False
+        return None
+
+    def _edit_spans(self, text):
+        spans = [match.span() for match in re.finditer(r'[0-9]+', text)]
+        return [(start, end, '') for start, end in spans], [(start, end, text[start:end]) for start, end in spans]
+
+    def _applicable(self):
+        if self._seperator is not None:
+            return prescan.DIGIT | prescan.PUNCT
+        return prescan.DIGIT
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -1337,11 +1654,10 @@ class NumbersRecast(BaseTextRecast):
         super().recast()
 
         if self._process in ['remove', 'extract', 'replace', 'extract_remove', 'remove_extract', 'extract_replace', 'replace_extract']:
-            data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-            data_tqdm.set_postfix({'NumberRecast process': self._process})
+            recast_results = self._recast_map(self.data, self.__base_recast, {'NumberRecast process': self._process})
 
         if self._process in ['remove', 'extract', 'replace']:
-            recast_text = [self.__base_recast(text) for text in data_tqdm]
+            recast_text = recast_results
             if self._process == 'extract':
                 self.numbers = recast_text
             else:
@@ -1350,8 +1666,7 @@ class NumbersRecast(BaseTextRecast):
 
         elif self._process in ['extract_remove', 'remove_extract', 'extract_replace', 'replace_extract']:
             recast_text, numbers = [], []
-            for text in data_tqdm:
-                text, number = self.__base_recast(text)
+            for text, number in recast_results:
                 recast_text.append(text)
                 numbers.append(number)
             self.numbers = numbers
@@ -1409,6 +1724,15 @@ class AlphabetRecast(BaseTextRecast):
         self._process = process
         self._name = 'AlphabetRecast'
     
+    def _applicable(self):
+        masks = {'all': prescan.NONALPHA, 'keep_alpha': prescan.NONALPHA,
+                 'rem_non_ascii': prescan.NONASCII, 'rem_acc_char': prescan.NONASCII}
+        processes = self._process if isinstance(self._process, list) else [self._process]
+        mask = 0
+        for process in processes:
+            mask |= masks.get(process, prescan.ALL)
+        return mask
+
     def __base_recast(self, text, process):
         """Perform selected process on the setup text
 
@@ -1448,21 +1772,25 @@ class AlphabetRecast(BaseTextRecast):
         if isinstance(self._process, list):
 
             for process in self._process:
-                data_tqdm = tqdm(text, leave=self._verbose_status, disable=self._verbose)
-                data_tqdm.set_postfix({'AlphabetRecast process': f'{process}'})
-                text = [self.__base_recast(text, process) for text in data_tqdm]
+                text = self._recast_map(text, partial(self.__base_recast, process=process), {'AlphabetRecast process': f'{process}'})
             
             self.data = text
             return text
         
         elif isinstance(self._process, str):
 
-            data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-            data_tqdm.set_postfix({'AlphabetRecast process': f'{self._process}'})
-            recast_text = [self.__base_recast(text, self._process) for text in data_tqdm]
+            recast_text = self._recast_map(self.data, partial(self.__base_recast, process=self._process), {'AlphabetRecast process': f'{self._process}'})
             self.data = recast_text
             return recast_text
 
+    def transform_one(self, text):
+
+        if isinstance(self._process, list):
+            for process in self._process:
+                text = self.__base_recast(text, process)
+            return text
+        return self.__base_recast(text, self._process)
+
     def setup_recast(self, text):
         """Change the input text type to supported type
         and
@@ -1508,6 +1836,13 @@ class PunctuationsRecast(BaseTextRecast):
         super().__init__(verbose=verbose)
         self._name = 'PunctuationsRecast'
     
+    def _applicable(self):
+        return prescan.PUNCT | prescan.SPACE
+
+    def _properties(self):
+        # not idempotent, long runs of spaces are only partly collapsed
+        return StageProperties('char', cost=2)
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -1516,7 +1851,7 @@ class PunctuationsRecast(BaseTextRecast):
         ntext : string
             Processed text
         """
-        return text.translate(str.maketrans(string.punctuation, ' ' * len(string.punctuation))).replace(' '*4, ' ').replace(' '*3, ' ').replace(' '*2, ' ').strip()
+        return text.translate(_PUNCTUATION_TABLE).replace(' '*4, ' ').replace(' '*3, ' ').replace(' '*2, ' ').strip()
 
     def recast(self):
         """Perform selected process on the setup text
@@ -1528,9 +1863,7 @@ class PunctuationsRecast(BaseTextRecast):
         """
         super().recast()
 
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({'PunctuationRecast process': 'remove'})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        recast_text = self._recast_map(self.data, self.__base_recast, {'PunctuationRecast process': 'remove'})
         self.data = recast_text
         return recast_text
 
@@ -1564,6 +1897,9 @@ class TokenisationRecast(BaseTextRecast):
     ----------
     package: string ('nltk', 'spacy'), default='nltk'
     method: string ('word', 'sentence'), default=None
+    compact: bool (True, False), default=False
+        return a TokenizedCorpus of token ids into a Vocabulary shared by
+        every recast instead of lists of strings
     verbose: int (0, 1, -1), default=0
     
 
@@ -1590,18 +1926,29 @@ class TokenisationRecast(BaseTextRecast):
     >>> # OR
     >>> rec.setup_recast(text)
     ['Grabbing her umbrella, Kate raced out of the house.', 'Confused by her sister’s sudden change in mood, Jill stayed quiet.']
+    >>> 
+    >>> # compact=True
+    >>> rec = TokenisationRecast(package='nltk', method='word', compact=True)
+    >>> tokens = rec.setup_recast(['the best service', 'the best tab'])
+    >>> tokens
+    TokenizedCorpus(documents=2, tokens=6, vocabulary=4)
+    >>> tokens[1], tokens.ids
+    (['the', 'best', 'tab'], array([0, 1, 2, 0, 1, 3], dtype=int32))
     """
 
 
-    def __init__(self, package='nltk', method=None, verbose=0):
+    def __init__(self, package='nltk', method=None, compact=False, verbose=0):
         
         if package in ['nltk', 'spacy']:
             super().__init__(verbose=verbose)
             self._package = package
             self._method = method
+            self._compact = compact
+            self.vocab = Vocabulary() if compact else None
 
             if package == 'spacy':
-                self._sp = spacy.load('en_core_web_sm')
+                self._sp = SpacyModel('en_core_web_sm')
+                self._sp.load()
         else:
             raise ValueError(
                 f'Expected package either nltk or spacy, {type(package)} is not a supported package.'
@@ -1626,6 +1973,8 @@ class TokenisationRecast(BaseTextRecast):
             return [word.text for word in text]
         
         if self._method == 'sentence':
+            if self._compact:
+                return [sentence.text for sentence in text.sents]
             return [sentence for sentence in text.sents]
 
     def __base_recast(self, text):
@@ -1648,14 +1997,18 @@ class TokenisationRecast(BaseTextRecast):
         
         Returns
         -------
-        ntext : list of strings
+        ntext : list of strings / TokenizedCorpus (compact=True)
             Processed tokens
         """
         super().recast()
 
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({f'TokenisationRecast [package={self._package}, method={self._method}] process': 'remove'})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        postfix = {f'TokenisationRecast [package={self._package}, method={self._method}] process': 'remove'}
+        if self._compact:
+            builder = TokenizedCorpusBuilder(self.vocab)
+            self._recast_map(self.data, lambda text: builder.add(self.__base_recast(text)), postfix)
+            return builder.build()
+
+        recast_text = self._recast_map(self.data, self.__base_recast, postfix)
         return recast_text
 
     def setup_recast(self, text):
@@ -1726,6 +2079,9 @@ class StemmingRecast(BaseTextRecast):
             )
         self._name = 'StemmingRecast'
 
+    def _properties(self):
+        return StageProperties('token', cost=50)
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -1756,9 +2112,7 @@ class StemmingRecast(BaseTextRecast):
         """
         super().recast()
 
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({f'StemmingRecast [package={self._package}, method={self._method}] process': 'stemming'})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        recast_text = self._recast_map(self.data, self.__base_recast, {f'StemmingRecast [package={self._package}, method={self._method}] process': 'stemming'})
         self.data = recast_text
         return recast_text
 
@@ -1811,7 +2165,8 @@ class LemmatizationRecast(BaseTextRecast):
             self._package = package
 
             if package == 'spacy':
-                self._sp = spacy.load('en', disable=['parser', 'ner'])
+                self._sp = SpacyModel('en', disable=['parser', 'ner'])
+                self._sp.load()
         else:
             raise ValueError(
                 f'Expected package either nltk or spacy, {type(package)} is not a supported package.'
@@ -1829,6 +2184,9 @@ class LemmatizationRecast(BaseTextRecast):
 
         return tag_dict.get(tag, wordnet.NOUN)
 
+    def _properties(self):
+        return StageProperties('token', cost=100)
+
     def __base_recast(self, text):
         """Perform selected process on the setup text
 
@@ -1846,7 +2204,7 @@ class LemmatizationRecast(BaseTextRecast):
             return text
         
         elif self._package == 'spacy':
-            text = self.__sp(text)
+            text = self._sp(text)
             return ' '.join([token.lemma_ for token in text])
 
     def recast(self):
@@ -1859,9 +2217,7 @@ class LemmatizationRecast(BaseTextRecast):
         """
         super().recast()
 
-        data_tqdm = tqdm(self.data, leave=self._verbose_status, disable=self._verbose)
-        data_tqdm.set_postfix({f'LemmatizationRecast [package={self._package}] process': 'lemmatization'})
-        recast_text = [self.__base_recast(text) for text in data_tqdm]
+        recast_text = self._recast_map(self.data, self.__base_recast, {f'LemmatizationRecast [package={self._package}] process': 'lemmatization'})
         self.data = recast_text
         return recast_text
 
@@ -1884,6 +2240,189 @@ class LemmatizationRecast(BaseTextRecast):
         return self.recast()
 
 
+def _vectorise_chunk(texts, n_features, ngram_range, vocabulary, binary, token_pattern):
+    """Bag of n-grams of texts as the (indices, values, indptr) of a CSR matrix,
+    tokens are streamed from the regex and never collected per document
+    """
+    regex = re.compile(token_pattern)
+    low, high = ngram_range
+    columns = {}
+    indices, values, indptr = array('q'), array('d'), array('q', [0])
+
+    for text in texts:
+        counts = {}
+        window = deque(maxlen=high)
+        for match in regex.finditer(text):
+            window.append(match.group())
+            for n in range(low, min(high, len(window)) + 1):
+                gram = window[-1] if n == 1 else ' '.join(islice(window, len(window) - n, None))
+                column = columns.get(gram)
+                if column is None:
+                    if vocabulary is not None:
+                        column = vocabulary.get(gram, -1)
+                    else:
+                        column = zlib.crc32(gram.encode('utf-8')) % n_features
+                    columns[gram] = column
+                if column >= 0:
+                    counts[column] = counts.get(column, 0) + 1
+
+        indices.extend(counts)
+        values.extend([1.0] * len(counts) if binary else counts.values())
+        indptr.append(len(indices))
+
+    return indices, values, indptr
+
+
+class VectorisationRecast(BaseTextRecast):
+    """Recast text data into a bag of n-grams scipy.sparse.csr_matrix, terminal stage of a Pipeline.
+    
+    Parameters
+    ----------
+    n_features: int (>0), default=1048576 (2**20)
+        columns of the matrix, n-grams are hashed into them unless vocabulary is given
+    ngram_range: tuple (min_n, max_n), default=(1, 1)
+    vocabulary: dict (n-gram: column) / list of strings, default=None
+        fixed vocabulary instead of feature hashing, other n-grams are ignored
+    binary: bool (True, False), default=False
+        1 for every n-gram present instead of its count
+    norm: string ('l1', 'l2'), default=None
+        normalise every row
+    token_pattern: string (regex), default=r'\\S+'
+    chunk_size: int (>0), default=10000
+        documents vectorised per chunk
+    n_jobs: int (>0), default=1
+        worker processes chunks are vectorised in
+    verbose: int (0, 1, -1), default=0
+    
+
+    Examples
+    --------
+    >>> from swachhdata.text import Pipeline, CaseRecast, PunctuationsRecast, VectorisationRecast
+    >>> text = ['You can have a look at our catalogue', 'Have a look at the services tab']
+    >>> pipeline = Pipeline([CaseRecast(), PunctuationsRecast(), VectorisationRecast(n_features=2**18, ngram_range=(1, 2))])
+    >>> pipeline.setup_recast(text)
+    <Compressed Sparse Row sparse matrix of dtype 'float64'
+    	with 28 stored elements and shape (2, 262144)>
+    >>> # vocabulary
+    >>> rec = VectorisationRecast(vocabulary=['have', 'look', 'catalogue'])
+    >>> rec.setup_recast(text).toarray()
+    array([[1., 1., 1.],
+           [0., 1., 0.]])
+    """
+
+
+    def __init__(self, n_features=2**20, ngram_range=(1, 1), vocabulary=None, binary=False, norm=None,
+                 token_pattern=r'\S+', chunk_size=10000, n_jobs=1, verbose=0):
+
+        super().__init__(verbose=verbose)
+
+        low, high = ngram_range
+        if not 1 <= low <= high:
+            raise ValueError(
+                f'Expected ngram_range to be (min_n, max_n) with 1 <= min_n <= max_n, got {ngram_range}'
+            )
+        if norm not in [None, 'l1', 'l2']:
+            raise ValueError(
+                f'Expected norm to be one of None, l1 or l2, got {norm}'
+            )
+        if vocabulary is not None and not isinstance(vocabulary, dict):
+            vocabulary = {gram: column for column, gram in enumerate(vocabulary)}
+
+        self._n_features = len(vocabulary) if vocabulary is not None else n_features
+        self._ngram_range = (low, high)
+        self._vocabulary = vocabulary
+        self._binary = binary
+        self._norm = norm
+        self._token_pattern = token_pattern
+        self._chunk_size = chunk_size
+        self._n_jobs = n_jobs
+        self._name = 'VectorisationRecast'
+
+    def __base_recast(self, texts):
+        """Vectorise a chunk of the setup text
+
+        Returns
+        -------
+        indices, values, indptr : array(s)
+            CSR components of the chunk
+        """
+        return _vectorise_chunk(texts, self._n_features, self._ngram_range, self._vocabulary,
+                                self._binary, self._token_pattern)
+
+    def recast(self):
+        """Perform selected process on the setup text
+
+        Returns
+        -------
+        ntext : scipy.sparse.csr_matrix
+            one row per document
+        """
+        super().recast()
+        import scipy.sparse
+
+        chunks = [self.data[start:start + self._chunk_size] for start in range(0, len(self.data), self._chunk_size)]
+        postfix = {f'VectorisationRecast [n_features={self._n_features}, ngram_range={self._ngram_range}] process': 'vectorise'}
+        if self._n_jobs > 1 and len(chunks) > 1:
+            args = (self._n_features, self._ngram_range, self._vocabulary, self._binary, self._token_pattern)
+            with ProcessPoolExecutor(min(self._n_jobs, len(chunks))) as pool:
+                parts = list(pool.map(_vectorise_chunk, chunks, *([arg] * len(chunks) for arg in args)))
+        else:
+            parts = self._recast_map(chunks, self.__base_recast, postfix)
+
+        indptr, shift = [numpy.zeros(1, dtype=numpy.int64)], 0
+        for _, _, chunk_indptr in parts:
+            chunk_indptr = numpy.frombuffer(chunk_indptr, dtype=numpy.int64)
+            indptr.append(chunk_indptr[1:] + shift)
+            shift += chunk_indptr[-1]
+        indices = numpy.concatenate([numpy.frombuffer(part[0], dtype=numpy.int64) for part in parts] or [numpy.zeros(0, dtype=numpy.int64)])
+        values = numpy.concatenate([numpy.frombuffer(part[1], dtype=numpy.float64) for part in parts] or [numpy.zeros(0)])
+
+        matrix = scipy.sparse.csr_matrix((values, indices, numpy.concatenate(indptr)), shape=(len(self.data), self._n_features))
+        if self._norm is not None:
+            norms = abs(matrix).sum(axis=1).A1 if self._norm == 'l1' else numpy.sqrt(matrix.multiply(matrix).sum(axis=1).A1)
+            norms[norms == 0] = 1.0
+            matrix = scipy.sparse.diags(1.0 / norms).dot(matrix).tocsr()
+
+        return matrix
+
+    def transform_one(self, text):
+        """
+        Vectorise a single string
+
+        Returns
+        -------
+        ntext : scipy.sparse.csr_matrix
+            one row
+        """
+        import scipy.sparse
+
+        indices, values, indptr = self.__base_recast([text])
+        matrix = scipy.sparse.csr_matrix((numpy.frombuffer(values, dtype=numpy.float64), numpy.frombuffer(indices, dtype=numpy.int64),
+                                          numpy.frombuffer(indptr, dtype=numpy.int64)), shape=(1, self._n_features))
+        if self._norm is not None:
+            norm = abs(matrix).sum() if self._norm == 'l1' else numpy.sqrt(matrix.multiply(matrix).sum())
+            if norm:
+                matrix = matrix / norm
+        return matrix
+
+    def setup_recast(self, text):
+        """Change the input text type to supported type
+        and
+        Perform selected process on the setup text
+
+        Parameters
+        ----------
+        text : string / list of strings / pandas.core.series.Series
+
+        Returns
+        -------
+        ntext : scipy.sparse.csr_matrix
+            one row per document
+        """
+        self.setup(text)
+        return self.recast()
+
+
 
 def RecastPipeline(text, recastFuncs, **kwargs):
     
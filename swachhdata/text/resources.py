@@ -0,0 +1,72 @@
+_LOADED = {}
+
+
+def load_spacy(name, **kwargs):
+    """
+    spaCy model name, loaded once per process and shared by every recast using it
+    """
+    key = (name, repr(sorted(kwargs.items())))
+    model = _LOADED.get(key)
+    if model is None:
+        import spacy
+        model = _LOADED[key] = spacy.load(name, **kwargs)
+    return model
+
+
+class SpacyModel:
+    """Reference to a spaCy model, standing in for the loaded model.
+
+    Calls and attribute lookups go to the model, loaded by load_spacy on
+    first use and kept. Pickling only carries the name and load arguments, so
+    recasts holding a model are cheap to ship to worker processes, each
+    loading it once (or inheriting it from the parent when forked).
+
+    Parameters
+    ----------
+    name: string
+    **kwargs: passed on to spacy.load, e.g. disable=['parser', 'ner']
+
+    Examples
+    --------
+    >>> nlp = SpacyModel('en_core_web_sm')
+    >>> [token.text for token in nlp('Kate raced out')]
+    ['Kate', 'raced', 'out']
+    """
+
+    def __init__(self, name, **kwargs):
+
+        self.name = name
+        self.kwargs = kwargs
+        self._model = None
+
+    def __getstate__(self):
+        return {'name': self.name, 'kwargs': self.kwargs}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._model = None
+
+    def __repr__(self):
+        kwargs = ''.join(f', {key}={value!r}' for key, value in self.kwargs.items())
+        return f'SpacyModel({self.name!r}{kwargs})'
+
+    def load(self):
+        """
+        Loaded model, from the per process cache
+        """
+        if self._model is None:
+            self._model = load_spacy(self.name, **self.kwargs)
+        return self._model
+
+    def __call__(self, text):
+        model = self._model
+        if model is None:
+            model = self.load()
+        return model(text)
+
+    def __getattr__(self, attr):
+
+        # not set yet while unpickling
+        if attr.startswith('__') or attr in ('name', 'kwargs', '_model'):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
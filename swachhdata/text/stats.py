@@ -0,0 +1,427 @@
+import heapq
+import time
+
+from ..utils.metrics import REGISTRY
+
+
+def _is_matrix(data):
+
+    shape = getattr(data, 'shape', None)
+    return shape is not None and len(shape) == 2
+
+
+def _nchars(data):
+
+    if _is_matrix(data):
+        return None
+    try:
+        return sum(len(text) for text in data if isinstance(text, str))
+    except TypeError:
+        return None
+
+
+def _nmodified(before, after):
+
+    # every document was turned into a row of the matrix
+    if _is_matrix(after):
+        return after.shape[0]
+    return sum(1 for old, new in zip(before, after) if old is not new and old != new)
+
+
+class StageStats:
+    """Timing and throughput of one Pipeline stage.
+
+    Attributes
+    ----------
+    index : int
+        position of the stage in Pipeline.chain
+    name : string
+        recast name
+    wall_s, cpu_s : float
+        wall clock and CPU time spent in the stage
+    docs : int
+        documents recast by the stage
+    chars_in, chars_out : int
+        characters entering and leaving the stage
+    modified : int
+        documents whose text was changed by the stage
+    peak_bytes : int
+        peak memory allocated by the stage, None unless traced
+    cached : bool
+        True when the stage output was taken from a cache instead
+    fallbacks : int
+        documents of a run of deferred edits recast stage by stage
+    """
+
+    def __init__(self, index, name):
+
+        self.index = index
+        self.name = name
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.docs = 0
+        self.chars_in = 0
+        self.chars_out = 0
+        self.modified = 0
+        self.peak_bytes = None
+        self.cached = False
+        self.fallbacks = 0
+
+    def __repr__(self):
+        return (f'StageStats({self.index}, {self.name}, wall_s={self.wall_s:.6f}, cpu_s={self.cpu_s:.6f}, '
+                f'docs={self.docs}, docs_per_s={self.docs_per_s:.1f}, modified={self.modified})')
+
+    @property
+    def docs_per_s(self):
+        return self.docs / self.wall_s if self.wall_s else 0.0
+
+    def start(self, data):
+        """
+        Start timing the stage on data
+        """
+        self.docs += len(data)
+        self.chars_in += _nchars(data) or 0
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+
+    def stop(self, data, ntext):
+        """
+        Stop timing the stage, ntext being its output on data
+        """
+        self.wall_s += time.perf_counter() - self._wall
+        self.cpu_s += time.process_time() - self._cpu
+        self.chars_out += _nchars(ntext) or 0
+        self.modified += _nmodified(data, ntext)
+        del self._wall, self._cpu
+
+    def merge(self, other):
+        """
+        Accumulate the counts of other, the same stage on another chunk
+        """
+        self.wall_s += other.wall_s
+        self.cpu_s += other.cpu_s
+        self.docs += other.docs
+        self.chars_in += other.chars_in
+        self.chars_out += other.chars_out
+        self.modified += other.modified
+        if other.peak_bytes is not None:
+            self.peak_bytes = max(self.peak_bytes or 0, other.peak_bytes)
+        self.cached = self.cached and other.cached
+        self.fallbacks += other.fallbacks
+
+    def to_dict(self):
+        return {
+            'index': self.index,
+            'name': self.name,
+            'wall_s': self.wall_s,
+            'cpu_s': self.cpu_s,
+            'docs': self.docs,
+            'docs_per_s': self.docs_per_s,
+            'chars_in': self.chars_in,
+            'chars_out': self.chars_out,
+            'modified': self.modified,
+            'peak_bytes': self.peak_bytes,
+            'cached': self.cached,
+            'fallbacks': self.fallbacks
+        }
+
+
+class PipelineStats:
+    """Per-stage statistics of the last Pipeline.recast.
+
+    Attributes
+    ----------
+    stages : list of StageStats
+    wall_s, cpu_s : float
+        wall clock and CPU time of the whole recast
+    docs : int
+        documents passed to the Pipeline
+    chars_in, chars_out : int
+        characters entering and leaving the Pipeline
+    cache : dict
+        hits and misses of every cache used by the recast
+    chunks : int
+        chunks spilled to disk under a memory budget
+
+    Examples
+    --------
+    >>> pipeline.setup_recast(text)
+    >>> print(pipeline.stats)
+    stage                      wall_s      cpu_s     docs/s     modified   peak_bytes
+    htmlRecast               0.412000   0.410000     2427.2         1000            -
+    urlRecast                0.021000   0.021000    47619.0          612            -
+    """
+
+    def __init__(self, docs=0):
+
+        self.stages = []
+        self.docs = docs
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.chars_in = 0
+        self.chars_out = 0
+        self.cache = {}
+        self.chunks = 0
+
+    def __iter__(self):
+        return iter(self.stages)
+
+    def __len__(self):
+        return len(self.stages)
+
+    def __getitem__(self, index):
+        return self.stages[index]
+
+    def __str__(self):
+        lines = [f'{"stage":<22} {"wall_s":>10} {"cpu_s":>10} {"docs/s":>10} {"modified":>12} {"peak_bytes":>12}']
+        for stage in self.stages:
+            peak = stage.peak_bytes if stage.peak_bytes is not None else '-'
+            lines.append(f'{stage.name:<22} {stage.wall_s:>10.6f} {stage.cpu_s:>10.6f} '
+                         f'{stage.docs_per_s:>10.1f} {stage.modified:>12} {peak:>12}')
+        return '\n'.join(lines)
+
+    @property
+    def docs_per_s(self):
+        return self.docs / self.wall_s if self.wall_s else 0.0
+
+    def add(self, stats):
+        """
+        Merge the stats of a stage run into the stage at the same index
+        """
+        for stage in self.stages:
+            if stage.index == stats.index:
+                stage.merge(stats)
+                return stage
+
+        self.stages.append(stats)
+        self.stages.sort(key=lambda stage: stage.index)
+        return stats
+
+    def merge(self, other):
+        """
+        Accumulate the stats of other, a recast of another chunk
+        """
+        for stage in other.stages:
+            merged = StageStats(stage.index, stage.name)
+            merged.cached = True
+            merged.merge(stage)
+            self.add(merged)
+        self.docs += other.docs
+        self.wall_s += other.wall_s
+        self.cpu_s += other.cpu_s
+        self.chars_in += other.chars_in
+        self.chars_out += other.chars_out
+        self.chunks += other.chunks
+        for name, counts in other.cache.items():
+            total = self.cache.setdefault(name, {'hits': 0, 'misses': 0})
+            total['hits'] += counts['hits']
+            total['misses'] += counts['misses']
+
+    def to_dict(self):
+        return {
+            'docs': self.docs,
+            'wall_s': self.wall_s,
+            'cpu_s': self.cpu_s,
+            'docs_per_s': self.docs_per_s,
+            'chars_in': self.chars_in,
+            'chars_out': self.chars_out,
+            'cache': self.cache,
+            'chunks': self.chunks,
+            'stages': [stage.to_dict() for stage in self.stages]
+        }
+
+
+class StatsCallback:
+    """Hook notified with Pipeline statistics, override the methods needed.
+
+    Plain callables passed as Pipeline callbacks are used as on_stage_end.
+
+    Examples
+    --------
+    >>> class Forward(StatsCallback):
+    ...     def on_stage_end(self, stats):
+    ...         monitor.gauge(f'swachhdata.{stats.name}.docs_per_s', stats.docs_per_s)
+    >>> pipeline = Pipeline([htmlRecast(), urlRecast()], callbacks=[Forward()])
+    """
+
+    def on_stage_end(self, stats):
+        """
+        Called with the StageStats after every stage run
+        """
+
+    def on_recast_end(self, stats):
+        """
+        Called with the PipelineStats at the end of every recast
+        """
+
+
+class MetricsCallback(StatsCallback):
+    """Accumulate Pipeline statistics into a MetricsRegistry.
+
+    Parameters
+    ----------
+    registry: MetricsRegistry, default=None (swachhdata.utils.metrics.REGISTRY)
+    pipeline: string, default='pipeline'
+        value of the pipeline label of every metric
+
+    Attributes
+    ----------
+    queue_depth : Gauge
+        to be set by the worker with the number of documents waiting
+
+    Examples
+    --------
+    >>> from swachhdata.utils.metrics import REGISTRY
+    >>> metrics = MetricsCallback(pipeline='tweets')
+    >>> pipeline = Pipeline([urlRecast(), CaseRecast()], callbacks=[metrics])
+    >>> REGISTRY.serve(port=9464)
+    >>> while True:
+    ...     metrics.queue_depth.set(queue.qsize())
+    ...     pipeline.setup_recast(queue.get())
+    """
+
+    def __init__(self, registry=None, pipeline='pipeline'):
+
+        registry = REGISTRY if registry is None else registry
+        self._pipeline = pipeline
+        self._documents = registry.counter(
+            'swachhdata_documents_total', 'Documents recast by the Pipeline', ['pipeline'])
+        self._chars_in = registry.counter(
+            'swachhdata_characters_in_total', 'Characters entering the Pipeline', ['pipeline'])
+        self._chars_out = registry.counter(
+            'swachhdata_characters_out_total', 'Characters leaving the Pipeline', ['pipeline'])
+        self._recast_seconds = registry.histogram(
+            'swachhdata_recast_seconds', 'Wall time of a Pipeline recast', ['pipeline'])
+        self._stage_documents = registry.counter(
+            'swachhdata_stage_documents_total', 'Documents recast by a stage', ['pipeline', 'stage'])
+        self._stage_modified = registry.counter(
+            'swachhdata_stage_modified_total', 'Documents modified by a stage', ['pipeline', 'stage'])
+        self._stage_seconds = registry.histogram(
+            'swachhdata_stage_seconds', 'Wall time of a stage run', ['pipeline', 'stage'])
+        self._cache_hits = registry.counter(
+            'swachhdata_cache_hits_total', 'Cache hits', ['pipeline', 'cache'])
+        self._cache_misses = registry.counter(
+            'swachhdata_cache_misses_total', 'Cache misses', ['pipeline', 'cache'])
+        self.queue_depth = registry.gauge(
+            'swachhdata_queue_depth', 'Documents waiting in the worker queue', ['pipeline'])
+
+    def on_stage_end(self, stats):
+
+        if stats.cached:
+            return
+        self._stage_documents.inc(stats.docs, pipeline=self._pipeline, stage=stats.name)
+        self._stage_modified.inc(stats.modified, pipeline=self._pipeline, stage=stats.name)
+        self._stage_seconds.observe(stats.wall_s, pipeline=self._pipeline, stage=stats.name)
+
+    def on_recast_end(self, stats):
+
+        self._documents.inc(stats.docs, pipeline=self._pipeline)
+        self._chars_in.inc(stats.chars_in, pipeline=self._pipeline)
+        self._chars_out.inc(stats.chars_out, pipeline=self._pipeline)
+        self._recast_seconds.observe(stats.wall_s, pipeline=self._pipeline)
+        for cache, counts in stats.cache.items():
+            self._cache_hits.inc(counts['hits'], pipeline=self._pipeline, cache=cache)
+            self._cache_misses.inc(counts['misses'], pipeline=self._pipeline, cache=cache)
+
+
+class SlowLog:
+    """Bounded log of the K slowest documents of every stage.
+
+    Parameters
+    ----------
+    k: int (>0), default=10
+        documents kept per stage
+    preview: int (>0), default=80
+        characters of the document kept in exported records
+
+    Examples
+    --------
+    >>> slowlog = pipeline.profile(k=5)
+    >>> pipeline.setup_recast(text)
+    >>> slowlog.records('urlRecast')
+    [{'stage': 'urlRecast', 'index': 1289, 'elapsed_s': 0.8213, 'length': 48211, 'preview': '...'}, ...]
+    """
+
+    def __init__(self, k=10, preview=80):
+
+        if not isinstance(k, int) or k < 1:
+            raise ValueError(
+                f'Expected k to be a positive int, got {k}'
+            )
+
+        self._k = k
+        self._preview = preview
+        self._heaps = {}
+        self._seq = 0
+        # maps positions within the recast data to positions of the caller's input
+        self.positions = None
+
+    def __len__(self):
+        return sum(len(heap) for heap in self._heaps.values())
+
+    @property
+    def stages(self):
+        return list(self._heaps)
+
+    def record(self, stage, index, elapsed, text):
+        """
+        Offer a timed document, kept if among the K slowest of stage
+        """
+        heap = self._heaps.setdefault(stage, [])
+        if self.positions is not None:
+            index = self.positions[index]
+
+        self._seq += 1
+        item = (elapsed, self._seq, index, text)
+        if len(heap) < self._k:
+            heapq.heappush(heap, item)
+        elif elapsed > heap[0][0]:
+            heapq.heapreplace(heap, item)
+
+    def profile(self, stage, func, data, start=0):
+        """
+        Apply func on every document of data, timing each call,
+        start being the index of the first document
+
+        Returns
+        -------
+        results : list
+        """
+        results = []
+        clock = time.perf_counter
+        for index, text in enumerate(data, start):
+            t0 = clock()
+            results.append(func(text))
+            self.record(stage, index, clock() - t0, text)
+        return results
+
+    def records(self, stage=None):
+        """
+        Slowest documents, slowest first
+
+        Returns
+        -------
+        records : list of dict(s)
+            stage, index, elapsed_s, length and preview of the document
+        """
+        stages = self._heaps if stage is None else [stage]
+        records = []
+        for name in stages:
+            for elapsed, _, index, text in self._heaps.get(name, []):
+                records.append({
+                    'stage': name,
+                    'index': index,
+                    'elapsed_s': elapsed,
+                    'length': len(text),
+                    'preview': text[:self._preview]
+                })
+        return sorted(records, key=lambda record: record['elapsed_s'], reverse=True)
+
+    def to_frame(self, stage=None):
+        """
+        Slowest documents as a pandas.core.frame.DataFrame
+        """
+        import pandas
+        return pandas.DataFrame(self.records(stage), columns=['stage', 'index', 'elapsed_s', 'length', 'preview'])
+
+    def clear(self):
+        self._heaps.clear()
@@ -0,0 +1,126 @@
+from itertools import chain
+
+import numpy
+
+
+class ExtractionStore:
+    """Columnar store of the items extracted by Pipeline stages.
+
+    Every column keeps its items flat in one array next to document offsets
+    (CSR layout), the items of document i being values[offsets[i]:offsets[i + 1]].
+
+    Examples
+    --------
+    >>> from swachhdata.text import Pipeline, urlRecast, MentionsRecast, CaseRecast
+    >>> text = ['Follow @jondoe at www.samplewebsite.com', 'Follow @janedoe and @jondoe']
+    >>> pipeline = Pipeline([urlRecast(process='extract_remove'), MentionsRecast(process='extract_remove'), CaseRecast()])
+    >>> pipeline.setup_recast(text)
+    ['follow at', 'follow and']
+    >>> pipeline.extractions.offsets('mentions')
+    array([0, 1, 3])
+    >>> pipeline.extractions.to_frame()
+       doc    entity                   value
+    0    0      urls  www.samplewebsite.com
+    1    0  mentions                 @jondoe
+    2    1  mentions                @janedoe
+    3    1  mentions                 @jondoe
+    """
+
+    def __init__(self):
+
+        self._columns = {}
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __iter__(self):
+        return iter(list(self._columns))
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        """
+        Items of column name, one list per document
+        """
+        values, offsets = self._columns[name]
+        return [values[offsets[i]:offsets[i + 1]].tolist() for i in range(len(offsets) - 1)]
+
+    def __repr__(self):
+        columns = ', '.join(f'{name}={len(values)}' for name, (values, _) in self._columns.items())
+        return f'ExtractionStore({columns})'
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def put(self, name, extracted):
+        """
+        Store column name from one list of items per document, replacing it if present
+        """
+        lengths = numpy.fromiter((len(items) if items is not None else 0 for items in extracted),
+                                 dtype=numpy.int64, count=len(extracted))
+        offsets = numpy.zeros(len(extracted) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=offsets[1:])
+
+        values = numpy.fromiter(chain.from_iterable(items for items in extracted if items),
+                                dtype=object, count=offsets[-1])
+        self._columns[name] = (values, offsets)
+
+    def discard(self, name):
+        """
+        Remove column name if present
+        """
+        self._columns.pop(name, None)
+
+    def values(self, name):
+        """
+        Flat array of the items of column name
+        """
+        return self._columns[name][0]
+
+    def offsets(self, name):
+        """
+        Array of len(documents) + 1 offsets of every document into values(name)
+        """
+        return self._columns[name][1]
+
+    def row(self, name, index):
+        """
+        Items of column name extracted from the document at index
+        """
+        values, offsets = self._columns[name]
+        return values[offsets[index]:offsets[index + 1]].tolist()
+
+    def to_frame(self, columns=None):
+        """
+        Exploded pandas.core.frame.DataFrame, one row per extracted item
+
+        Returns
+        -------
+        frame : pandas.core.frame.DataFrame
+            doc, entity and value of every item
+        """
+        import pandas
+
+        columns = self.columns if columns is None else columns
+        docs, entities, values = [], [], []
+        for name in columns:
+            column, offsets = self._columns[name]
+            docs.append(numpy.repeat(numpy.arange(len(offsets) - 1), numpy.diff(offsets)))
+            entities.append(numpy.full(len(column), name, dtype=object))
+            values.append(column)
+
+        if not columns:
+            return pandas.DataFrame(columns=['doc', 'entity', 'value'])
+        return pandas.DataFrame({
+            'doc': numpy.concatenate(docs),
+            'entity': numpy.concatenate(entities),
+            'value': numpy.concatenate(values)
+        })
+
+    def to_dict(self):
+        return {name: self[name] for name in self._columns}
+
+    def clear(self):
+        self._columns.clear()
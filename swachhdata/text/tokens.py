@@ -0,0 +1,236 @@
+import threading
+from array import array
+
+import numpy
+
+
+class Vocabulary:
+    """Interned token strings and their integer ids, ids are assigned in
+    order of first occurrence and never change. Adding is thread safe, so
+    one vocabulary may be shared by recasts running in several threads.
+
+    Examples
+    --------
+    >>> vocab = Vocabulary()
+    >>> vocab.add('data'), vocab.add('cleaning'), vocab.add('data')
+    (0, 1, 0)
+    >>> vocab[1], len(vocab)
+    ('cleaning', 2)
+    """
+
+    def __init__(self, tokens=None):
+
+        self._tokens = []
+        self._ids = {}
+        self._lock = threading.Lock()
+        if tokens is not None:
+            for token in tokens:
+                self.add(token)
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __iter__(self):
+        return iter(self._tokens)
+
+    def __contains__(self, token):
+        return token in self._ids
+
+    def __getitem__(self, index):
+        return self._tokens[index]
+
+    def __getstate__(self):
+        return {'tokens': self._tokens}
+
+    def __setstate__(self, state):
+
+        self._tokens = state['tokens']
+        self._ids = {token: i for i, token in enumerate(self._tokens)}
+        self._lock = threading.Lock()
+
+    def add(self, token):
+        """
+        Id of token, interning it if new
+        """
+        index = self._ids.get(token)
+        if index is None:
+            with self._lock:
+                index = self._ids.get(token)
+                if index is None:
+                    self._tokens.append(token)
+                    index = self._ids[token] = len(self._tokens) - 1
+        return index
+
+    def get(self, token, default=None):
+        return self._ids.get(token, default)
+
+    def to_numpy(self):
+        """
+        Tokens as a numpy object array, indexable by ids
+        """
+        tokens = numpy.empty(len(self._tokens), dtype=object)
+        tokens[:] = self._tokens
+        return tokens
+
+
+class TokenizedCorpus:
+    """Compact tokenised corpus: a Vocabulary, one flat array of token ids and
+    per-document offsets, the tokens of document i being
+    ids[offsets[i]:offsets[i + 1]].
+
+    Behaves like the list of token lists it replaces, documents are only
+    turned back into lists of strings on access.
+
+    Parameters
+    ----------
+    vocab: Vocabulary
+    ids: numpy.ndarray (int32)
+    offsets: numpy.ndarray (int64), len(documents) + 1
+
+    Examples
+    --------
+    >>> from swachhdata.text import TokenisationRecast
+    >>> rec = TokenisationRecast(method='word', compact=True)
+    >>> tokens = rec.setup_recast(['the best service', 'the best tab'])
+    >>> tokens[1]
+    ['the', 'best', 'tab']
+    >>> tokens.ids, tokens.offsets
+    (array([0, 1, 2, 0, 1, 3], dtype=int32), array([0, 3, 6]))
+    """
+
+    def __init__(self, vocab, ids, offsets):
+
+        self.vocab = vocab
+        self.ids = ids
+        self.offsets = offsets
+
+    @classmethod
+    def from_tokens(cls, documents, vocab=None):
+        """
+        Build from an iterable of token lists
+        """
+        builder = TokenizedCorpusBuilder(vocab)
+        for tokens in documents:
+            builder.add(tokens)
+        return builder.build()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('TokenizedCorpus index out of range')
+        tokens = self.vocab._tokens
+        return [tokens[i] for i in self.ids[self.offsets[index]:self.offsets[index + 1]].tolist()]
+
+    def __iter__(self):
+
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+
+        if isinstance(other, TokenizedCorpus):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __add__(self, other):
+
+        if not isinstance(other, TokenizedCorpus):
+            return list(self) + list(other)
+        if other.vocab is not self.vocab:
+            other = TokenizedCorpus.from_tokens(other, self.vocab)
+        ids = numpy.concatenate([self.ids, other.ids])
+        offsets = numpy.concatenate([self.offsets, other.offsets[1:] + self.offsets[-1]])
+        return TokenizedCorpus(self.vocab, ids, offsets)
+
+    @classmethod
+    def concat(cls, corpora, vocab=None):
+        """
+        One corpus of the documents of corpora, in order; the ids of corpora
+        with another vocabulary than vocab (default the first one's) are remapped
+        """
+        corpora = list(corpora)
+        if vocab is None:
+            vocab = corpora[0].vocab if corpora else Vocabulary()
+        ids, offsets, shift = [], [numpy.zeros(1, dtype=numpy.int64)], 0
+        for corpus in corpora:
+            part = corpus.ids
+            if corpus.vocab is not vocab and len(part):
+                mapping = numpy.array([vocab.add(token) for token in corpus.vocab], dtype=numpy.int32)
+                part = mapping[part]
+            ids.append(part)
+            offsets.append(corpus.offsets[1:] + shift)
+            shift += int(corpus.offsets[-1])
+        ids = numpy.concatenate(ids) if ids else numpy.empty(0, dtype=numpy.int32)
+        return cls(vocab, ids, numpy.concatenate(offsets))
+
+    def __repr__(self):
+        return f'TokenizedCorpus(documents={len(self)}, tokens={len(self.ids)}, vocabulary={len(self.vocab)})'
+
+    @property
+    def nbytes(self):
+        """
+        Bytes taken by the id and offset arrays
+        """
+        return self.ids.nbytes + self.offsets.nbytes
+
+    def lengths(self):
+        """
+        Number of tokens of every document
+        """
+        return numpy.diff(self.offsets)
+
+    def document_ids(self, index):
+        """
+        Token ids of the document at index, a view of ids
+        """
+        return self.ids[self.offsets[index]:self.offsets[index + 1]]
+
+    def to_numpy(self, pad=-1):
+        """
+        Token ids as a (documents, longest document) matrix, padded with pad
+        """
+        lengths = self.lengths()
+        matrix = numpy.full((len(self), int(lengths.max()) if len(self) else 0), pad, dtype=self.ids.dtype)
+        rows = numpy.repeat(numpy.arange(len(self)), lengths)
+        columns = numpy.arange(len(self.ids)) - numpy.repeat(self.offsets[:-1], lengths)
+        matrix[rows, columns] = self.ids
+        return matrix
+
+    def to_list(self):
+        return list(self)
+
+
+class TokenizedCorpusBuilder:
+    """Accumulate token lists one document at a time into a TokenizedCorpus"""
+
+    def __init__(self, vocab=None):
+
+        self.vocab = vocab if vocab is not None else Vocabulary()
+        self._ids = array('i')
+        self._offsets = array('q', [0])
+
+    def add(self, tokens):
+
+        add = self.vocab.add
+        self._ids.extend([add(token) for token in tokens])
+        self._offsets.append(len(self._ids))
+
+    def build(self):
+        """
+        TokenizedCorpus of the documents added so far, the builder starts over empty
+        """
+        ids = numpy.frombuffer(self._ids, dtype=numpy.int32) if self._ids else numpy.empty(0, dtype=numpy.int32)
+        offsets = numpy.frombuffer(self._offsets, dtype=numpy.int64)
+        # the arrays keep sharing the buffers, which must not be resized anymore
+        self._ids, self._offsets = array('i'), array('q', [0])
+        return TokenizedCorpus(self.vocab, ids, offsets)
@@ -1,5 +1,6 @@
 from .verify import (
     verify_array,
+    verify_corpus,
     verify_dataframe,
     verify_list,
     verify_series,
@@ -22,9 +23,14 @@ from .recast import (
     recast_to_list
 )
 
+from .metrics import (
+    MetricsRegistry
+)
+
 __all__ = [
     'verify_str',
     'verify_array',
+    'verify_corpus',
     'verify_dataframe',
     'verify_list',
     'verify_series',
@@ -34,5 +40,6 @@ __all__ = [
     'fetch_num_columns',
     'fetch_num_rows',
     'probe_string_data',
-    'recast_to_list'
+    'recast_to_list',
+    'MetricsRegistry'
 ]
\ No newline at end of file
@@ -0,0 +1,230 @@
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format(value):
+
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(names, values, extra=()):
+
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _Metric:
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f'Expected labels {self.labelnames} for metric {self.name}, got {tuple(labels)}'
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        with self._lock:
+            return [(self.name, key, (), value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {_escape(self.documentation)}', f'# TYPE {self.name} {self.kind}']
+        for name, key, extra, value in self._samples():
+            lines.append(f'{name}{_labels(self.labelnames, key, extra)} {_format(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+
+        if amount < 0:
+            raise ValueError(
+                f'Counter {self.name} can only increase, got {amount}'
+            )
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. a queue depth"""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self):
+
+        samples = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    samples.append((f'{self.name}_bucket', key, (('le', _format(bound)),), count))
+                samples.append((f'{self.name}_sum', key, (), total))
+                samples.append((f'{self.name}_count', key, (), counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Process local collection of metrics exported in the Prometheus text format.
+
+    Examples
+    --------
+    >>> from swachhdata.utils.metrics import MetricsRegistry
+    >>> registry = MetricsRegistry()
+    >>> queue_depth = registry.gauge('swachhdata_queue_depth', 'Documents waiting to be cleaned')
+    >>> queue_depth.set(42)
+    >>> registry.write('/var/lib/node_exporter/swachhdata.prom')
+    >>> # OR
+    >>> server = registry.serve(port=9464)
+    """
+
+    def __init__(self):
+
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(list(self._metrics.values()))
+
+    def __getitem__(self, name):
+        return self._metrics[name]
+
+    def __register(self, cls, name, documentation, labelnames, **kwargs):
+
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(
+                    f'Metric {name} already registered as {metric.kind} with labels {metric.labelnames}'
+                )
+            return metric
+
+    def counter(self, name, documentation='', labelnames=()):
+        return self.__register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation='', labelnames=()):
+        return self.__register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation='', labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.__register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format
+        """
+        return '\n'.join(metric.render() for metric in self) + '\n'
+
+    def write(self, path):
+        """
+        Atomically write the metrics to path, e.g. for a node_exporter textfile collector
+        """
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            fh.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port=9464, addr='127.0.0.1'):
+        """
+        Serve the metrics over HTTP from a daemon thread
+
+        Returns
+        -------
+        server : http.server.ThreadingHTTPServer
+            call server.shutdown() to stop serving
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, port), Handler)
+        thread = threading.Thread(target=server.serve_forever, name='swachhdata-metrics', daemon=True)
+        thread.start()
+        return server
+
+
+REGISTRY = MetricsRegistry()
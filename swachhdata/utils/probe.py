@@ -1,4 +1,5 @@
 from .verify import (
+    verify_corpus,
     verify_list, 
     verify_str
 )
@@ -9,6 +10,10 @@ from .recast import (
 
 def probe_string_data(data):
 
+    # documents of a mapped corpus are str by construction, keep it lazy
+    if verify_corpus(data):
+        return data
+
     if not verify_list(data):
         data = recast_to_list(data)
 
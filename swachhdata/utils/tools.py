@@ -1,4 +1,5 @@
 from .verify import (
+    verify_corpus,
     verify_dataframe,
     verify_series,
     verify_array,
@@ -9,7 +10,7 @@ def fetch_num_rows(data):
     if verify_dataframe(data) or verify_array(data) or verify_series(data):
         return data.shape[0]
     
-    elif verify_list(data):
+    elif verify_list(data) or verify_corpus(data):
         return len(data)
 
 def fetch_num_columns(data):
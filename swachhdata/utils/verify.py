@@ -16,6 +16,9 @@ def verify_list(data):
 def verify_str(data):
     return isinstance(data, str)
 
+def verify_corpus(data):
+    return hasattr(data, 'id_mapped_corpus')
+
 from .tools import (
     fetch_num_columns,
     fetch_array_dim
@@ -38,9 +41,10 @@ def verify_valid_dtype_text(data):
        verify_series(data) or \
        verify_array(data) or \
        verify_dataframe(data) or \
-       verify_list(data):
+       verify_list(data) or \
+       verify_corpus(data):
        return True
     else:
         raise ValueError(
-                    f'The data should be of one of the following types - list / str / numpy.ndarray / pandas.core.DataFrame / pandas.core.Series.'
+                    f'The data should be of one of the following types - list / str / numpy.ndarray / pandas.core.DataFrame / pandas.core.Series / MappedCorpus.'
                 )
\ No newline at end of file
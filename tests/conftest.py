@@ -0,0 +1,43 @@
+import pytest
+
+from swachhdata.bench import make_corpus
+from swachhdata.text import (CaseRecast, EmojiRecast, EscapeSequencesRecast, HashtagsRecast, MentionsRecast,
+                             NumbersRecast, Pipeline, PunctuationsRecast, ShortWordsRecast, StopWordsRecast,
+                             htmlRecast, urlRecast)
+
+EDGE_CASES = ['', ' ', 'a', '@@@', '###', '1,234.5', 'www.a.com... x', '😊😊 hi😊', 'Café ☕️', "I'm they're",
+              'Hi @Jon\nsee https://t.co/x #Tag 42 😊']
+
+
+@pytest.fixture(scope='session')
+def corpus():
+    text = []
+    for name in ('tweets', 'html', 'numeric', 'multilingual'):
+        text += make_corpus(name, 40, seed=1)
+    return text + EDGE_CASES
+
+
+@pytest.fixture
+def chain():
+    """
+    Factory of a fresh chain of the common stages, extracting stages included
+    """
+    def make():
+        return [htmlRecast(), EscapeSequencesRecast(), urlRecast(process='extract_remove'),
+                MentionsRecast(process='extract_remove'), HashtagsRecast(process='extract_remove'),
+                EmojiRecast(process='extract_remove'), NumbersRecast(process='extract_remove'), CaseRecast(),
+                PunctuationsRecast(), StopWordsRecast(package='custom', stopwords=['the', 'a', 'and']),
+                ShortWordsRecast()]
+    return make
+
+
+@pytest.fixture
+def plain(chain):
+    """
+    Output and extractions of a plain Pipeline of chain() recasting text
+    """
+    def recast(text):
+        pipeline = Pipeline(chain(), verbose=0)
+        ntext = pipeline.setup_recast(list(text))
+        return ntext, pipeline.extractions.to_dict()
+    return recast
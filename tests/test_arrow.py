@@ -0,0 +1,52 @@
+import pytest
+
+from swachhdata.text import CaseRecast, DictionaryRecast, MentionsRecast, Pipeline
+from swachhdata.text.arrow import read_batches, recast_file
+
+pa = pytest.importorskip('pyarrow')
+pytest.importorskip('pyarrow.parquet')
+
+TEXT = ['Hi @Jon from New York', None, 'Bye @Ann', 'no match here', 'New York again']
+
+
+def _pipeline(spans=False):
+    return Pipeline([MentionsRecast(process='extract_remove'),
+                     DictionaryRecast(['new york'], process='extract_remove', spans=spans),
+                     CaseRecast()], verbose=0)
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+@pytest.mark.parametrize('spans', [False, True])
+def test_same_output_as_setup_recast(tmp_path, fmt, spans):
+    source, dest = str(tmp_path / f'in.{fmt}'), str(tmp_path / f'out.{fmt}')
+    table = pa.table({'id': list(range(len(TEXT))), 'text': TEXT})
+    if fmt == 'parquet':
+        pa.parquet.write_table(table, source)
+    else:
+        with pa.ipc.new_file(source, table.schema) as writer:
+            writer.write_table(table, max_chunksize=2)
+
+    # batches of two rows, one of them without any dictionary match
+    assert recast_file(_pipeline(spans), source, dest, batch_size=2) == len(TEXT)
+    result = pa.Table.from_batches(list(read_batches(dest)))
+
+    expected = _pipeline(spans)
+    assert result.column('text').to_pylist() == expected.setup_recast([text or '' for text in TEXT])
+    assert result.column('id').to_pylist() == list(range(len(TEXT)))
+    assert result.column('mentions').to_pylist() == expected.extractions['mentions']
+    matches = result.column('matches').to_pylist()
+    if spans:
+        matches = [[(item['match'], item['start'], item['end']) for item in items] for items in matches]
+    assert matches == expected.extractions['matches']
+
+
+def test_columns_and_output_column(tmp_path):
+    source, dest = str(tmp_path / 'in.parquet'), str(tmp_path / 'out.arrow')
+    pa.parquet.write_table(pa.table({'id': [1, 2], 'lang': ['en', 'en'], 'text': ['Hi @Jon', 'Bye']}), source)
+
+    pipeline = Pipeline([MentionsRecast(process='extract_remove'), CaseRecast()], verbose=0)
+    assert recast_file(pipeline, source, dest, columns=['id'], output_column='clean') == 2
+    batches = list(read_batches(dest, columns=['text', 'clean', 'mentions']))
+    assert pa.Table.from_batches(batches).to_pydict() == {
+        'text': ['Hi @Jon', 'Bye'], 'clean': ['hi', 'bye'], 'mentions': [['@Jon'], []]}
+    assert pa.ipc.open_file(dest).schema.names == ['id', 'text', 'clean', 'mentions']
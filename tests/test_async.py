@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from swachhdata.text import Pipeline
+
+
+@pytest.mark.parametrize('concurrency', [1, 3])
+def test_arecast_same_as_plain(corpus, chain, plain, concurrency):
+    pipeline = Pipeline(chain(), verbose=0)
+    with ProcessPoolExecutor(2) as executor:
+        ntext = asyncio.run(pipeline.arecast(corpus, chunk_size=16, executor=executor, concurrency=concurrency))
+    assert ntext == plain(corpus)[0]
+    assert pipeline.extractions.to_dict() == plain(corpus)[1]
+    assert pipeline.stats.docs == len(corpus)
+
+
+def test_arecast_iter_same_as_plain(corpus, chain, plain):
+    async def source():
+        for text in corpus:
+            await asyncio.sleep(0)
+            yield text
+
+    async def collect():
+        return [item async for item in Pipeline(chain(), verbose=0).arecast_iter(source(), chunk_size=10,
+                                                                                  extractions=True)]
+
+    results = asyncio.run(collect())
+    ntext, extracted = plain(corpus)
+    assert [text for text, _ in results] == ntext
+    assert [items['mentions'] for _, items in results] == extracted['mentions']
+
+
+def test_arecast_iter_backpressure(chain):
+    read = []
+
+    def source():
+        for i in range(1000):
+            read.append(i)
+            yield f'document {i}'
+
+    async def first():
+        stream = Pipeline(chain(), verbose=0).arecast_iter(source(), chunk_size=10, max_queue=2)
+        text = await stream.__anext__()
+        await asyncio.sleep(0.05)
+        await stream.aclose()
+        return text
+
+    assert asyncio.run(first()) == 'document'
+    # the chunk recast, the queued chunks and the one waiting to be queued
+    assert len(read) <= 10 * 5
+
+
+def test_arecast_iter_raises_source_errors(chain):
+    def source():
+        yield 'fine'
+        raise RuntimeError('source failed')
+
+    async def collect():
+        return [text async for text in Pipeline(chain(), verbose=0).arecast_iter(source(), chunk_size=1)]
+
+    with pytest.raises(RuntimeError, match='source failed'):
+        asyncio.run(collect())
+
+
+def test_concurrency_needs_processes(chain):
+    with ThreadPoolExecutor(2) as executor, pytest.raises(ValueError):
+        asyncio.run(Pipeline(chain(), verbose=0).arecast(['a'], executor=executor, concurrency=2))
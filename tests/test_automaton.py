@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from swachhdata.text import DictionaryRecast, Pipeline, automaton as automaton_module
+from swachhdata.text.automaton import Automaton
+
+TERMS = ['data cleaning', 'data', 'best service', 'catalogue', 'services tab', 'Sales', 'sales turnover', 'café',
+         'straße', 'new york', 'york']
+
+
+@pytest.fixture(params=['native', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'native':
+        pytest.importorskip('ahocorasick')
+    else:
+        monkeypatch.setattr(automaton_module, 'ahocorasick', None)
+    return request.param
+
+
+def _reference(terms, text):
+    # leftmost longest whole word matches, ignoring case
+    pattern = '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return [match.group() for match in re.finditer(rf'(?<!\w)(?:{pattern})(?!\w)', text, re.IGNORECASE)]
+
+
+def test_findall_same_as_regex(backend, corpus):
+    automaton = Automaton(TERMS)
+    assert (automaton._native is None) == (backend == 'python')
+    for text in corpus + ['Data cleaning, data-cleaning and datacleaning', 'NEW YORK york New Yorker']:
+        assert [text[start:end] for start, end, _ in automaton.findall(text)] == _reference(TERMS, text)
+
+
+def test_options(backend):
+    text = 'Data in metadata, DATA'
+    assert [text[s:e] for s, e, _ in Automaton(['data'], ignore_case=False).findall(text)] == []
+    assert [text[s:e] for s, e, _ in Automaton(['data'], word_boundary=False).findall(text)] == ['Data', 'data', 'DATA']
+    assert list(Automaton(['york', 'new york']).iter('new york')) == [(0, 8, 1), (4, 8, 0)]
+    assert len(Automaton(['a', 'A', '', 'b'])) == 2
+
+
+def test_dictionary_recast_processes():
+    text = ['John Doe moved to New York with johnny']
+    terms = ['john doe', 'new york', 'john']
+    assert DictionaryRecast(terms).setup_recast(text) == ['moved to with johnny']
+    assert DictionaryRecast(terms, process='extract').setup_recast(text) == [['John Doe', 'New York']]
+    rec = DictionaryRecast(terms, process='extract_replace', replacement={'new york': 'NYC'}, spans=True)
+    assert rec.setup_recast(text) == ([' moved to NYC with johnny'], [[('John Doe', 0, 8), ('New York', 18, 26)]])
+
+
+def test_saved_automaton(tmp_path):
+    path = str(tmp_path / 'terms.automaton')
+    first = DictionaryRecast(TERMS, automaton=path).automaton
+    assert DictionaryRecast(TERMS, automaton=path).automaton.digest == first.digest
+    assert DictionaryRecast(automaton=path).setup_recast(['best service']) == ['']
+
+    # rebuilt and saved again once the terms change
+    assert DictionaryRecast(['other'], automaton=path).setup_recast(['best service other']) == ['best service']
+    assert Automaton.load(path).terms == ['other']
+
+    (tmp_path / 'bogus').write_bytes(b'\x80\x04N.')
+    with pytest.raises(ValueError):
+        Automaton.load(str(tmp_path / 'bogus'))
+    with pytest.raises(ValueError):
+        DictionaryRecast()
+
+
+@pytest.mark.parametrize('kwargs', [{'dedup': True}, {'prefilter': True}, {'memory_budget': 20000}])
+def test_pipeline_modes_same_as_plain(corpus, kwargs):
+    def pipeline(**kwargs):
+        return Pipeline([DictionaryRecast(TERMS, process='extract_remove', spans=True)], verbose=0, **kwargs)
+
+    expected = pipeline()
+    ntext = expected.setup_recast(corpus)
+    actual = pipeline(**kwargs)
+    assert actual.setup_recast(corpus) == ntext
+    assert actual.extractions.to_dict() == expected.extractions.to_dict()
@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from swachhdata.text import BatchCoalescer, CaseRecast, MentionsRecast, Pipeline
+
+
+def _pipeline():
+    return Pipeline([MentionsRecast(process='extract_remove'), CaseRecast()], verbose=0)
+
+
+def test_same_output_as_setup_recast():
+    text = [f'Hi @user{i} There' for i in range(50)]
+    expected = _pipeline()
+    ntext = expected.setup_recast(text)
+    with BatchCoalescer(_pipeline(), max_batch_size=8, extractions=True) as coalescer:
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda doc: coalescer.submit(doc).result(), text))
+    assert [result[0] for result in results] == ntext
+    assert [result[1]['mentions'] for result in results] == expected.extractions['mentions']
+    assert coalescer.documents == 50
+
+
+def test_invalid_submission_does_not_fail_the_batch():
+    with BatchCoalescer(_pipeline(), max_batch_size=4, max_wait_us=100000) as coalescer:
+        first = coalescer.submit('Hi @Jon')
+        with pytest.raises(ValueError):
+            coalescer.submit(None)
+        with pytest.raises(ValueError):
+            coalescer.submit_many(['Bye @Ann', 3])
+        assert first.result() == 'hi'
+    assert coalescer.documents == 1
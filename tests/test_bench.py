@@ -0,0 +1,26 @@
+import json
+
+from swachhdata.bench import CORPORA, main, make_corpus, run
+
+
+def test_corpora_are_reproducible():
+    for name in CORPORA:
+        assert make_corpus(name, 40, seed=3) == make_corpus(name, 40, seed=3)
+    assert make_corpus('tweets', 40, seed=3) != make_corpus('tweets', 40, seed=4)
+
+
+def test_run_reports_every_case_and_corpus():
+    report = run(size=40, repeat=2, only=['urlRecast', 'Pipeline[social]'])
+    assert [(result['case'], result['corpus']) for result in report['results']] == [
+        ('urlRecast', 'tweets'), ('urlRecast', 'html'), ('Pipeline[social]', 'tweets')]
+    for result in report['results']:
+        assert result['status'] == 'ok'
+        assert len(result['wall_s']) == 2 and result['docs'] > 0 and result['peak_memory_bytes'] > 0
+    assert report['parameters'] == {'size': 40, 'repeat': 2, 'seed': 0}
+
+
+def test_main_writes_json(tmp_path):
+    path = tmp_path / 'bench.json'
+    main(['--size', '20', '--repeat', '1', '--only', 'CaseRecast', '--quiet', '--output', str(path)])
+    report = json.loads(path.read_text(encoding='utf-8'))
+    assert [result['corpus'] for result in report['results']] == ['tweets', 'multilingual']
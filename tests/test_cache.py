@@ -0,0 +1,80 @@
+import asyncio
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from swachhdata.text import CaseRecast, EscapeSequencesRecast, MentionsRecast, Pipeline, PrefixCache, ResultCache
+
+
+def _chain():
+    return [EscapeSequencesRecast(), MentionsRecast(process='extract_remove'), CaseRecast()]
+
+
+def test_result_cache_pickles(tmp_path):
+    cache = ResultCache(str(tmp_path / 'results.sqlite'))
+    cache.put_many([('key', ['value'])])
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy.get_many(['key']) == {'key': ['value']}
+    copy.close()
+    cache.close()
+
+
+def test_arecast_in_processes_with_result_cache(tmp_path):
+    text = ['Hi @Jon\nthere', 'Bye @Ann', 'Hi @Jon\nthere']
+    expected = Pipeline(_chain(), verbose=0)
+    pipeline = Pipeline(_chain(), verbose=0, cache=str(tmp_path / 'results.sqlite'))
+    with ProcessPoolExecutor(2) as executor:
+        ntext = asyncio.run(pipeline.arecast(text, chunk_size=2, executor=executor, concurrency=2))
+    assert ntext == expected.setup_recast(text)
+    assert pipeline.extractions['mentions'] == expected.extractions['mentions']
+
+
+def test_nested_pipeline_in_fingerprint():
+    nested = Pipeline([CaseRecast()], verbose=0)
+    pipeline = Pipeline([EscapeSequencesRecast(), nested], verbose=0)
+    fingerprint = pipeline.fingerprint
+    nested.chain[0] = CaseRecast(process='upper')
+    assert pipeline.fingerprint != fingerprint
+    assert Pipeline([EscapeSequencesRecast(), Pipeline([CaseRecast()], verbose=0)], verbose=0).fingerprint == fingerprint
+
+
+def test_warm_result_cache_same_as_plain(tmp_path, corpus, chain, plain):
+    path = str(tmp_path / 'results.sqlite')
+    Pipeline(chain(), verbose=0, cache=path).setup_recast(corpus[:30])
+
+    pipeline = Pipeline(chain(), verbose=0, cache=path)
+    assert pipeline.setup_recast(corpus) == plain(corpus)[0]
+    assert pipeline.extractions.to_dict() == plain(corpus)[1]
+    assert pipeline.stats.cache['disk']['hits'] == len(set(corpus[:30]))
+
+
+def test_result_cache_keyed_by_chain(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    assert Pipeline([CaseRecast()], verbose=0, cache=path).setup_recast(['Hi']) == ['hi']
+    assert Pipeline([CaseRecast(process='upper')], verbose=0, cache=path).setup_recast(['Hi']) == ['HI']
+
+
+def test_result_cache_evicts(tmp_path):
+    cache = ResultCache(str(tmp_path / 'results.sqlite'), max_entries=2)
+    cache.put_many([('a', 1), ('b', 2)])
+    cache.get_many(['a'])
+    cache.put_many([('c', 3)])
+    assert sorted(cache.get_many(['a', 'b', 'c'])) == ['a', 'c']
+    assert cache.stats()['evictions'] == 1
+    cache.close()
+
+
+@pytest.mark.parametrize('max_bytes', [None, 4096])
+def test_prefix_cache_same_as_plain(tmp_path, corpus, chain, plain, max_bytes):
+    prefix = PrefixCache(max_bytes=max_bytes, spill_dir=str(tmp_path / 'spill'))
+    Pipeline(chain()[:-1] + [CaseRecast(process='upper')], verbose=0, prefix_cache=prefix).setup_recast(corpus)
+
+    # resumes after the shared prefix, then recasts the last stage only
+    pipeline = Pipeline(chain(), verbose=0, prefix_cache=prefix)
+    assert pipeline.setup_recast(corpus) == plain(corpus)[0]
+    assert pipeline.extractions.to_dict() == plain(corpus)[1]
+    assert prefix.hits == 1
+    if max_bytes is not None:
+        assert os.listdir(tmp_path / 'spill')
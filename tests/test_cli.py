@@ -0,0 +1,68 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from swachhdata.cli import build_pipeline, clean, main, parse_spec
+
+
+def test_unknown_parameter_is_a_value_error():
+    with pytest.raises(ValueError, match='CaseRecast.*bogus'):
+        build_pipeline([('case', {'bogus': 1})])
+
+
+SPEC = 'url,mentions:process=extract_remove,case'
+
+
+def _expected(text):
+    pipeline = build_pipeline(parse_spec(SPEC))
+    return pipeline.setup_recast(list(text)), pipeline.extractions['mentions']
+
+
+def test_parse_spec():
+    stages = [('url', {}), ('mentions', {'process': 'extract_remove'}), ('case', {})]
+    assert parse_spec(SPEC) == stages
+    assert parse_spec('[{"recast": "url"}, {"recast": "mentions", "process": "extract_remove"}, "case"]') == stages
+    # values are parsed as JSON when they are, kept as strings otherwise
+    assert parse_spec('short:min_length=3,numbers:seperator=.') == [('short', {'min_length': 3}),
+                                                                    ('numbers', {'seperator': '.'})]
+    with pytest.raises(ValueError):
+        parse_spec('case:upper')
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_clean_jsonl_gz(tmp_path, corpus, jobs):
+    source, dest = tmp_path / 'in.jsonl.gz', tmp_path / 'out.jsonl'
+    with gzip.open(source, 'wt', encoding='utf-8') as fh:
+        for i, text in enumerate(corpus):
+            fh.write(json.dumps({'id': i, 'text': text}) + '\n')
+
+    assert clean([str(source)], SPEC, output=str(dest), jobs=jobs, chunk_size=16) == len(corpus)
+    rows = [json.loads(line) for line in dest.read_text(encoding='utf-8').splitlines()]
+    ntext, mentions = _expected(corpus)
+    assert [row['id'] for row in rows] == list(range(len(corpus)))
+    assert [row['text'] for row in rows] == ntext
+    assert [row['mentions'] for row in rows] == mentions
+
+
+def test_clean_csv(tmp_path):
+    source, dest = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    source.write_text('id,body\n1,Hi @Jon\n2,"Bye, @Ann"\n', encoding='utf-8')
+    clean([str(source)], SPEC, output=str(dest), column='body', output_column='clean')
+    with open(dest, encoding='utf-8', newline='') as fh:
+        rows = list(csv.DictReader(fh))
+    assert [(row['id'], row['body'], row['clean'], json.loads(row['mentions'])) for row in rows] == [
+        ('1', 'Hi @Jon', 'hi', ['@Jon']), ('2', 'Bye, @Ann', 'bye,', ['@Ann'])]
+
+
+def test_main_txt(tmp_path, capsys):
+    source, dest = tmp_path / 'in.txt', tmp_path / 'out.txt'
+    source.write_text('Hi @Jon\nSee www.a.com\n', encoding='utf-8')
+    main(['clean', '-p', SPEC, str(source), '-o', str(dest)])
+    assert dest.read_text(encoding='utf-8') == 'hi\nsee\n'
+
+    with pytest.raises(SystemExit) as exc:
+        main(['clean', '-p', 'bogus', str(source)])
+    assert exc.value.code == 1
+    assert 'Unknown recast bogus' in capsys.readouterr().err
@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+
+from swachhdata.compose import CorpusWriter, MappedCorpus, TextDatum, recast_corpus, write_corpus
+from swachhdata.text import Pipeline
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'corpus.swc')
+    texts = ['Follow @jondoe', '', 'visit www.samplewebsite.com', 'naïve café ✨']
+    assert write_corpus(path, texts) == 4
+    corpus = MappedCorpus(path)
+    assert len(corpus) == 4
+    assert corpus[0:4] == texts
+    assert [tmp.name for tmp in tmp_path.iterdir()] == ['corpus.swc']
+
+
+def test_failed_write_keeps_earlier_corpus(tmp_path):
+    path = str(tmp_path / 'corpus.swc')
+    write_corpus(path, ['kept'])
+    with pytest.raises(ValueError):
+        with CorpusWriter(path) as writer:
+            writer.extend(['new', None])
+    assert MappedCorpus(path)[0:1] == ['kept']
+    assert [tmp.name for tmp in tmp_path.iterdir()] == ['corpus.swc']
+
+
+def test_mapped_corpus_access_and_pickle(tmp_path):
+    path = str(tmp_path / 'corpus.swc')
+    write_corpus(path, ['a', 'bé', 'c'])
+    corpus = MappedCorpus(path)
+    assert (corpus[-1], list(corpus), corpus.nbytes, corpus.chunks(2)) == ('c', ['a', 'bé', 'c'], 5, [(0, 2), (2, 3)])
+    with pytest.raises(IndexError):
+        corpus[3]
+    assert pickle.loads(pickle.dumps(corpus))[0:3] == ['a', 'bé', 'c']
+    assert TextDatum.mmap(path).data[1] == 'bé'
+
+
+def test_pipeline_on_mapped_corpus_same_as_plain(tmp_path, corpus, chain, plain):
+    source, dest = str(tmp_path / 'in.swc'), str(tmp_path / 'out.swc')
+    write_corpus(source, corpus)
+
+    pipeline = Pipeline(chain(), verbose=0)
+    assert pipeline.setup_recast(MappedCorpus(source)) == plain(corpus)[0]
+    assert pipeline.extractions.to_dict() == plain(corpus)[1]
+
+    assert recast_corpus(Pipeline(chain(), verbose=0), source, dest, chunk_size=16) == len(corpus)
+    assert MappedCorpus(dest)[0:len(corpus)] == plain(corpus)[0]
+
+
+def test_not_a_corpus(tmp_path):
+    path = tmp_path / 'corpus.swc'
+    path.write_bytes(b'not a corpus at all, just bytes')
+    with pytest.raises(ValueError):
+        MappedCorpus(str(path))
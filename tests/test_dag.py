@@ -0,0 +1,71 @@
+import pytest
+
+from swachhdata.text import (CaseRecast, EmojiRecast, EscapeSequencesRecast, HashtagsRecast, MentionsRecast, Pipeline,
+                             PipelineDAG, PunctuationsRecast, htmlRecast, urlRecast)
+
+
+def test_options_with_a_pipeline_are_rejected():
+    dag = PipelineDAG(verbose=0)
+    with pytest.raises(ValueError, match='prefilter'):
+        dag.add('case', Pipeline([CaseRecast()], verbose=0), prefilter=True)
+
+
+def _base():
+    return [htmlRecast(), EscapeSequencesRecast(), urlRecast(process='extract_remove')]
+
+
+def _dag(**kwargs):
+    dag = PipelineDAG(verbose=0, **kwargs)
+    dag.add('base', _base(), output=False)
+    dag.add('display', [EmojiRecast()], after='base')
+    dag.add('search', [CaseRecast(), PunctuationsRecast()], after='base')
+    dag.add('analytics', [MentionsRecast(process='extract')], after='base', output=False)
+    dag.add('tags', [HashtagsRecast(process='extract_remove')], after='search')
+    return dag
+
+
+def _expected(text):
+    base = Pipeline(_base(), verbose=0)
+    shared = base.setup_recast(list(text))
+    search = Pipeline([CaseRecast(), PunctuationsRecast()], verbose=0).setup_recast(shared)
+    tags = Pipeline([HashtagsRecast(process='extract_remove')], verbose=0)
+    mentions = Pipeline([MentionsRecast(process='extract')], verbose=0)
+    mentions.setup_recast(shared)
+    outputs = {'display': Pipeline([EmojiRecast()], verbose=0).setup_recast(shared), 'search': search,
+               'tags': tags.setup_recast(search)}
+    return outputs, base.extractions['urls'], mentions.extractions['mentions'], tags.extractions['hashtags']
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'chunk_size': 16}, {'chunk_size': 16, 'max_workers': 3}])
+def test_same_as_sequential_pipelines(corpus, kwargs):
+    dag = _dag(**kwargs)
+    outputs, urls, mentions, hashtags = _expected(corpus)
+    assert dag.setup_recast(corpus) == outputs
+    assert dag.outputs == ['display', 'search', 'tags']
+    assert dag.extractions['base']['urls'] == urls
+    assert dag.extractions['analytics']['mentions'] == mentions
+    assert dag.extractions['tags']['hashtags'] == hashtags
+    assert dag.stats['display'].docs == len(corpus)
+
+
+def test_recast_iter(corpus):
+    outputs, urls, _, hashtags = _expected(corpus)
+    chunks = list(_dag(max_workers=2).recast_iter(iter(corpus), chunk_size=30, extractions=True))
+    assert [text for chunk, _ in chunks for text in chunk['tags']] == outputs['tags']
+    assert [items for _, extracted in chunks for items in extracted['base']['urls']] == urls
+    assert [items for _, extracted in chunks for items in extracted['tags']['hashtags']] == hashtags
+    assert len(chunks) == -(-len(corpus) // 30)
+
+
+def test_invalid_graphs():
+    dag = PipelineDAG(verbose=0)
+    case = CaseRecast()
+    dag.add('a', [case])
+    with pytest.raises(ValueError, match='already'):
+        dag.add('a', [CaseRecast()])
+    with pytest.raises(ValueError, match='earlier node'):
+        dag.add('b', [CaseRecast()], after='c')
+    with pytest.raises(ValueError, match='shares a recast'):
+        dag.add('b', [case], after='a')
+    with pytest.raises(ValueError):
+        PipelineDAG(verbose=0).setup_recast(['a'])
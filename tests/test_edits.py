@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from swachhdata.text import (CaseRecast, EmojiRecast, HashtagsRecast, MentionsRecast, NumbersRecast, Pipeline,
+                             urlRecast)
+
+PIECES = ['@jon', '#tag', 'www.a.com', 'https://t.co/x?y=1', '42', '1.5', '3,000', '😊', '❤️', '🇮🇳', 'word', 'Word',
+          '@a@b', '#a#b', 'a@b.com', '@jon.', '#1', 'x...', '@#', 'www.a.com/@x', '#tag😊', '😊@x', '(@jon)', '"#tag"',
+          'e-mail', '@', '#', '.', '', '\n', '  ']
+
+
+def _documents(seed, size=300):
+    rng = random.Random(seed)
+    return [rng.choice(['', ' ']).join(rng.choices(PIECES, k=rng.randint(0, 12))) for _ in range(size)]
+
+
+CHAINS = {
+    'remove': lambda: [urlRecast(), MentionsRecast(), HashtagsRecast(), NumbersRecast(), EmojiRecast()],
+    'extract': lambda: [urlRecast(process='extract_remove'), MentionsRecast(process='extract_remove'),
+                        HashtagsRecast(process='extract_remove'), NumbersRecast(process='extract_remove'),
+                        EmojiRecast(process='extract_remove')],
+    'mixed': lambda: [EmojiRecast(process='extract'), MentionsRecast(), CaseRecast(), HashtagsRecast(process='extract_remove'),
+                      urlRecast(), NumbersRecast()],
+    'reversed': lambda: [EmojiRecast(), NumbersRecast(process='extract_remove'), HashtagsRecast(), MentionsRecast(),
+                         urlRecast(process='extract_remove')]
+}
+
+
+@pytest.mark.parametrize('name', sorted(CHAINS))
+@pytest.mark.parametrize('seed', range(3))
+def test_deferred_same_as_sequential(name, seed):
+    text = _documents(seed)
+    expected = Pipeline(CHAINS[name](), verbose=0)
+    ntext = expected.setup_recast(text)
+
+    pipeline = Pipeline(CHAINS[name](), verbose=0, deferred=True)
+    assert pipeline.setup_recast(text) == ntext
+    assert pipeline.extractions.to_dict() == expected.extractions.to_dict()
+
+
+def test_deferred_common_chain_same_as_plain(corpus, chain, plain):
+    pipeline = Pipeline(chain(), verbose=0, deferred=True)
+    assert pipeline.setup_recast(corpus) == plain(corpus)[0]
+    assert pipeline.extractions.to_dict() == plain(corpus)[1]
+
+
+def test_interacting_edits_fall_back():
+    pipeline = Pipeline([MentionsRecast(), HashtagsRecast()], verbose=0, deferred=True)
+    assert pipeline.setup_recast(['hi @jon#tag there', 'hi @jon #tag there']) == ['hi there', 'hi there']
+    assert sum(stage.fallbacks for stage in pipeline.stats) == 1
@@ -0,0 +1,56 @@
+import urllib.request
+
+import pytest
+
+from swachhdata.text import CaseRecast, MentionsRecast, MetricsCallback, Pipeline
+from swachhdata.utils import MetricsRegistry
+
+
+def _recast(registry, text, **kwargs):
+    pipeline = Pipeline([MentionsRecast(), CaseRecast()], verbose=0,
+                        callbacks=[MetricsCallback(registry, pipeline='tweets')], **kwargs)
+    return pipeline.setup_recast(text)
+
+
+def test_pipeline_metrics():
+    registry = MetricsRegistry()
+    _recast(registry, ['Hi @jon', 'Bye'])
+    _recast(registry, ['Ok @ann'], cache_size=10)
+
+    assert registry['swachhdata_documents_total'].value(pipeline='tweets') == 3
+    assert registry['swachhdata_characters_in_total'].value(pipeline='tweets') == 17
+    assert registry['swachhdata_stage_modified_total'].value(pipeline='tweets', stage='MentionsRecast') == 2
+    assert registry['swachhdata_cache_misses_total'].value(pipeline='tweets', cache='memory') == 1
+
+    text = registry.render()
+    assert '# TYPE swachhdata_recast_seconds histogram' in text
+    assert 'swachhdata_recast_seconds_count{pipeline="tweets"} 2' in text
+    assert 'swachhdata_recast_seconds_bucket{pipeline="tweets",le="+Inf"} 2' in text
+
+
+def test_registry_rejects_conflicting_metrics():
+    registry = MetricsRegistry()
+    counter = registry.counter('docs', 'Documents', ['pipeline'])
+    assert registry.counter('docs', 'Documents', ['pipeline']) is counter
+    with pytest.raises(ValueError):
+        registry.gauge('docs')
+    with pytest.raises(ValueError):
+        counter.inc(-1, pipeline='a')
+    with pytest.raises(ValueError):
+        counter.inc(1, stage='a')
+
+
+def test_write_and_serve(tmp_path):
+    registry = MetricsRegistry()
+    registry.gauge('swachhdata_queue_depth', 'Documents waiting').set(42)
+    path = tmp_path / 'swachhdata.prom'
+    registry.write(str(path))
+    assert path.read_text(encoding='utf-8') == registry.render()
+    assert [tmp.name for tmp in tmp_path.iterdir()] == ['swachhdata.prom']
+
+    server = registry.serve(port=0)
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.server_address[1]}/metrics') as response:
+            assert 'swachhdata_queue_depth 42' in response.read().decode('utf-8')
+    finally:
+        server.shutdown()
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from swachhdata.text import (CaseRecast, EscapeSequencesRecast, MentionsRecast, NumbersRecast, Pipeline,
+                             PunctuationsRecast, ShortWordsRecast, StopWordsRecast, urlRecast)
+
+
+def _stopwords():
+    return StopWordsRecast(package='custom', stopwords=['the', 'a', 'and'])
+
+
+def test_explain():
+    pipeline = Pipeline([EscapeSequencesRecast(), CaseRecast(), _stopwords(), EscapeSequencesRecast(),
+                         ShortWordsRecast(min_length=2)], verbose=0)
+    assert pipeline.explain().splitlines() == [
+        'Pipeline plan: 5 stages -> 4',
+        '    0  EscapeSequencesRecast          char, cost=1, idempotent',
+        '    1  CaseRecast(lower)              char, cost=1, idempotent',
+        '    2  ShortWordsRecast               token, cost=2, idempotent, shrinks  (was 4)',
+        '    3  StopWordsRecast                token, cost=3, idempotent, shrinks  (was 2)',
+        'rewrites:',
+        '  - dropped EscapeSequencesRecast at 3: idempotent, repeats stage 0',
+        '  - moved ShortWordsRecast (4) before StopWordsRecast (2): commute, cheaper'
+    ]
+    # explain does not change the chain
+    assert len(pipeline.chain) == 5
+
+
+def test_stages_without_properties_keep_their_place():
+    pipeline = Pipeline([MentionsRecast(), PunctuationsRecast(), CaseRecast(), CaseRecast()], verbose=0).optimize()
+    assert [rec._name for rec in pipeline.chain] == ['MentionsRecast', 'PunctuationsRecast', 'CaseRecast']
+
+
+def test_optimized_same_as_plain(corpus, chain, plain):
+    pipeline = Pipeline(chain() + [CaseRecast(), EscapeSequencesRecast()], verbose=0)
+    expected = pipeline.setup_recast(corpus)
+    pipeline.optimize()
+    assert pipeline.setup_recast(corpus) == expected == plain(corpus)[0]
+    assert pipeline.extractions.to_dict() == plain(corpus)[1]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_chains_same_output(corpus, seed):
+    factories = [EscapeSequencesRecast, CaseRecast, lambda: CaseRecast(process='upper'), PunctuationsRecast,
+                 ShortWordsRecast, _stopwords, urlRecast, NumbersRecast, lambda: ShortWordsRecast(min_length=2)]
+    rng = random.Random(seed)
+    picks = [rng.choice(factories) for _ in range(rng.randint(2, 8))]
+
+    expected = Pipeline([factory() for factory in picks], verbose=0).setup_recast(corpus)
+    pipeline = Pipeline([factory() for factory in picks], verbose=0).optimize()
+    assert pipeline.setup_recast(corpus) == expected
+    assert len(pipeline.chain) <= len(picks)
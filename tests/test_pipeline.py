@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+import scipy.sparse
+
+from swachhdata.text import (CaseRecast, EscapeSequencesRecast, MentionsRecast, Pipeline, PrefixCache,
+                             TokenisationRecast, TokenizedCorpus, VectorisationRecast)
+
+
+def _pipeline():
+    return Pipeline([EscapeSequencesRecast(), CaseRecast(), EscapeSequencesRecast(),
+                     MentionsRecast(process='extract_remove')], verbose=0, cache_size=100)
+
+
+def test_memo_after_optimize():
+    text = ['Hi @Jon\nthere', 'Bye @Ann']
+    pipeline = _pipeline()
+    pipeline.setup_recast(text)
+    pipeline.optimize()
+    ntext = pipeline.setup_recast(text + ['Ok @Bob'])
+
+    expected = Pipeline([EscapeSequencesRecast(), CaseRecast(), MentionsRecast(process='extract_remove')], verbose=0)
+    assert ntext == expected.setup_recast(text + ['Ok @Bob'])
+    assert pipeline.extractions['mentions'] == [['@jon'], ['@ann'], ['@bob']]
+
+
+def test_memo_after_chain_change():
+    text = ['Hi @Jon\nthere', 'Bye @Ann']
+    pipeline = _pipeline()
+    pipeline.setup_recast(text)
+    pipeline.chain.append(CaseRecast(process='upper'))
+    assert pipeline.setup_recast(text) == ['HI THERE', 'BYE']
+    assert pipeline.extractions['mentions'] == [['@jon'], ['@ann']]
+
+
+def test_fingerprint_follows_chain():
+    pipeline = _pipeline()
+    fingerprint = pipeline.fingerprint
+    assert pipeline.fingerprint is fingerprint
+    pipeline.chain.append(CaseRecast(process='upper'))
+    changed = pipeline.fingerprint
+    assert changed != fingerprint
+    pipeline.chain[-1] = CaseRecast(process='lower')
+    assert pipeline.fingerprint not in (fingerprint, changed)
+    pipeline.chain.pop()
+    assert pipeline.fingerprint == fingerprint
+
+
+def test_compact_tokens_in_every_mode(monkeypatch):
+    spacy = pytest.importorskip('spacy')
+    monkeypatch.setattr(spacy, 'load', lambda name, **kwargs: spacy.blank('en'))
+    text = ['The best service', 'the best tab', 'the best tab'] * 10
+
+    def pipeline(**kwargs):
+        return Pipeline([CaseRecast(), TokenisationRecast(package='spacy', method='word', compact=True)],
+                        verbose=0, **kwargs)
+
+    expected = pipeline().setup_recast(text)
+    for kwargs in ({'dedup': True}, {'memory_budget': 1000}):
+        ntext = pipeline(**kwargs).setup_recast(text)
+        assert isinstance(ntext, TokenizedCorpus) and ntext == expected
+    ntext = asyncio.run(pipeline().arecast(text, chunk_size=7))
+    assert isinstance(ntext, TokenizedCorpus) and ntext == expected
+
+
+def test_extractions_reset_between_recasts():
+    pipeline = Pipeline([MentionsRecast(process='extract_remove')], verbose=0)
+    pipeline.setup_recast(['Hi @Jon', 'Bye @Ann'])
+    pipeline.chain = [CaseRecast()]
+    pipeline.setup_recast(['a', 'b', 'c'])
+    assert 'mentions' not in pipeline.extractions
+
+
+def _compact_chain():
+    return [CaseRecast(), TokenisationRecast(package='spacy', method='word', compact=True)]
+
+
+def _vector_chain():
+    return [CaseRecast(), VectorisationRecast(n_features=2**10, ngram_range=(1, 2))]
+
+
+@pytest.mark.parametrize('chain, kind', [(_compact_chain, TokenizedCorpus), (_vector_chain, scipy.sparse.csr_matrix)])
+def test_prefix_cache_keeps_stacked_output(monkeypatch, chain, kind):
+    if chain is _compact_chain:
+        spacy = pytest.importorskip('spacy')
+        monkeypatch.setattr(spacy, 'load', lambda name, **kwargs: spacy.blank('en'))
+    text = ['The best service', 'the best tab', 'A look']
+    expected = Pipeline(chain(), verbose=0).setup_recast(text)
+
+    cache = PrefixCache()
+    pipeline = Pipeline(chain(), verbose=0, prefix_cache=cache)
+    for _ in range(2):
+        ntext = pipeline.setup_recast(text)
+        assert isinstance(ntext, kind)
+        assert _rows(ntext) == _rows(expected)
+
+
+def _rows(data):
+    return data.toarray().tolist() if hasattr(data, 'toarray') else list(data)
+
+
+@pytest.mark.parametrize('kwargs', [{'dedup': True}, {'cache_size': 50}])
+def test_dedup_same_as_plain(corpus, chain, plain, kwargs):
+    text = corpus + corpus[::3]
+    pipeline = Pipeline(chain(), verbose=0, **kwargs)
+    for _ in range(2):
+        assert pipeline.setup_recast(text) == plain(text)[0]
+        assert pipeline.extractions.to_dict() == plain(text)[1]
+
+
+def test_memo_shared_across_calls(corpus, chain, plain):
+    pipeline = Pipeline(chain(), verbose=0, cache_size=len(corpus))
+    pipeline.setup_recast(corpus[:20])
+    assert pipeline.setup_recast(corpus[10:30]) == plain(corpus[10:30])[0]
+    assert pipeline.stats.cache['memory'] == {'hits': 10, 'misses': 10}
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'dedup': True}])
+def test_memory_budget_same_as_plain(tmp_path, corpus, chain, plain, kwargs):
+    pipeline = Pipeline(chain(), verbose=0, memory_budget=50000, spill_dir=str(tmp_path), trace_memory=True, **kwargs)
+    assert pipeline.setup_recast(corpus) == plain(corpus)[0]
+    assert pipeline.extractions.to_dict() == plain(corpus)[1]
+    assert pipeline.stats.chunks > 1
+    assert all(stage.peak_bytes > 0 for stage in pipeline.stats)
+    # spilled chunks are removed once read back
+    assert not list(tmp_path.iterdir())
+
+
+def test_memory_budget_keeps_small_input_whole(corpus, chain):
+    pipeline = Pipeline(chain(), verbose=0, memory_budget=2**30)
+    pipeline.setup_recast(corpus)
+    assert pipeline.stats.chunks == 0
+
+
+def test_progress_reports_every_stage(corpus, chain, plain):
+    text, reports = corpus * 4, []
+    pipeline = Pipeline(chain(), verbose=0, progress=lambda name, done, total: reports.append((name, done, total)))
+    assert pipeline.setup_recast(text) == plain(text)[0]
+
+    for rec in pipeline.chain:
+        done = [report[1] for report in reports if report[0] == rec._name]
+        assert done == sorted(done) and done[-1] == len(text)
+        # reported about every percent of the documents, not per document
+        assert len(done) < len(text) / 4
+
+
+def test_progress_of_a_recast():
+    reports = []
+    rec = CaseRecast()
+    rec.set_progress(lambda name, done, total: reports.append((name, done, total)))
+    assert rec.setup_recast(['A'] * 300) == ['a'] * 300
+    assert reports[-1] == ('CaseRecast', 300, 300)
+
+
+def test_verbose_same_as_quiet(corpus, chain, plain):
+    assert Pipeline(chain(), verbose=1).setup_recast(corpus) == plain(corpus)[0]
@@ -0,0 +1,49 @@
+import pickle
+
+import pytest
+
+from swachhdata.text import CaseRecast, EscapeSequencesRecast, Pipeline
+from swachhdata.text import plan as plan_module
+from swachhdata.text.plan import recast_worker
+
+
+def test_compiled_same_as_plain(corpus, chain, plain):
+    pipeline = Pipeline(chain(), verbose=0)
+    plan = pipeline.compile()
+    assert plan.fingerprint == pipeline.fingerprint
+    assert plan.recast(corpus) == plain(corpus)
+    assert [plan.transform_one(text) for text in corpus] == plain(corpus)[0]
+    # nothing is kept on the plan, or on the Pipeline it was compiled from
+    assert all(stage.data is None for stage in plan.stages) and all(rec.data is None for rec in pipeline.chain)
+    assert plan.recast(corpus[:3]) == plain(corpus[:3])
+
+
+def test_pickled_plan(corpus, chain, plain):
+    plan = Pipeline(chain(), verbose=0).compile()
+    plan.recast(corpus)
+    copy = pickle.loads(pickle.dumps(plan))
+    assert copy.fingerprint == plan.fingerprint and copy.recast(corpus) == plain(corpus)
+
+
+def test_workers(corpus, chain, plain):
+    chunks = [corpus[i:i + 20] for i in range(0, len(corpus), 20)]
+    with Pipeline(chain(), verbose=0).compile().executor(2) as pool:
+        results = list(pool.map(recast_worker, chunks))
+    assert [text for ntext, _ in results for text in ntext] == plain(corpus)[0]
+    assert [items for _, extracted in results for items in extracted['urls']] == plain(corpus)[1]['urls']
+
+
+def test_uninitialized_worker(monkeypatch):
+    monkeypatch.setattr(plan_module, '_PLAN', None)
+    with pytest.raises(ValueError):
+        recast_worker(['a'])
+
+
+def test_nested_and_optimized(corpus, chain, plain):
+    stages = chain()
+    pipeline = Pipeline([Pipeline(stages[:4], verbose=0), EscapeSequencesRecast(), Pipeline(stages[4:], verbose=0),
+                         CaseRecast()], verbose=0)
+    plan = pipeline.compile()
+    assert len(plan) == len(stages) + 2
+    assert plan.recast(corpus) == plain(corpus)
+    assert pipeline.compile(optimize=True).recast(corpus)[0] == plain(corpus)[0]
@@ -0,0 +1,45 @@
+import pytest
+
+from swachhdata.text import (AlphabetRecast, CaseRecast, EmojiRecast, EscapeSequencesRecast, HashtagsRecast,
+                             MentionsRecast, NumbersRecast, Pipeline, PunctuationsRecast, htmlRecast, urlRecast)
+from swachhdata.text.prescan import scan
+
+# characters outside of the ascii classes the masks are built from
+TRICKY = ['plain words only', 'digits ٣ and ５', 'no\u00a0break', '\ufeffbom', 'tab\there', 'trailing ', ' leading',
+          'two  spaces', 'ǅ title', 'İstanbul', 'full width ＠jon ＃tag', 'vertical\x0btab', 'a&amp;b', '<p>x</p>',
+          'x\0y', 'www.a.com', 'http://a', 'Ünïcödé', '１２３', 'line\u2028separator', 'ß', '🎉', 'a_b-c']
+
+RECASTS = [urlRecast, htmlRecast, EscapeSequencesRecast, MentionsRecast, lambda: MentionsRecast(process='extract'),
+           CaseRecast, lambda: CaseRecast(process='upper'), EmojiRecast, lambda: EmojiRecast(process='replace'),
+           lambda: EmojiRecast(space_out=True), HashtagsRecast, NumbersRecast,
+           lambda: NumbersRecast(process='replace', seperator=','), AlphabetRecast,
+           lambda: AlphabetRecast('rem_non_ascii'), PunctuationsRecast]
+
+
+@pytest.mark.parametrize('factory', RECASTS)
+def test_skipped_documents_are_unchanged(corpus, factory):
+    rec = factory()
+    applicable = rec._applicable()
+    for text in corpus + TRICKY:
+        if not scan(text) & applicable:
+            result = rec.transform_one(text)
+            if isinstance(result, tuple):
+                assert result == (text, [])
+            elif rec._process == 'extract':
+                assert result == []
+            else:
+                assert result == text
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'dedup': True}, {'deferred': True}])
+def test_prefilter_same_as_plain(corpus, chain, plain, kwargs):
+    text = corpus + TRICKY
+    pipeline = Pipeline(chain(), verbose=0, prefilter=True, **kwargs)
+    assert pipeline.setup_recast(text) == plain(text)[0]
+    assert pipeline.extractions.to_dict() == plain(text)[1]
+
+
+def test_untouched_documents_are_passed_through():
+    text = ['nothing to do', 'Hi @Jon']
+    ntext = Pipeline([MentionsRecast(), urlRecast()], verbose=0, prefilter=True).setup_recast(text)
+    assert ntext == ['nothing to do', 'Hi'] and ntext[0] is text[0]
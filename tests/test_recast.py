@@ -0,0 +1,25 @@
+import pickle
+
+import pytest
+
+from swachhdata.text import Pipeline, StopWordsRecast
+
+
+def test_stopwords_load_on_recast():
+    # no stop words are loaded, or needed, to build the recast
+    rec = StopWordsRecast(package='nltk')
+    assert rec._stopWords is None
+
+
+def test_custom_stopwords():
+    rec = StopWordsRecast(package='custom', stopwords=['a', 'the'])
+    fingerprint = Pipeline([rec], verbose=0).fingerprint
+    assert rec.setup_recast(['a cat and the dog']) == ['cat and dog']
+    assert pickle.loads(pickle.dumps(rec)).transform_one('the end') == 'end'
+    assert Pipeline([rec], verbose=0).fingerprint == fingerprint
+
+
+@pytest.mark.parametrize('kwargs', [{'package': 'custom'}, {'package': 'gensim'}])
+def test_stopwords_arguments_are_value_errors(kwargs):
+    with pytest.raises(ValueError):
+        StopWordsRecast(**kwargs)
@@ -0,0 +1,24 @@
+import pickle
+
+import pytest
+
+from swachhdata.text import SpacyModel
+from swachhdata.text import resources
+
+
+def test_model_resolved_once(monkeypatch):
+    spacy = pytest.importorskip('spacy')
+    loads = []
+    monkeypatch.setattr(resources, 'load_spacy', lambda name, **kwargs: loads.append(name) or spacy.blank('en'))
+
+    nlp = SpacyModel('en_core_web_sm', disable=['ner'])
+    assert [token.text for token in nlp('Kate raced out')] == ['Kate', 'raced', 'out']
+    nlp('again')
+    assert loads == ['en_core_web_sm']
+
+    state = pickle.dumps(nlp)
+    assert b'Vocab' not in state
+    copy = pickle.loads(state)
+    assert copy._model is None and copy.kwargs == {'disable': ['ner']}
+    assert [token.text for token in copy('Kate')] == ['Kate']
+    assert loads == ['en_core_web_sm', 'en_core_web_sm']
@@ -0,0 +1,56 @@
+import pytest
+
+from swachhdata.text import CaseRecast, MentionsRecast, Pipeline, StatsCallback
+
+
+def test_stage_stats(corpus, chain, plain):
+    pipeline = Pipeline(chain(), verbose=0)
+    ntext = pipeline.setup_recast(corpus)
+    stats = pipeline.stats
+
+    assert [stage.name for stage in stats] == [rec._name for rec in pipeline.chain]
+    assert stats.docs == len(corpus) and all(stage.docs == len(corpus) for stage in stats)
+    assert stats.chars_in == sum(map(len, corpus)) == stats[0].chars_in
+    assert stats.chars_out == sum(map(len, ntext)) == stats[-1].chars_out
+    assert all(stage.wall_s >= 0 and not stage.cached for stage in stats)
+    assert ntext == plain(corpus)[0]
+
+
+def test_modified_counts():
+    pipeline = Pipeline([CaseRecast(), MentionsRecast()], verbose=0)
+    pipeline.setup_recast(['Hi', 'hi', 'hi @jon', 'HI @ann'])
+    assert [stage.modified for stage in pipeline.stats] == [2, 2]
+
+
+def test_callbacks():
+    stages, recasts = [], []
+
+    class Collect(StatsCallback):
+        def on_recast_end(self, stats):
+            recasts.append(stats)
+
+    pipeline = Pipeline([CaseRecast(), MentionsRecast()], verbose=0, callbacks=[Collect(), stages.append])
+    pipeline.setup_recast(['Hi @jon'])
+    assert [stats.name for stats in stages] == ['CaseRecast', 'MentionsRecast']
+    assert recasts == [pipeline.stats]
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'dedup': True}, {'prefilter': True}])
+def test_slowlog_indices_of_input(corpus, chain, plain, kwargs):
+    text = corpus[:20] + corpus[:5] + ['@jon ' * 20000] + corpus[20:30]
+    pipeline = Pipeline(chain(), verbose=0, **kwargs)
+    slowlog = pipeline.profile(k=3, preview=10)
+    assert pipeline.setup_recast(text) == plain(text)[0]
+
+    # under prefilter stages no document needs are not run at all
+    assert set(slowlog.stages) <= set(rec._name for rec in pipeline.chain)
+    assert all(len(slowlog.records(stage)) <= 3 for stage in slowlog.stages)
+    slowest = slowlog.records('MentionsRecast')[0]
+    assert (slowest['index'], slowest['length'], slowest['preview']) == (25, 100000, '@jon @jon ')
+
+
+def test_slowlog_on_a_recast():
+    rec = CaseRecast()
+    slowlog = rec.profile(k=1)
+    rec.setup_recast(['a', 'B' * 100000, 'c'])
+    assert [record['index'] for record in slowlog.records()] == [1]
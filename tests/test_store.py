@@ -0,0 +1,45 @@
+from swachhdata.text import CaseRecast, ExtractionStore, HashtagsRecast, MentionsRecast, Pipeline, urlRecast
+
+
+def test_columns():
+    store = ExtractionStore()
+    store.put('mentions', [['@jon'], None, ['@ann', '@jon']])
+    assert store['mentions'] == [['@jon'], [], ['@ann', '@jon']]
+    assert store.offsets('mentions').tolist() == [0, 1, 1, 3]
+    assert store.values('mentions').tolist() == ['@jon', '@ann', '@jon']
+    assert store.row('mentions', 2) == ['@ann', '@jon']
+
+    frame = store.to_frame()
+    assert frame['doc'].tolist() == [0, 2, 2]
+    assert frame['value'].tolist() == ['@jon', '@ann', '@jon']
+    store.discard('mentions')
+    assert len(store) == 0 and store.to_frame().empty
+
+
+def test_pipeline_extractions_match_the_stages(corpus, chain):
+    pipeline = Pipeline(chain(), verbose=0)
+    pipeline.setup_recast(corpus)
+    for rec in pipeline.chain:
+        if rec._extract_attr is not None:
+            assert pipeline.extractions[rec._extract_attr] == getattr(rec, rec._extract_attr)
+    assert pipeline.extractions.columns == ['urls', 'mentions', 'hashtags', 'emojis', 'numbers']
+
+
+def test_extract_only_and_repeated_stages():
+    pipeline = Pipeline([MentionsRecast(process='extract'), CaseRecast(), MentionsRecast(process='extract_remove')],
+                        verbose=0)
+    assert pipeline.setup_recast(['Hi @Jon', 'Bye']) == ['hi', 'bye']
+    assert pipeline.extractions.to_dict() == {'mentions': [['@Jon'], []], 'mentions_2': [['@jon'], []]}
+
+
+def test_shared_store():
+    store = ExtractionStore()
+    urls = Pipeline([urlRecast(process='extract_remove')], verbose=0, store=store)
+    tags = Pipeline([HashtagsRecast(process='extract_remove')], verbose=0, store=store)
+    urls.setup_recast(['see www.a.com'])
+    tags.setup_recast(['#a #b', '#c'])
+    assert store.to_dict() == {'urls': [['www.a.com']], 'hashtags': [['#a', '#b'], ['#c']]}
+
+    # a recast only replaces the columns of its own Pipeline
+    tags.setup_recast(['no tags'])
+    assert store.to_dict() == {'urls': [['www.a.com']], 'hashtags': [[]]}
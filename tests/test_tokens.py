@@ -0,0 +1,44 @@
+import pickle
+
+import pytest
+
+from swachhdata.text import TokenisationRecast, TokenizedCorpus, Vocabulary
+
+DOCUMENTS = [['the', 'best', 'service'], [], ['the', 'best', 'tab']]
+
+
+def test_compact_same_tokens_as_lists(monkeypatch, corpus):
+    spacy = pytest.importorskip('spacy')
+    monkeypatch.setattr(spacy, 'load', lambda name, **kwargs: spacy.blank('en'))
+
+    tokens = TokenisationRecast(package='spacy', method='word').setup_recast(corpus)
+    rec = TokenisationRecast(package='spacy', method='word', compact=True)
+    compact = rec.setup_recast(corpus)
+    assert isinstance(compact, TokenizedCorpus) and compact == tokens
+    assert compact.vocab is rec.vocab and len(rec.vocab) == len(set(token for doc in tokens for token in doc))
+
+
+def test_corpus_layout():
+    corpus = TokenizedCorpus.from_tokens(DOCUMENTS)
+    assert corpus.ids.tolist() == [0, 1, 2, 0, 1, 3] and corpus.offsets.tolist() == [0, 3, 3, 6]
+    assert (len(corpus), corpus[-1], corpus[0:2]) == (3, DOCUMENTS[2], DOCUMENTS[:2])
+    assert corpus.lengths().tolist() == [3, 0, 3]
+    assert corpus.to_numpy().tolist() == [[0, 1, 2], [-1, -1, -1], [0, 1, 3]]
+    assert pickle.loads(pickle.dumps(corpus)) == DOCUMENTS
+    with pytest.raises(IndexError):
+        corpus[3]
+
+
+def test_concat_remaps_other_vocabularies():
+    first = TokenizedCorpus.from_tokens(DOCUMENTS)
+    second = TokenizedCorpus.from_tokens([['tab', 'new']])
+    assert TokenizedCorpus.concat([first, second]) == DOCUMENTS + [['tab', 'new']]
+    assert first + second == DOCUMENTS + [['tab', 'new']]
+    assert list(first.vocab) == ['the', 'best', 'service', 'tab', 'new']
+
+
+def test_vocabulary_ids_are_stable():
+    vocab = Vocabulary(['a', 'b'])
+    assert (vocab.add('c'), vocab.add('a'), vocab.get('z')) == (2, 0, None)
+    copy = pickle.loads(pickle.dumps(vocab))
+    assert list(copy) == ['a', 'b', 'c'] and copy.add('d') == 3
@@ -0,0 +1,55 @@
+import pytest
+
+from swachhdata.text import (AlphabetRecast, CaseRecast, ContractionsRecast, EmojiRecast, HashtagsRecast,
+                             MentionsRecast, NumbersRecast, Pipeline, PunctuationsRecast, ShortWordsRecast,
+                             urlRecast)
+
+RECASTS = [urlRecast, MentionsRecast, HashtagsRecast, EmojiRecast, NumbersRecast, CaseRecast, ContractionsRecast,
+           PunctuationsRecast, ShortWordsRecast, AlphabetRecast, lambda: EmojiRecast(process='replace'),
+           lambda: NumbersRecast(process='extract_remove'), lambda: urlRecast(process='extract')]
+
+
+@pytest.mark.parametrize('factory', RECASTS)
+def test_transform_one_same_as_setup_recast(corpus, factory):
+    rec = factory()
+    expected = factory().setup_recast(list(corpus))
+    if isinstance(expected, tuple):
+        expected = list(zip(*expected))
+    assert [rec.transform_one(text) for text in corpus] == expected
+    assert rec.data is None
+
+
+@pytest.mark.parametrize('prefilter', [False, True])
+def test_pipeline_transform_one_same_as_plain(corpus, chain, plain, prefilter):
+    pipeline = Pipeline(chain(), verbose=0, prefilter=prefilter)
+    assert [pipeline.transform_one(text) for text in corpus] == plain(corpus)[0]
+    assert pipeline.stats is None and len(pipeline.extractions) == 0
+
+
+def test_pipeline_transform_same_as_plain_and_stateless(corpus, chain, plain):
+    pipeline = Pipeline(chain(), verbose=0)
+    assert pipeline.transform(list(corpus), extractions=True) == plain(corpus)
+    assert pipeline.transform(list(corpus)) == plain(corpus)[0]
+    assert pipeline.data is None and pipeline.stats is None and len(pipeline.extractions) == 0
+    for rec in pipeline.chain:
+        assert rec.data is None
+        assert rec._extract_attr is None or getattr(rec, rec._extract_attr, None) is None
+
+
+def test_pipeline_transform_shared_across_threads(corpus, chain, plain):
+    from concurrent.futures import ThreadPoolExecutor
+
+    pipeline = Pipeline(chain(), verbose=0)
+    chunks = [list(corpus[start:start + 7]) for start in range(0, len(corpus), 7)]
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda chunk: pipeline.transform(chunk, extractions=True), chunks * 3))
+    for chunk, result in zip(chunks * 3, results):
+        assert result == plain(chunk)
+
+
+@pytest.mark.parametrize('factory', RECASTS)
+def test_recast_transform_same_as_setup_recast(corpus, factory):
+    rec = factory()
+    before = dict(vars(rec))
+    assert rec.transform(list(corpus)) == factory().setup_recast(list(corpus))
+    assert vars(rec) == before
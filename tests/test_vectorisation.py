@@ -0,0 +1,50 @@
+import numpy
+import pytest
+
+from swachhdata.text import CaseRecast, Pipeline, PunctuationsRecast, VectorisationRecast
+
+TEXT = ['You can have a look at our catalogue', 'Have a look at the services tab', '']
+
+
+def test_vocabulary_counts():
+    rec = VectorisationRecast(vocabulary=['have', 'look', 'have a', 'tab'], ngram_range=(1, 2))
+    matrix = Pipeline([CaseRecast(), rec], verbose=0).setup_recast(TEXT + ['have have a'])
+    assert matrix.toarray().tolist() == [[1, 1, 1, 0], [1, 1, 1, 1], [0, 0, 0, 0], [2, 0, 1, 0]]
+
+
+def test_binary_and_norm():
+    binary = VectorisationRecast(vocabulary=['a', 'b'], binary=True).setup_recast(['a a b'])
+    assert binary.toarray().tolist() == [[1, 1]]
+    matrix = VectorisationRecast(n_features=2**10, norm='l2').setup_recast(TEXT)
+    assert numpy.allclose(numpy.sqrt(matrix.multiply(matrix).sum(axis=1)).ravel(), [1, 1, 0])
+
+
+def test_hashed_counts(corpus):
+    matrix = VectorisationRecast(n_features=2**18, ngram_range=(1, 2)).setup_recast(corpus)
+    words = [len(text.split()) for text in corpus]
+    assert matrix.shape == (len(corpus), 2**18)
+    assert matrix.sum(axis=1).ravel().tolist()[0] == [n + max(n - 1, 0) for n in words]
+
+
+@pytest.mark.parametrize('kwargs', [{'chunk_size': 7}, {'chunk_size': 30, 'n_jobs': 2}])
+def test_chunks_same_as_whole(corpus, kwargs):
+    expected = VectorisationRecast(n_features=2**18, ngram_range=(1, 2)).setup_recast(corpus)
+    matrix = VectorisationRecast(n_features=2**18, ngram_range=(1, 2), **kwargs).setup_recast(corpus)
+    assert (matrix != expected).nnz == 0
+
+
+@pytest.mark.parametrize('kwargs', [{'dedup': True}, {'memory_budget': 20000}, {'prefilter': True}])
+def test_pipeline_modes_same_as_plain(corpus, kwargs):
+    def chain():
+        return [CaseRecast(), PunctuationsRecast(), VectorisationRecast(n_features=2**16)]
+
+    expected = Pipeline(chain(), verbose=0).setup_recast(corpus + corpus[:5])
+    matrix = Pipeline(chain(), verbose=0, **kwargs).setup_recast(corpus + corpus[:5])
+    assert matrix.shape == expected.shape and (matrix != expected).nnz == 0
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        VectorisationRecast(ngram_range=(2, 1))
+    with pytest.raises(ValueError):
+        VectorisationRecast(norm='l3')